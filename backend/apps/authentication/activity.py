@@ -0,0 +1,191 @@
+"""
+Login activity for Tours & Travels backend
+Write-behind buffer that batches last_login updates and LoginEvent audit rows per worker
+"""
+
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, DateTimeField, F, Value, When
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+from apps.users.models import User
+from .models import LoginEvent
+
+logger = logging.getLogger('apps.authentication')
+
+
+class LoginActivityBuffer:
+    """
+    Pending last_login times and login events of one worker process
+    A flush writes every pending last_login in one UPDATE ... CASE and every event in one
+    multi-row INSERT, keeping only the latest login per user for last_login. Once started,
+    a daemon thread flushes every flush_interval seconds, and sooner when max_events logins
+    are pending, so requests never wait on the write; a buffer that was not started flushes
+    inline from the login that makes it due
+    """
+
+    def __init__(self, max_events, flush_interval):
+        self.max_events = max_events
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._last_login = {}
+        self._events = []
+        self._oldest = None
+        self._requeued = 0
+        self._due = threading.Event()
+        self._stopping = False
+        self._thread = None
+
+    def __len__(self):
+        return len(self._events)
+
+    def start(self):
+        """Flush from a daemon thread from now on, and once more at interpreter exit"""
+        with self._lock:
+            self._stopping = False
+            self._start_thread()
+        atexit.register(self.stop)
+
+    def stop(self):
+        """Stop the flusher thread after a last flush"""
+        with self._lock:
+            thread, self._thread, self._stopping = self._thread, None, True
+        if thread is not None:
+            self._due.set()
+            thread.join()
+
+    def _start_thread(self):
+        # Called again after a fork, which only copies the forking thread
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='login-activity', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stopping:
+            self._due.wait(self.flush_interval)
+            self._due.clear()
+            self.flush()
+            # The thread's own connection; not held open between flushes
+            connection.close()
+        self.flush()
+        connection.close()
+
+    def _note_last_login(self, user_id, when):
+        if user_id not in self._last_login or self._last_login[user_id] < when:
+            self._last_login[user_id] = when
+
+    def record(self, user_id, kind, ip_address=None, when=None, last_login=True):
+        """Buffer a login, waking the flusher, or flushing without one, once the buffer is due"""
+        when = when or timezone.now()
+        with self._lock:
+            if last_login:
+                self._note_last_login(user_id, when)
+            self._events.append(LoginEvent(user_id=user_id, kind=kind, ip_address=ip_address, occurred_at=when))
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            due = (len(self._events) >= self.max_events
+                   or time.monotonic() - self._oldest >= self.flush_interval)
+            background = self._thread is not None and not self._stopping
+            if due and background:
+                self._start_thread()
+        if due and background:
+            self._due.set()
+        elif due:
+            self.flush()
+
+    def flush(self):
+        """
+        Write everything pending, returning the number of events written
+        A failed write puts its last_login times back and its events back once; events that
+        already failed one flush are dropped
+        """
+        with self._lock:
+            last_login, events, requeued = self._last_login, self._events, self._requeued
+            self._last_login, self._events, self._oldest, self._requeued = {}, [], None, 0
+        if not events and not last_login:
+            return 0
+        try:
+            if last_login:
+                # Other workers flush too, so last_login only ever moves forward
+                User.objects.filter(pk__in=last_login).update(last_login=Case(
+                    *[When(pk=user_id, then=Greatest(Coalesce(F('last_login'), Value(when)), Value(when)))
+                      for user_id, when in last_login.items()],
+                    output_field=DateTimeField(),
+                ))
+            # Users deleted since logging in would fail the whole INSERT
+            existing = set(User.objects.filter(
+                pk__in={event.user_id for event in events}
+            ).values_list('pk', flat=True))
+            LoginEvent.objects.bulk_create([event for event in events if event.user_id in existing])
+        except Exception:
+            kept = events[requeued:]
+            with self._lock:
+                for user_id, when in last_login.items():
+                    self._note_last_login(user_id, when)
+                self._events[:0] = kept
+                self._requeued = len(kept)
+                if self._oldest is None:
+                    self._oldest = time.monotonic()
+            logger.exception(
+                "Login activity flush failed: %d event(s) kept for the next flush, %d dropped",
+                len(kept), requeued
+            )
+            return 0
+        return len(events)
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_login_activity():
+    """Return this process's login activity buffer, creating it on first use"""
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = LoginActivityBuffer(
+                    settings.LOGIN_ACTIVITY_MAX_EVENTS, settings.LOGIN_ACTIVITY_FLUSH_INTERVAL
+                )
+    return _buffer
+
+
+def start_login_activity_flusher():
+    """Flush this process's login activity in the background; called once per worker at startup"""
+    get_login_activity().start()
+
+
+def flush_login_activity():
+    """Flush this process's pending login activity, if any"""
+    if _buffer is not None:
+        _buffer.flush()
+
+
+def reset_login_activity():
+    """Discard the buffer and anything pending, e.g. between tests"""
+    global _buffer
+    with _buffer_lock:
+        _buffer = None
+
+
+def record_login(user, kind, request=None):
+    """
+    Record a successful login or registration of user
+    last_login is buffered, except when a password was rehashed while authenticating:
+    the new hash is written at once, with last_login in the same UPDATE
+    """
+    now = timezone.now()
+    user.last_login = now
+    rehashed = getattr(user, 'password_rehashed', False)
+    if rehashed:
+        User.objects.filter(pk=user.pk).update(
+            last_login=Greatest(Coalesce(F('last_login'), Value(now)), Value(now)), password=user.password
+        )
+        user.password_rehashed = False
+    ip_address = request.META.get('REMOTE_ADDR') if request is not None else None
+    get_login_activity().record(user.pk, kind, ip_address, now, last_login=not rehashed)
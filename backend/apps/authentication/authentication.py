@@ -0,0 +1,66 @@
+"""
+Token authentication for Tours & Travels backend
+Authenticates access tokens from their claims, checking revocation against a short-lived user state cache
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from apps.users.models import TokenUser, User
+
+
+USER_STATE_KEY = 'auth:user-state:{}'
+
+
+def get_user_state(user_id):
+    """
+    Return (is_active, role) of a user, or (False, None) if it no longer exists
+    Cached for AUTH_USER_STATE_TTL seconds, so revocations apply within that window
+    """
+    key = USER_STATE_KEY.format(user_id)
+    state = cache.get(key)
+    if state is None:
+        state = User.objects.filter(pk=user_id).values_list('is_active', 'role').first() or (False, None)
+        cache.set(key, state, settings.AUTH_USER_STATE_TTL)
+    return state
+
+
+def invalidate_user_state(user_id):
+    """Drop the cached state of a user so the next request sees the change"""
+    cache.delete(USER_STATE_KEY.format(user_id))
+
+
+def token_user(claims):
+    """Build a TokenUser from known field values; every other field is deferred"""
+    field_names = [field.attname for field in User._meta.concrete_fields if field.attname in claims]
+    return TokenUser.from_db(DEFAULT_DB_ALIAS, field_names, [claims[name] for name in field_names])
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that builds the user from the token and the cached user state
+    Role checks and ownership filters run without loading the user row; a deactivated
+    user, or one whose role changed since the token was issued, is rejected
+    """
+
+    def get_user(self, validated_token):
+        """Return a lazily loaded TokenUser for the token's user"""
+        try:
+            user_id = User._meta.pk.to_python(validated_token[api_settings.USER_ID_CLAIM])
+        except (KeyError, ValidationError):
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        is_active, role = get_user_state(user_id)
+        if not is_active:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if validated_token.get('role', role) != role:
+            raise AuthenticationFailed(_("Token role is out of date"), code="token_outdated")
+
+        # Only fields checked against the state cache; the email claim may be stale and
+        # would be written back by a later save of the loaded fields
+        return token_user({'id': user_id, 'role': role, 'is_active': True})
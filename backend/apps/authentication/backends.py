@@ -0,0 +1,38 @@
+"""
+Authentication backends for Tours & Travels backend
+Email and password authentication whose password upgrades are saved with the login write
+"""
+
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import check_password, make_password
+from apps.users.models import User
+
+
+class LoginBackend(ModelBackend):
+    """
+    ModelBackend that keeps password rehashing off the authentication path
+    A hash made under an older hashing policy is re-encoded in memory and flagged;
+    activity.record_login then saves it together with last_login in a single UPDATE
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        """Return the user whose credentials match, or None"""
+        if username is None:
+            username = kwargs.get(User.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = User._default_manager.get_by_natural_key(username)
+        except User.DoesNotExist:
+            # Hash anyway so unknown emails take as long as wrong passwords
+            make_password(password)
+            return None
+
+        def rehash(raw_password):
+            user.set_password(raw_password)
+            user.password_rehashed = True
+
+        if check_password(password, user.password, rehash) and self.user_can_authenticate(user):
+            return user
+        return None
+
@@ -0,0 +1,23 @@
+"""
+Password hashers for Tours & Travels backend
+Scrypt and Argon2 hashers whose cost parameters come from PASSWORD_HASHING_PARAMS
+"""
+
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher, ScryptPasswordHasher
+
+
+class SettingsParamsMixin:
+    """Override the hasher's cost attributes with PASSWORD_HASHING_PARAMS[algorithm]"""
+
+    def __init__(self):
+        for name, value in settings.PASSWORD_HASHING_PARAMS.get(self.algorithm, {}).items():
+            setattr(self, name, value)
+
+
+class TunedScryptPasswordHasher(SettingsParamsMixin, ScryptPasswordHasher):
+    """Scrypt with configurable work_factor, block_size and parallelism"""
+
+
+class TunedArgon2PasswordHasher(SettingsParamsMixin, Argon2PasswordHasher):
+    """Argon2id with configurable time_cost, memory_cost and parallelism; needs argon2-cffi"""
@@ -0,0 +1,70 @@
+"""
+Management command to benchmark access token minting
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+from apps.authentication.tokens import get_token_minter, token_response_data
+from apps.users.models import User
+from apps.users.serializers import UserProfileSerializer
+
+
+def simplejwt_token(user):
+    """Access token minted the previous way, through AccessToken.for_user"""
+    token = AccessToken.for_user(user)
+    token['role'] = user.role
+    token['email'] = user.email
+    return str(token)
+
+
+def simplejwt_response_data(user):
+    """Login response body built the previous way, through simplejwt and a serializer"""
+    return {
+        'access_token': simplejwt_token(user),
+        'token_type': 'Bearer',
+        'expires_in': 3600,
+        'user': UserProfileSerializer(user).data,
+    }
+
+
+class Command(BaseCommand):
+    help = 'Measure tokens per second of the token minter against AccessToken.for_user and UserProfileSerializer'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tokens',
+            type=int,
+            default=20000,
+            help='Tokens minted per variant',
+        )
+
+    def handle(self, *args, **options):
+        # Never saved: minting reads attributes only
+        user = User(
+            id=1, username='token-benchmark', email='token-benchmark@example.invalid',
+            first_name='Token', last_name='Benchmark', role='CUSTOMER',
+            date_joined=timezone.now(), last_login=timezone.now(),
+        )
+        count = options['tokens']
+        minter = get_token_minter()
+        variants = [
+            ('simplejwt token', lambda: simplejwt_token(user)),
+            ('minted token', lambda: minter.mint(user)),
+            ('simplejwt response', lambda: simplejwt_response_data(user)),
+            ('minted response', lambda: token_response_data(user)),
+        ]
+        rates = {}
+        for name, mint in variants:
+            started = time.perf_counter()
+            for _ in range(count):
+                mint()
+            rates[name] = count / (time.perf_counter() - started)
+            self.stdout.write(f"{name:>20}: {rates[name]:,.0f}/s")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Tokens {rates['minted token'] / rates['simplejwt token']:.1f}x, "
+            f"login responses {rates['minted response'] / rates['simplejwt response']:.1f}x faster"
+        ))
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:31
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LoginEvent',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, help_text='Unique identifier for this record', primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Timestamp when this record was created')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='Timestamp when this record was last updated')),
+                ('kind', models.CharField(choices=[('CUSTOMER_LOGIN', 'Customer login'), ('ADMIN_LOGIN', 'Admin login'), ('REGISTRATION', 'Registration')], max_length=20)),
+                ('ip_address', models.GenericIPAddressField(blank=True, null=True)),
+                ('occurred_at', models.DateTimeField()),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='login_events', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Login Event',
+                'verbose_name_plural': 'Login Events',
+                'db_table': 'authentication_login_event',
+                'ordering': ['-occurred_at'],
+                'indexes': [models.Index(fields=['user', '-occurred_at'], name='auth_login_event_user_idx')],
+            },
+        ),
+    ]
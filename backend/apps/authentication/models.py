@@ -1,7 +1,42 @@
 """
 Authentication models for Tours & Travels backend
-Currently using Django's built-in User model via apps.users
+Users come from apps.users; this app keeps the login audit trail
 """
 
-# No additional models needed for JWT authentication
-# All authentication logic is handled through views and serializers
\ No newline at end of file
+from django.conf import settings
+from django.db import models
+from apps.core.models import BaseModel
+
+
+class LoginEvent(BaseModel):
+    """
+    Audit record of a successful login or registration
+    Written in batches by the login activity buffer, so occurred_at is the event time
+    and created_at the time it was flushed
+    """
+    KIND_CHOICES = [
+        ('CUSTOMER_LOGIN', 'Customer login'),
+        ('ADMIN_LOGIN', 'Admin login'),
+        ('REGISTRATION', 'Registration'),
+    ]
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name='login_events',
+        on_delete=models.CASCADE
+    )
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    ip_address = models.GenericIPAddressField(null=True, blank=True)
+    occurred_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'authentication_login_event'
+        ordering = ['-occurred_at']
+        indexes = [
+            models.Index(fields=['user', '-occurred_at'], name='auth_login_event_user_idx'),
+        ]
+        verbose_name = 'Login Event'
+        verbose_name_plural = 'Login Events'
+
+    def __str__(self):
+        return f"{self.kind} of {self.user_id} at {self.occurred_at}"
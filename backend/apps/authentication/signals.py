@@ -0,0 +1,16 @@
+"""
+Signal handlers for authentication
+Drops cached user state when a user changes, so revoked tokens stop working at once
+"""
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from apps.users.models import User
+from .authentication import invalidate_user_state
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user_state(sender, instance, **kwargs):
+    """Forget the cached active flag and role of a saved or deleted user"""
+    invalidate_user_state(instance.pk)
@@ -0,0 +1,103 @@
+"""
+Request throttling for Tours & Travels backend
+Sliding-window rate limits on login and registration, keyed by client IP and by email
+"""
+
+import hashlib
+import time
+
+from django.core.cache import cache
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class SlidingWindowCounter:
+    """
+    Approximate sliding-window counter over two fixed-window counts in the cache
+    The previous window's count is weighted by how much of it still overlaps the sliding
+    window, so each key costs two integers that expire on their own, however many hits
+    it takes; with Redis the increment is atomic across workers
+    """
+
+    def __init__(self, limit, window, prefix='throttle'):
+        self.limit = limit
+        self.window = window
+        self.prefix = prefix
+
+    def hit(self, key, now=None):
+        """
+        Count a hit on key, returning (allowed, seconds until a hit would be allowed)
+        Rejected hits count too, so a client retrying in a burst stays rejected
+        """
+        now = time.time() if now is None else now
+        index, offset = divmod(now, self.window)
+        current = f'{self.prefix}:{key}:{int(index)}'
+        try:
+            count = cache.incr(current)
+        except ValueError:
+            if cache.add(current, 1, timeout=2 * self.window):
+                count = 1
+            else:
+                count = cache.incr(current)
+        previous = cache.get(f'{self.prefix}:{key}:{int(index) - 1}', 0)
+
+        if previous * (1 - offset / self.window) + count <= self.limit:
+            return True, 0
+        if count > self.limit:
+            # Over the limit on the current window alone: wait for it to become the previous one
+            return False, self.window - offset
+        return False, max(self.window * (1 - (self.limit - count) / previous) - offset, 0)
+
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    """
+    SimpleRateThrottle counting with SlidingWindowCounter instead of a timestamp list
+    Rates come from REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'][scope]; a missing rate disables the throttle
+    """
+
+    wait_seconds = None
+
+    def get_rate(self):
+        """Look the scope's rate up at request time, so settings overrides apply"""
+        return api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+
+    def allow_request(self, request, view):
+        """Count the request against its key, rejecting it once over the rate"""
+        if self.rate is None:
+            return True
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+        counter = SlidingWindowCounter(self.num_requests, self.duration, prefix=f'throttle:{self.scope}')
+        allowed, self.wait_seconds = counter.hit(key)
+        return allowed
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class LoginIPThrottle(SlidingWindowThrottle):
+    """Login attempts per client IP"""
+    scope = 'login_ip'
+
+    def get_cache_key(self, request, view):
+        return self.get_ident(request)
+
+
+class LoginEmailThrottle(SlidingWindowThrottle):
+    """Login attempts per email address, whichever IPs they come from"""
+    scope = 'login_email'
+
+    def get_cache_key(self, request, view):
+        email = request.data.get('email') if hasattr(request.data, 'get') else None
+        if not isinstance(email, str) or not email:
+            return None
+        return hashlib.sha256(email.strip().lower().encode()).hexdigest()[:32]
+
+
+class RegisterIPThrottle(SlidingWindowThrottle):
+    """Registrations per client IP"""
+    scope = 'register_ip'
+
+    def get_cache_key(self, request, view):
+        return self.get_ident(request)
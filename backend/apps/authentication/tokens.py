@@ -0,0 +1,132 @@
+"""
+Token minting for Tours & Travels backend
+Signs access tokens with a prepared HMAC key and header segment, and builds login response data directly
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import threading
+import time
+from uuid import uuid4
+
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from rest_framework import serializers
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+HMAC_DIGESTS = {
+    'HS256': hashlib.sha256,
+    'HS384': hashlib.sha384,
+    'HS512': hashlib.sha512,
+}
+
+_datetime_field = serializers.DateTimeField()
+
+
+def b64url(data):
+    """Unpadded URL-safe base64, as used by JWT segments"""
+    return base64.urlsafe_b64encode(data).rstrip(b'=')
+
+
+def encode_segment(value):
+    """Compact JSON of value as a JWT segment"""
+    return b64url(json.dumps(value, separators=(',', ':')).encode())
+
+
+class TokenMinter:
+    """
+    Mints the same access tokens as AccessToken.for_user plus the role and email claims
+    With an HMAC algorithm the header segment and keyed hash are prepared once and each
+    token is one json.dumps and one HMAC; other algorithms go through simplejwt
+    """
+
+    def __init__(self):
+        self.lifetime = int(api_settings.ACCESS_TOKEN_LIFETIME.total_seconds())
+        digest = HMAC_DIGESTS.get(api_settings.ALGORITHM)
+        self._mac = None
+        if digest is not None:
+            self._header = encode_segment({'alg': api_settings.ALGORITHM, 'typ': 'JWT'}) + b'.'
+            self._mac = hmac.new(api_settings.SIGNING_KEY.encode(), digestmod=digest)
+
+    def claims(self, user, now):
+        """Payload of an access token for user issued at now"""
+        payload = {
+            api_settings.TOKEN_TYPE_CLAIM: AccessToken.token_type,
+            'exp': now + self.lifetime,
+            'iat': now,
+            api_settings.JTI_CLAIM: uuid4().hex,
+            api_settings.USER_ID_CLAIM: str(getattr(user, api_settings.USER_ID_FIELD)),
+        }
+        if api_settings.CHECK_REVOKE_TOKEN:
+            payload[api_settings.REVOKE_TOKEN_CLAIM] = get_md5_hash_password(user.password)
+        payload['role'] = user.role
+        payload['email'] = user.email
+        if api_settings.AUDIENCE is not None:
+            payload['aud'] = api_settings.AUDIENCE
+        if api_settings.ISSUER is not None:
+            payload['iss'] = api_settings.ISSUER
+        return payload
+
+    def mint(self, user):
+        """Return a signed access token for user"""
+        if self._mac is None:
+            token = AccessToken.for_user(user)
+            token['role'] = user.role
+            token['email'] = user.email
+            return str(token)
+        signing_input = self._header + encode_segment(self.claims(user, int(time.time())))
+        mac = self._mac.copy()
+        mac.update(signing_input)
+        return (signing_input + b'.' + b64url(mac.digest())).decode()
+
+
+_minter = None
+_minter_lock = threading.Lock()
+
+
+def get_token_minter():
+    """Return the process-wide token minter, preparing it on first use"""
+    global _minter
+    if _minter is None:
+        with _minter_lock:
+            if _minter is None:
+                _minter = TokenMinter()
+    return _minter
+
+
+@receiver(setting_changed)
+def reset_token_minter(*args, setting=None, **kwargs):
+    """Discard the prepared minter, e.g. when SIMPLE_JWT changes"""
+    global _minter
+    if setting in (None, 'SIMPLE_JWT'):
+        with _minter_lock:
+            _minter = None
+
+
+def profile_data(user):
+    """UserProfileSerializer(user).data, read straight from the user's attributes"""
+    return {
+        'id': str(user.pk),
+        'username': user.username,
+        'email': user.email,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+        'role': user.role,
+        'date_joined': _datetime_field.to_representation(user.date_joined),
+        'last_login': user.last_login and _datetime_field.to_representation(user.last_login),
+    }
+
+
+def token_response_data(user):
+    """Access token response body of a login or registration"""
+    return {
+        'access_token': get_token_minter().mint(user),
+        'token_type': 'Bearer',
+        'expires_in': 3600,  # 1 hour in seconds
+        'user': profile_data(user),
+    }
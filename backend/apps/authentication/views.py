@@ -3,14 +3,15 @@ Authentication views for Tours & Travels backend
 """
 
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import AccessToken
 from django.contrib.auth import login
-from django.utils import timezone
 from apps.core.response import APIResponse
 from apps.users.serializers import UserProfileSerializer
+from .throttling import LoginEmailThrottle, LoginIPThrottle, RegisterIPThrottle
+from .tokens import token_response_data
+from .activity import get_login_activity, record_login
 from .serializers import (
     LoginSerializer, 
     RegisterSerializer, 
@@ -24,12 +25,13 @@ logger = logging.getLogger(__name__)
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([LoginIPThrottle, LoginEmailThrottle])
 def customer_login(request):
     """
     Customer login endpoint
     Returns JWT access token for authenticated customers
     """
-    logger.debug(f"Customer login attempt from IP: {request.META.get('REMOTE_ADDR')}")
+    logger.debug("Customer login attempt from IP: %s", request.META.get('REMOTE_ADDR'))
     
     serializer = LoginSerializer(data=request.data, context={'request': request})
     
@@ -38,32 +40,19 @@ def customer_login(request):
         
         # Check if user is customer
         if hasattr(user, 'role') and user.role != 'CUSTOMER':
-            logger.warning(f"Non-customer login attempt: {user.email}")
+            logger.warning("Non-customer login attempt: %s", user.email)
             return APIResponse.error(
                 message="Access denied. Customer account required.",
                 status_code=status.HTTP_403_FORBIDDEN
             )
         
-        # Generate JWT token
-        access_token = AccessToken.for_user(user)
+        # Buffer last login and the audit event; a password upgrade is written now
+        record_login(user, 'CUSTOMER_LOGIN', request)
         
-        # Add custom claims
-        access_token['role'] = user.role
-        access_token['email'] = user.email
+        # Mint the JWT and build the response without a serializer
+        token_data = token_response_data(user)
         
-        # Update last login
-        user.last_login = timezone.now()
-        user.save(update_fields=['last_login'])
-        
-        # Prepare response data
-        token_data = {
-            'access_token': str(access_token),
-            'token_type': 'Bearer',
-            'expires_in': 3600,  # 1 hour in seconds
-            'user': UserProfileSerializer(user).data
-        }
-        
-        logger.info(f"Successful customer login: {user.email}")
+        logger.info("Successful customer login: %s", user.email)
         
         return APIResponse.success(
             data=token_data,
@@ -71,7 +60,7 @@ def customer_login(request):
         )
     
     else:
-        logger.warning(f"Failed login attempt from IP: {request.META.get('REMOTE_ADDR')}")
+        logger.warning("Failed login attempt from IP: %s", request.META.get('REMOTE_ADDR'))
         return APIResponse.error(
             message="Login failed",
             errors=serializer.errors,
@@ -81,38 +70,26 @@ def customer_login(request):
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([LoginIPThrottle, LoginEmailThrottle])
 def admin_login(request):
     """
     Admin login endpoint
     Returns JWT access token for authenticated admin users
     """
-    logger.info(f"Admin login attempt from IP: {request.META.get('REMOTE_ADDR')}")
+    logger.info("Admin login attempt from IP: %s", request.META.get('REMOTE_ADDR'))
     
     serializer = AdminLoginSerializer(data=request.data, context={'request': request})
     
     if serializer.is_valid():
         user = serializer.validated_data['user']
         
-        # Generate JWT token
-        access_token = AccessToken.for_user(user)
-        
-        # Add custom claims
-        access_token['role'] = user.role
-        access_token['email'] = user.email
+        # Buffer last login and the audit event; a password upgrade is written now
+        record_login(user, 'ADMIN_LOGIN', request)
         
-        # Update last login
-        user.last_login = timezone.now()
-        user.save(update_fields=['last_login'])
+        # Mint the JWT and build the response without a serializer
+        token_data = token_response_data(user)
         
-        # Prepare response data
-        token_data = {
-            'access_token': str(access_token),
-            'token_type': 'Bearer',
-            'expires_in': 3600,  # 1 hour in seconds
-            'user': UserProfileSerializer(user).data
-        }
-        
-        logger.info(f"Successful admin login: {user.email}")
+        logger.info("Successful admin login: %s", user.email)
         
         return APIResponse.success(
             data=token_data,
@@ -120,7 +97,7 @@ def admin_login(request):
         )
     
     else:
-        logger.warning(f"Failed admin login attempt from IP: {request.META.get('REMOTE_ADDR')}")
+        logger.warning("Failed admin login attempt from IP: %s", request.META.get('REMOTE_ADDR'))
         return APIResponse.error(
             message="Admin login failed",
             errors=serializer.errors,
@@ -130,34 +107,24 @@ def admin_login(request):
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([RegisterIPThrottle])
 def customer_register(request):
     """
     Customer registration endpoint
     Creates new customer account and returns JWT access token
     """
-    logger.info(f"Customer registration attempt from IP: {request.META.get('REMOTE_ADDR')}")
+    logger.info("Customer registration attempt from IP: %s", request.META.get('REMOTE_ADDR'))
     
     serializer = RegisterSerializer(data=request.data)
     
     if serializer.is_valid():
         user = serializer.save()
+        get_login_activity().record(user.pk, 'REGISTRATION', request.META.get('REMOTE_ADDR'), last_login=False)
         
-        # Generate JWT token for immediate login
-        access_token = AccessToken.for_user(user)
-        
-        # Add custom claims
-        access_token['role'] = user.role
-        access_token['email'] = user.email
-        
-        # Prepare response data
-        token_data = {
-            'access_token': str(access_token),
-            'token_type': 'Bearer',
-            'expires_in': 3600,  # 1 hour in seconds
-            'user': UserProfileSerializer(user).data
-        }
+        # Mint the JWT and build the response without a serializer
+        token_data = token_response_data(user)
         
-        logger.info(f"Successful customer registration: {user.email}")
+        logger.info("Successful customer registration: %s", user.email)
         
         return APIResponse.success(
             data=token_data,
@@ -166,7 +133,7 @@ def customer_register(request):
         )
     
     else:
-        logger.warning(f"Failed registration attempt from IP: {request.META.get('REMOTE_ADDR')}")
+        logger.warning("Failed registration attempt from IP: %s", request.META.get('REMOTE_ADDR'))
         return APIResponse.error(
             message="Registration failed",
             errors=serializer.errors,
@@ -181,7 +148,7 @@ def logout(request):
     Logout endpoint
     Since we're using stateless JWT tokens, this is mainly for logging purposes
     """
-    logger.info(f"Logout request from IP: {request.META.get('REMOTE_ADDR')}")
+    logger.info("Logout request from IP: %s", request.META.get('REMOTE_ADDR'))
     
     return APIResponse.success(
         message="Logout successful"
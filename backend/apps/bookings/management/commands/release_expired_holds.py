@@ -0,0 +1,24 @@
+"""
+Management command to release lapsed booking seat holds
+"""
+
+from django.core.management.base import BaseCommand
+from apps.bookings.reservations import release_expired_holds
+
+
+class Command(BaseCommand):
+    help = 'Expire pending bookings whose seat hold has lapsed and give their seats back'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=500,
+            help='Maximum number of holds released in this run',
+        )
+
+    def handle(self, *args, **options):
+        released = release_expired_holds(limit=options['limit'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Released expired holds: {released} booking(s) expired')
+        )
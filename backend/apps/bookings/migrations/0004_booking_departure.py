@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0003_booking_seat_holds'),
+        ('tours', '0011_tour_departures'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='departure',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='bookings', to='tours.tourdeparture'),
+        ),
+    ]
@@ -1,7 +1,19 @@
 from django.db import models
 from django.conf import settings
 from apps.core.models import BaseModel
-from apps.tours.models import Tour, TourPackage
+from apps.tours.models import Tour, TourPackage, TourDeparture
+
+
+class BookingQuerySet(models.QuerySet):
+    """QuerySet helpers for Booking"""
+
+    def holding_seats(self):
+        """Bookings counted in reserved_seats, the query form of Booking.holds_seats"""
+        return self.filter(
+            models.Q(status__in=('CONFIRMED', 'COMPLETED'))
+            | models.Q(status='PENDING', hold_expires_at__isnull=False)
+        )
+
 
 class Booking(BaseModel):
     STATUS_CHOICES = [
@@ -9,6 +21,7 @@ class Booking(BaseModel):
         ('CONFIRMED', 'Confirmed'),
         ('CANCELLED', 'Cancelled'),
         ('COMPLETED', 'Completed'),
+        ('EXPIRED', 'Expired'),
     ]
 
     user = models.ForeignKey(
@@ -28,6 +41,13 @@ class Booking(BaseModel):
         blank=True,
         related_name='bookings'
     )
+    departure = models.ForeignKey(
+        TourDeparture,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='bookings'
+    )
     travelers_count = models.PositiveIntegerField(default=1)
     total_price = models.DecimalField(max_digits=12, decimal_places=2)
     status = models.CharField(
@@ -36,11 +56,32 @@ class Booking(BaseModel):
         default='PENDING'
     )
     booking_date = models.DateTimeField(auto_now_add=True)
+    hold_expires_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When the seats held by this pending booking are released"
+    )
     special_requests = models.TextField(blank=True, null=True)
 
+    objects = BookingQuerySet.as_manager()
+
     class Meta:
         db_table = 'bookings_booking'
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination for admin lists and per-customer lists
+            models.Index(fields=['-created_at', '-id'], name='bookings_created_id_idx'),
+            models.Index(fields=['user', '-created_at', '-id'], name='bookings_user_created_id_idx'),
+            # Sweeps of lapsed seat holds
+            models.Index(fields=['status', 'hold_expires_at'], name='bookings_hold_expiry_idx'),
+        ]
 
     def __str__(self):
         return f"Booking {self.id} for {self.user.email}"
+
+    @property
+    def holds_seats(self):
+        """Whether this booking's travelers are counted in reserved_seats"""
+        return self.status in ('CONFIRMED', 'COMPLETED') or (
+            self.status == 'PENDING' and self.hold_expires_at is not None
+        )
@@ -0,0 +1,212 @@
+"""
+Seat reservations for Tours & Travels backend
+Holds and releases tour/package seats with conditional UPDATEs so capacity is never oversold
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest, Now
+from django.utils import timezone
+from apps.core.cache import bump_generation
+from apps.tours.availability import availability_family
+from apps.tours.models import Tour, TourPackage, TourDeparture
+from .models import Booking
+
+
+class ReservationError(Exception):
+    """A booking cannot move to the requested reservation state"""
+
+
+class CapacityUnavailable(ReservationError):
+    """Not enough seats left for the requested travelers"""
+
+
+def _seats_changed(*tour_ids):
+    """
+    Drop the cached responses showing these tours' seats
+    The counters change by UPDATE, so neither the save signals nor Tour.updated_at see it
+    """
+    bump_generation('tours', *[availability_family(tour_id) for tour_id in tour_ids])
+
+
+def _take_seats(booking):
+    """
+    Take seats from the booking's inventory counters, or from none of them
+    Each counter is a single UPDATE ... WHERE reserved_seats + n <= capacity, which the
+    database serializes per row. A dated booking draws on its departure alone; an undated
+    one on the tour-wide counter, then its package, always locked in that order
+    """
+    seats = booking.travelers_count
+    if booking.departure_id:
+        taken = bool(TourDeparture.objects.filter(
+            pk=booking.departure_id, reserved_seats__lte=F('capacity') - seats
+        ).update(reserved_seats=F('reserved_seats') + seats, updated_at=Now()))
+    else:
+        with transaction.atomic():
+            taken = bool(Tour.objects.filter(
+                pk=booking.tour_id, reserved_seats__lte=F('max_capacity') - seats
+            ).update(reserved_seats=F('reserved_seats') + seats))
+            if taken and booking.package_id and not TourPackage.objects.filter(
+                pk=booking.package_id, reserved_seats__lte=F('max_participants') - seats
+            ).update(reserved_seats=F('reserved_seats') + seats):
+                # Undo the tour counter with the rest of the transaction
+                transaction.set_rollback(True)
+                taken = False
+    if taken:
+        _seats_changed(booking.tour_id)
+    return taken
+
+
+def _return_seats(booking, notify=True):
+    """Give seats back to the booking's inventory counters"""
+    released = Greatest(F('reserved_seats') - booking.travelers_count, 0)
+    if booking.departure_id:
+        TourDeparture.objects.filter(pk=booking.departure_id).update(
+            reserved_seats=released, updated_at=Now()
+        )
+    else:
+        Tour.objects.filter(pk=booking.tour_id).update(reserved_seats=released)
+        if booking.package_id:
+            TourPackage.objects.filter(pk=booking.package_id).update(reserved_seats=released)
+    if notify:
+        _seats_changed(booking.tour_id)
+
+
+def _create_hold(booking_fields):
+    """Take the seats and insert the booking in one transaction, or do neither"""
+    booking = Booking(
+        status='PENDING',
+        hold_expires_at=timezone.now() + timedelta(seconds=settings.BOOKING_HOLD_TTL),
+        **booking_fields
+    )
+    with transaction.atomic():
+        if not _take_seats(booking):
+            return None
+        booking.save(force_insert=True)
+    return booking
+
+
+def hold_seats(**booking_fields):
+    """
+    Create a PENDING booking holding its seats until hold_expires_at
+    Lapsed holds on the tour are swept and the reservation retried once before giving up
+    """
+    booking = _create_hold(booking_fields)
+    if booking is None and release_expired_holds(tour_id=booking_fields['tour'].pk):
+        booking = _create_hold(booking_fields)
+    if booking is None:
+        raise CapacityUnavailable('Not enough seats available for this tour')
+    return booking
+
+
+def confirm_booking(booking_id):
+    """
+    Move a PENDING booking to CONFIRMED, keeping its seats
+    A live hold confirms with one conditional UPDATE and no row lock. A lapsed hold that
+    was not swept yet is given back and taken again, so it only confirms if the seats
+    are still free
+    """
+    now = timezone.now()
+    if Booking.objects.filter(
+        pk=booking_id, status='PENDING', hold_expires_at__gt=now
+    ).update(status='CONFIRMED', hold_expires_at=None, updated_at=now):
+        booking = Booking.objects.get(pk=booking_id)
+        # The UPDATE bypasses the booking save signals, so apply their effects here
+        bump_generation('tours')
+        return booking
+
+    with transaction.atomic():
+        booking = Booking.objects.select_for_update().get(pk=booking_id)
+        if booking.status == 'CONFIRMED':
+            return booking
+        if booking.status != 'PENDING':
+            raise ReservationError(f'Booking is {booking.get_status_display().lower()}')
+
+        seats_taken = booking.hold_expires_at is not None and booking.hold_expires_at > timezone.now()
+        if not seats_taken:
+            if booking.holds_seats:
+                _return_seats(booking)
+            seats_taken = _take_seats(booking)
+
+        booking.status = 'CONFIRMED' if seats_taken else 'EXPIRED'
+        booking.hold_expires_at = None
+        booking.save()
+
+    # Raised outside the transaction so the expiry and the returned seats are kept
+    if not seats_taken:
+        raise CapacityUnavailable('Seat hold expired and the seats are no longer available')
+    return booking
+
+
+def extend_hold(booking_id, seconds):
+    """
+    Keep a PENDING booking's seats held for at least seconds more, e.g. while its payment settles
+    A PENDING booking holds its seats until swept, so even a lapsed hold can be extended. One
+    without a hold, booked before seats were held, takes its seats first
+    """
+    until = timezone.now() + timedelta(seconds=seconds)
+    if Booking.objects.filter(pk=booking_id, status='PENDING', hold_expires_at__isnull=False).update(
+        hold_expires_at=Greatest(F('hold_expires_at'), Value(until)), updated_at=Now()
+    ):
+        return
+
+    with transaction.atomic():
+        booking = Booking.objects.select_for_update().get(pk=booking_id)
+        if booking.status != 'PENDING':
+            raise ReservationError('Booking is not awaiting payment')
+        if booking.hold_expires_at is None and not _take_seats(booking):
+            raise CapacityUnavailable('Not enough seats available for this tour')
+        Booking.objects.filter(pk=booking_id).update(
+            hold_expires_at=max(booking.hold_expires_at or until, until), updated_at=Now()
+        )
+
+
+def cancel_booking(booking_id):
+    """Cancel a booking and give back any seats it holds"""
+    with transaction.atomic():
+        booking = Booking.objects.select_for_update().get(pk=booking_id)
+        if booking.status in ('CANCELLED', 'EXPIRED'):
+            return booking
+        if booking.status == 'COMPLETED':
+            raise ReservationError('Completed bookings cannot be cancelled')
+        if booking.holds_seats:
+            _return_seats(booking)
+        booking.status = 'CANCELLED'
+        booking.hold_expires_at = None
+        booking.save()
+    return booking
+
+
+def release_booking_seats(booking):
+    """Give back the seats of a booking that is being deleted"""
+    if booking.holds_seats:
+        _return_seats(booking)
+
+
+def release_expired_holds(tour_id=None, limit=500):
+    """
+    Expire lapsed holds and give back their seats, returning how many were released
+    Each hold is claimed by a conditional UPDATE, so concurrent sweepers never release twice
+    """
+    now = timezone.now()
+    lapsed = Booking.objects.filter(status='PENDING', hold_expires_at__lte=now)
+    if tour_id is not None:
+        lapsed = lapsed.filter(tour_id=tour_id)
+
+    released, tour_ids = 0, set()
+    for booking in lapsed.only('pk', 'tour_id', 'package_id', 'departure_id', 'travelers_count')[:limit]:
+        with transaction.atomic():
+            claimed = Booking.objects.filter(
+                pk=booking.pk, status='PENDING', hold_expires_at__lte=now
+            ).update(status='EXPIRED', hold_expires_at=None, updated_at=now)
+            if claimed:
+                _return_seats(booking, notify=False)
+                tour_ids.add(booking.tour_id)
+                released += 1
+    if tour_ids:
+        # One invalidation for the whole sweep
+        _seats_changed(*tour_ids)
+    return released
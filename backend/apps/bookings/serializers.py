@@ -1,3 +1,4 @@
+from django.utils import timezone
 from rest_framework import serializers
 from .models import Booking
 from apps.tours.serializers import TourListSerializer, TourPackageSerializer
@@ -9,12 +10,48 @@ class BookingSerializer(serializers.ModelSerializer):
     class Meta:
         model = Booking
         fields = [
-            'id', 'user', 'tour', 'package', 'travelers_count',
-            'total_price', 'status', 'booking_date',
+            'id', 'user', 'tour', 'package', 'departure', 'travelers_count',
+            'total_price', 'status', 'booking_date', 'hold_expires_at',
             'special_requests', 'tour_details', 'package_details',
             'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'user', 'booking_date', 'created_at', 'updated_at', 'total_price']
+        # Status and seat holds only change through apps.bookings.reservations
+        read_only_fields = [
+            'id', 'user', 'booking_date', 'created_at', 'updated_at', 'total_price',
+            'status', 'hold_expires_at'
+        ]
+
+    def validate(self, data):
+        """Seats are held per tour, package and traveler count, so those are fixed once booked"""
+        if self.instance is not None:
+            for field in ('tour', 'package', 'departure', 'travelers_count'):
+                if field in data and data[field] != getattr(self.instance, field):
+                    raise serializers.ValidationError(
+                        {field: 'Cannot be changed after booking; cancel and book again'}
+                    )
+            return data
+
+        tour = data['tour']
+        package = data.get('package')
+        departure = data.get('departure')
+        if package is not None and package.tour_id != tour.pk:
+            raise serializers.ValidationError({'package': 'Package does not belong to this tour'})
+
+        if departure is None:
+            # Tours with scheduled departures are only sold per date
+            if tour.departures.filter(is_active=True).exists():
+                raise serializers.ValidationError({'departure': 'Choose a departure date for this tour'})
+            return data
+        if departure.tour_id != tour.pk:
+            raise serializers.ValidationError({'departure': 'Departure does not belong to this tour'})
+        if not departure.is_active or departure.departure_date < timezone.localdate():
+            raise serializers.ValidationError({'departure': 'Departure is not open for booking'})
+        # Package tiers cap each group on a dated departure
+        if package is not None and data.get('travelers_count', 1) > package.max_participants:
+            raise serializers.ValidationError(
+                {'travelers_count': f'This package takes at most {package.max_participants} travelers'}
+            )
+        return data
 
     def create(self, validated_data):
         # Calculate total price if not provided (should be calculated on backend ideally)
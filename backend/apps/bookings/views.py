@@ -1,37 +1,67 @@
 from rest_framework import viewsets, status
+from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from .models import Booking
+from .reservations import (
+    CapacityUnavailable, ReservationError, hold_seats, cancel_booking
+)
 from .serializers import BookingSerializer
 from apps.core.response import APIResponse
+from apps.core.pagination import PaginationModeMixin
+from apps.tours.pricing import PriceBook, PricingError
 
-class BookingViewSet(viewsets.ModelViewSet):
+class BookingViewSet(PaginationModeMixin, viewsets.ModelViewSet):
     queryset = Booking.objects.all()
     serializer_class = BookingSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
+        queryset = Booking.objects.select_related('tour__destination', 'package__tour')
         if self.request.user.is_admin:
-            return Booking.objects.all()
-        return Booking.objects.filter(user=self.request.user)
+            return queryset
+        return queryset.filter(user=self.request.user)
 
     def perform_create(self, serializer):
-        # Basic price calculation logic
+        # Priced for the departure date, or today for undated tours
         tour = serializer.validated_data.get('tour')
         package = serializer.validated_data.get('package')
+        departure = serializer.validated_data.get('departure')
         count = serializer.validated_data.get('travelers_count', 1)
-        
-        base_price = tour.base_price
-        if package:
-            base_price += package.price_modifier
-            
-        total_price = base_price * count
-        serializer.save(user=self.request.user, total_price=total_price)
+
+        quote = PriceBook.load([tour.pk], [package.pk] if package else ()).quote(
+            tour.pk,
+            package.pk if package else None,
+            departure.departure_date if departure else None,
+            count,
+        )
+
+        # Seats are taken atomically before the booking row exists
+        serializer.instance = hold_seats(
+            tour=tour,
+            package=package,
+            departure=departure,
+            travelers_count=count,
+            user=self.request.user,
+            total_price=quote.total_price,
+            special_requests=serializer.validated_data.get('special_requests'),
+        )
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         if serializer.is_valid():
-            self.perform_create(serializer)
+            try:
+                self.perform_create(serializer)
+            except PricingError as exc:
+                return APIResponse.error(
+                    message=str(exc),
+                    status_code=status.HTTP_400_BAD_REQUEST
+                )
+            except CapacityUnavailable as exc:
+                return APIResponse.error(
+                    message=str(exc),
+                    status_code=status.HTTP_409_CONFLICT
+                )
             return APIResponse.success(
                 data=serializer.data,
                 message="Booking created successfully",
@@ -42,3 +72,16 @@ class BookingViewSet(viewsets.ModelViewSet):
             errors=serializer.errors,
             status_code=status.HTTP_400_BAD_REQUEST
         )
+
+    @action(detail=True, methods=['post'])
+    def cancel(self, request, pk=None):
+        """Cancel a booking and release its seats"""
+        booking = self.get_object()
+        try:
+            booking = cancel_booking(booking.pk)
+        except ReservationError as exc:
+            return APIResponse.error(message=str(exc), status_code=status.HTTP_409_CONFLICT)
+        return APIResponse.success(
+            data=self.get_serializer(booking).data,
+            message="Booking cancelled successfully"
+        )
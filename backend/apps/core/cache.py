@@ -0,0 +1,124 @@
+"""
+Response caching for Tours & Travels backend
+Read-through cache for public catalogue endpoints with generation-based invalidation
+"""
+
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+from .conditional import is_not_modified, apply_validators, not_modified_response
+
+
+GENERATION_KEY = 'response-cache:generation:{}'
+
+
+def _fresh_generation():
+    """
+    Seed value for a missing generation counter
+    Time-based so an evicted counter never restarts at a value already used
+    """
+    return int(time.time() * 1000)
+
+
+def get_generations(families):
+    """Return the current generation of each cache family"""
+    keys = [GENERATION_KEY.format(family) for family in families]
+    values = cache.get_many(keys)
+    for key in keys:
+        if key not in values:
+            cache.add(key, _fresh_generation(), timeout=None)
+            values[key] = cache.get(key)
+    return [values[key] for key in keys]
+
+
+def _bump(families):
+    for family in families:
+        key = GENERATION_KEY.format(family)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _fresh_generation(), timeout=None)
+
+
+def bump_generation(*families):
+    """
+    Invalidate every cached response of the given families
+    Bumps now and again after commit, so a response cached from pre-commit data is dropped too
+    """
+    _bump(families)
+    transaction.on_commit(lambda: _bump(families))
+
+
+def get_cache_role(request):
+    """Collapse the requesting user into the role the response depends on"""
+    user = request.user
+    if not (user and user.is_authenticated):
+        return 'ANONYMOUS'
+    return getattr(user, 'role', 'CUSTOMER')
+
+
+def build_cache_key(request, families):
+    """Build the response key from path, query params, role, day and family generations"""
+    query = sorted(
+        (key, value)
+        for key in request.query_params
+        for value in request.query_params.getlist(key)
+    )
+    raw = '|'.join([
+        request.path,
+        repr(query),
+        get_cache_role(request),
+        # Date-dependent fields (offer validity) roll over at day boundaries
+        timezone.now().date().isoformat(),
+        ':'.join(str(generation) for generation in get_generations(families)),
+    ])
+    return 'response-cache:' + hashlib.md5(raw.encode('utf-8')).hexdigest()
+
+
+def cache_response(view_method):
+    """Serve a viewset action through the versioned response cache"""
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        timeout = settings.RESPONSE_CACHE_TIMEOUT
+        if not timeout or not self.cache_families:
+            return view_method(self, request, *args, **kwargs)
+
+        key = build_cache_key(request, self.cache_families)
+        cached = cache.get(key)
+        if cached is not None:
+            if cached['validators'] and is_not_modified(request, cached['validators']):
+                return not_modified_response(cached['validators'])
+            response = Response(cached['data'], status=status.HTTP_200_OK)
+            return apply_validators(response, cached['validators'])
+
+        response = view_method(self, request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            validators = {
+                name: response[name] for name in ('ETag', 'Last-Modified') if response.has_header(name)
+            }
+            cache.set(key, {'data': response.data, 'validators': validators}, timeout=timeout)
+        return response
+    return wrapper
+
+
+class CachedResponseMixin:
+    """
+    Cache list and retrieve responses for viewsets over catalogue data
+    Subclasses name the cache families whose generations key their responses
+    """
+    cache_families = ()
+
+    @cache_response
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @cache_response
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
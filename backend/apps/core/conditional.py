@@ -0,0 +1,57 @@
+"""
+Conditional GET support for Tours & Travels backend
+Builds ETag/Last-Modified validators and answers If-None-Match/If-Modified-Since
+"""
+
+import hashlib
+
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def make_etag(*parts):
+    """Build a strong ETag from the values the representation depends on"""
+    digest = hashlib.md5('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+    return f'"{digest}"'
+
+
+def build_validators(etag, last_modified=None):
+    """Return the validator headers for a response"""
+    headers = {'ETag': etag}
+    if last_modified is not None:
+        headers['Last-Modified'] = http_date(last_modified.timestamp())
+    return headers
+
+
+def is_not_modified(request, headers):
+    """
+    Evaluate the request preconditions against the validators
+    If-None-Match takes precedence; If-Modified-Since is only used without it
+    """
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        if if_none_match.strip() == '*':
+            return True
+        etags = [etag[2:] if etag.startswith('W/') else etag for etag in parse_etags(if_none_match)]
+        return headers.get('ETag') in etags
+
+    if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+    last_modified = parse_http_date_safe(headers.get('Last-Modified', ''))
+    if if_modified_since is not None and last_modified is not None:
+        return last_modified <= if_modified_since
+    return False
+
+
+def apply_validators(response, headers):
+    """Attach validators to a response; representations also vary by credentials"""
+    for name, value in headers.items():
+        response[name] = value
+    patch_vary_headers(response, ['Authorization'])
+    return response
+
+
+def not_modified_response(headers):
+    """Return an empty 304 carrying the current validators"""
+    return apply_validators(Response(status=status.HTTP_304_NOT_MODIFIED), headers)
@@ -0,0 +1,167 @@
+"""
+Core pagination for Tours & Travels backend
+Provides pagination classes shared by all API endpoints
+"""
+
+import base64
+import json
+from functools import partial
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param, remove_query_param
+from .response import APIResponse
+
+
+class KnownCountPaginator(Paginator):
+    """
+    Django paginator that can be primed with a row count computed elsewhere
+    Saves the COUNT(*) when the view already aggregated the same queryset
+    """
+
+    def __init__(self, object_list, per_page, orphans=0, allow_empty_first_page=True, count=None):
+        super().__init__(object_list, per_page, orphans, allow_empty_first_page)
+        if count is not None:
+            self.count = count
+
+
+class StandardPageNumberPagination(PageNumberPagination):
+    """Page number pagination reusing the view's known row count when available"""
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.django_paginator_class = partial(
+            KnownCountPaginator,
+            count=getattr(view, 'known_row_count', None)
+        )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_page_info(self):
+        """Pagination block for the APIResponse.paginated envelope"""
+        return {
+            'count': self.page.paginator.count,
+            'total_pages': self.page.paginator.num_pages,
+            'current_page': self.page.number,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'page_size': self.page_size
+        }
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination on (created_at, id), newest first
+    Each page is an index range scan from the cursor: no COUNT(*) and no OFFSET
+    """
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self):
+        self.page_size = api_settings.PAGE_SIZE
+
+    def encode_cursor(self, direction, instance):
+        payload = json.dumps({
+            'd': direction,
+            'c': instance.created_at.isoformat(),
+            'i': str(instance.pk),
+        })
+        return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            created_at = parse_datetime(payload['c'])
+            if payload['d'] not in ('n', 'p') or created_at is None:
+                raise ValueError
+            return payload['d'], created_at, model._meta.pk.to_python(payload['i'])
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        cursor = self.decode_cursor(request, queryset.model)
+
+        if cursor and cursor[0] == 'p':
+            # Walk backwards from the cursor, then restore newest-first order
+            _, created_at, pk = cursor
+            queryset = queryset.filter(
+                Q(created_at__gt=created_at) | Q(created_at=created_at, pk__gt=pk)
+            ).order_by('created_at', 'pk')
+            rows = list(queryset[:self.page_size + 1])
+            self.has_previous = len(rows) > self.page_size
+            self.has_next = True
+            rows = rows[:self.page_size][::-1]
+        else:
+            if cursor:
+                _, created_at, pk = cursor
+                queryset = queryset.filter(
+                    Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk)
+                )
+            rows = list(queryset.order_by('-created_at', '-pk')[:self.page_size + 1])
+            self.has_next = len(rows) > self.page_size
+            self.has_previous = cursor is not None
+            rows = rows[:self.page_size]
+
+        self.page = rows
+        return rows
+
+    def get_next_link(self):
+        if not (self.has_next and self.page):
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor('n', self.page[-1]))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        url = self.request.build_absolute_uri()
+        if not self.page:
+            return remove_query_param(url, self.cursor_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor('p', self.page[0]))
+
+    def get_page_info(self):
+        """Pagination block for the APIResponse.paginated envelope (no total count)"""
+        return {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'page_size': self.page_size,
+        }
+
+    def get_paginated_response(self, data):
+        return APIResponse.paginated(data=data, page_info=self.get_page_info())
+
+
+class PaginationModeMixin:
+    """
+    Let a viewset serve its list with keyset pagination instead of page numbers
+    Enabled per viewset with cursor_pagination = True, or per request with ?pagination=cursor
+    """
+    cursor_pagination = False
+    cursor_pagination_actions = ('list',)
+    pagination_mode_query_param = 'pagination'
+
+    def use_cursor_pagination(self):
+        if getattr(self, 'action', None) not in self.cursor_pagination_actions:
+            return False
+        mode = self.request.query_params.get(self.pagination_mode_query_param)
+        if mode:
+            return mode == 'cursor'
+        return self.cursor_pagination or KeysetPagination.cursor_query_param in self.request.query_params
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if self.use_cursor_pagination():
+                self._paginator = KeysetPagination()
+            elif self.pagination_class is None:
+                self._paginator = None
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
@@ -7,6 +7,17 @@ from rest_framework import permissions
 from rest_framework.permissions import BasePermission
 
 
+def is_owner(obj, user):
+    """
+    Check whether user owns obj, or return None if obj has no user or owner field
+    Compares foreign key columns, so neither user row is loaded
+    """
+    for field in ('user_id', 'owner_id'):
+        if hasattr(obj, field):
+            return getattr(obj, field) is not None and getattr(obj, field) == user.pk
+    return None
+
+
 class BasePermission(BasePermission):
     """
     Base permission class with common functionality
@@ -66,13 +77,10 @@ class IsCustomerUser(BasePermission):
             return False
         
         # Check if object belongs to the user
-        if hasattr(obj, 'user'):
-            return obj.user == request.user
-        elif hasattr(obj, 'owner'):
-            return obj.owner == request.user
+        owned = is_owner(obj, request.user)
         
         # If no ownership field, allow access (will be restricted by queryset)
-        return True
+        return True if owned is None else owned
 
 
 class IsOwnerOrAdmin(BasePermission):
@@ -94,12 +102,7 @@ class IsOwnerOrAdmin(BasePermission):
             return True
         
         # Check if user owns the object
-        if hasattr(obj, 'user'):
-            return obj.user == request.user
-        elif hasattr(obj, 'owner'):
-            return obj.owner == request.user
-        
-        return False
+        return bool(is_owner(obj, request.user))
 
 
 class ReadOnlyPermission(BasePermission):
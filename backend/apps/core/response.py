@@ -4,6 +4,8 @@ Consistent API response formatting utilities
 
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.utils.encoders import JSONEncoder
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 
 
@@ -47,4 +49,22 @@ class APIResponse:
             'timestamp': timezone.now(),
             'data': data,
             'pagination': page_info,
-        }, status=status.HTTP_200_OK)
\ No newline at end of file
+        }, status=status.HTTP_200_OK)
+
+    @staticmethod
+    def streamed(items, message="Success", status_code=status.HTTP_200_OK):
+        """Format successful API response, encoding the data list item by item as it is sent"""
+        encoder = JSONEncoder()
+        head = encoder.encode({
+            'success': True,
+            'message': message,
+            'timestamp': timezone.now(),
+        })
+
+        def chunks():
+            yield head[:-1] + ', "data": ['
+            for index, item in enumerate(items):
+                yield (', ' if index else '') + encoder.encode(item)
+            yield ']}'
+
+        return StreamingHttpResponse(chunks(), status=status_code, content_type='application/json')
@@ -5,11 +5,19 @@ Provides base viewsets with common functionality
 
 from rest_framework import viewsets, status
 from rest_framework.response import Response
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Count, Max
 from django.utils import timezone
+from .cache import get_cache_role, get_generations
+from .pagination import PaginationModeMixin, KeysetPagination
+from .conditional import (
+    make_etag, build_validators, is_not_modified,
+    apply_validators, not_modified_response
+)
 from .response import APIResponse
 
 
-class BaseViewSet(viewsets.ModelViewSet):
+class BaseViewSet(PaginationModeMixin, viewsets.ModelViewSet):
     """
     Base viewset with common functionality for all API endpoints
     Provides consistent response formatting and error handling
@@ -35,26 +43,88 @@ class BaseViewSet(viewsets.ModelViewSet):
     def list(self, request, *args, **kwargs):
         """List instances with consistent response format"""
         queryset = self.filter_queryset(self.get_queryset())
+        validators = self.get_list_validators(queryset)
+        if validators and is_not_modified(request, validators):
+            return not_modified_response(validators)
+
         page = self.paginate_queryset(queryset)
         
         if page is not None:
             serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-        
-        serializer = self.get_serializer(queryset, many=True)
-        return APIResponse.success(
-            data=serializer.data,
-            message=f"{self.get_model_name()} list retrieved successfully"
-        )
+            response = self.get_paginated_response(serializer.data)
+        else:
+            serializer = self.get_serializer(queryset, many=True)
+            response = APIResponse.success(
+                data=serializer.data,
+                message=f"{self.get_model_name()} list retrieved successfully"
+            )
+        return apply_validators(response, validators) if validators else response
     
     def retrieve(self, request, *args, **kwargs):
         """Retrieve a single instance with consistent response format"""
         instance = self.get_object()
+        validators = self.get_instance_validators(instance)
+        if validators and is_not_modified(request, validators):
+            return not_modified_response(validators)
+
         serializer = self.get_serializer(instance)
-        return APIResponse.success(
+        response = APIResponse.success(
             data=serializer.data,
             message=f"{self.get_model_name()} retrieved successfully"
         )
+        return apply_validators(response, validators) if validators else response
+
+    def supports_conditional_get(self, model):
+        """Conditional GET needs the updated_at timestamp from BaseModel"""
+        try:
+            model._meta.get_field('updated_at')
+        except FieldDoesNotExist:
+            return False
+        return True
+
+    def get_validator_context(self):
+        """
+        Request-level inputs shared by every validator
+        Cache generations cover related rows that do not touch this model's updated_at
+        """
+        return [
+            self.request.get_full_path(),
+            get_cache_role(self.request),
+            *get_generations(getattr(self, 'cache_families', ())),
+        ]
+
+    def get_list_validators(self, queryset):
+        """
+        ETag for a list from max(updated_at) and row count
+        No Last-Modified: deletes and generation bumps change the list without moving
+        max(updated_at), so If-Modified-Since would answer 304 for a stale list
+        """
+        if not self.supports_conditional_get(queryset.model):
+            return None
+        # Keyset pages exist to avoid whole-table aggregates
+        if isinstance(self.paginator, KeysetPagination):
+            return None
+        summary = queryset.order_by().aggregate(
+            last_modified=Max('updated_at'),
+            count=Count('pk')
+        )
+        # The paginator reuses this count instead of issuing its own COUNT(*)
+        self.known_row_count = summary['count']
+        etag = make_etag(
+            queryset.model._meta.label, summary['count'], summary['last_modified'],
+            *self.get_validator_context()
+        )
+        return build_validators(etag)
+
+    def get_instance_validators(self, instance):
+        """ETag/Last-Modified for a single instance from its updated_at"""
+        if not self.supports_conditional_get(type(instance)):
+            return None
+        etag = make_etag(
+            instance._meta.label, instance.pk, instance.updated_at,
+            *self.get_validator_context()
+        )
+        return build_validators(etag, instance.updated_at)
     
     def update(self, request, *args, **kwargs):
         """Update an instance with consistent response format"""
@@ -77,17 +147,9 @@ class BaseViewSet(viewsets.ModelViewSet):
     
     def get_paginated_response(self, data):
         """Return a consistent paginated response"""
-        page_info = {
-            'count': self.paginator.page.paginator.count,
-            'total_pages': self.paginator.page.paginator.num_pages,
-            'current_page': self.paginator.page.number,
-            'next': self.paginator.get_next_link(),
-            'previous': self.paginator.get_previous_link(),
-            'page_size': self.paginator.page_size
-        }
         return APIResponse.paginated(
             data=data,
-            page_info=page_info,
+            page_info=self.paginator.get_page_info(),
             message=f"{self.get_model_name()} list retrieved successfully"
         )
 
@@ -0,0 +1,117 @@
+"""
+Payment gateways for Tours & Travels backend
+Asynchronous gateway interface, the configured gateway loader and an in-process fake gateway
+"""
+
+import asyncio
+import hashlib
+import hmac
+import json
+import random
+import uuid
+from abc import ABC, abstractmethod
+from collections import namedtuple
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+# status is 'SUCCESS', 'DECLINED' or 'PROCESSING' (settled later through a webhook)
+ChargeResult = namedtuple('ChargeResult', ['status', 'reference', 'message'])
+
+WebhookEvent = namedtuple('WebhookEvent', ['reference', 'status', 'message'])
+
+
+class GatewayError(Exception):
+    """A transient gateway failure; the charge may be retried with the same idempotency key"""
+
+
+class PaymentGateway(ABC):
+    """
+    Interface of a payment gateway
+    charge() is a coroutine so a settlement worker can keep many charges in flight; a
+    gateway missing a method fails when it is built, not halfway through a settlement
+    """
+
+    @abstractmethod
+    async def charge(self, idempotency_key, amount, method):
+        """Charge an amount, returning a ChargeResult or raising GatewayError"""
+
+    @abstractmethod
+    def verify_webhook(self, body, headers):
+        """Whether a webhook request really comes from the gateway"""
+
+    @abstractmethod
+    def parse_webhook(self, body):
+        """Decode a verified webhook body into a WebhookEvent"""
+
+
+class FakeGateway(PaymentGateway):
+    """
+    In-process stand-in gateway for development and load tests
+    Each charge sleeps for latency +/- jitter seconds, then fails transiently with
+    error_rate, is declined with decline_rate, is left for a webhook with processing_rate,
+    or succeeds. Webhooks are signed with HMAC-SHA256 of the body under webhook_secret
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, decline_rate=0.0, error_rate=0.0,
+                 processing_rate=0.0, webhook_secret='', seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.decline_rate = decline_rate
+        self.error_rate = error_rate
+        self.processing_rate = processing_rate
+        self.webhook_secret = webhook_secret or settings.PAYMENT_WEBHOOK_SECRET
+        self.random = random.Random(seed)
+        self.charges = {}
+
+    async def charge(self, idempotency_key, amount, method):
+        delay = max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+        if delay:
+            await asyncio.sleep(delay)
+        # Like a real gateway, a repeated key returns the first outcome instead of charging again
+        if idempotency_key in self.charges:
+            return self.charges[idempotency_key]
+
+        roll = self.random.random()
+        if roll < self.error_rate:
+            raise GatewayError('Gateway timed out')
+        roll -= self.error_rate
+        reference = f"TXN-{uuid.uuid4().hex[:10].upper()}"
+        if roll < self.decline_rate:
+            result = ChargeResult('DECLINED', reference, 'Card declined')
+        elif roll < self.decline_rate + self.processing_rate:
+            result = ChargeResult('PROCESSING', reference, 'Awaiting bank confirmation')
+        else:
+            result = ChargeResult('SUCCESS', reference, '')
+        self.charges[idempotency_key] = result
+        return result
+
+    def sign(self, body):
+        """Signature the fake gateway puts on a webhook body"""
+        return hmac.new(self.webhook_secret.encode(), body, hashlib.sha256).hexdigest()
+
+    def verify_webhook(self, body, headers):
+        signature = headers.get('X-Gateway-Signature', '')
+        return bool(self.webhook_secret) and hmac.compare_digest(signature, self.sign(body))
+
+    def parse_webhook(self, body):
+        payload = json.loads(body)
+        return WebhookEvent(payload['reference'], payload['status'], payload.get('message', ''))
+
+
+_gateway = None
+
+
+def get_gateway():
+    """Process-wide gateway built from PAYMENT_GATEWAY and PAYMENT_GATEWAY_OPTIONS"""
+    global _gateway
+    if _gateway is None:
+        _gateway = import_string(settings.PAYMENT_GATEWAY)(**settings.PAYMENT_GATEWAY_OPTIONS)
+    return _gateway
+
+
+def reset_gateway():
+    """Discard the process-wide gateway so the next call builds it from settings"""
+    global _gateway
+    _gateway = None
@@ -0,0 +1,121 @@
+"""
+Invoice generation for Tours & Travels backend
+Invoices confirmed bookings in bulk with gap-free numbers allocated in blocks, and renders invoice documents
+"""
+
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef
+from django.template.loader import get_template
+from django.utils import timezone
+from apps.bookings.models import Booking
+from .models import Invoice, InvoiceSequence, Payment
+
+
+def invoice_series(day=None):
+    """Numbering series of a day: the prefix and the year, restarting each January"""
+    day = day or timezone.localdate()
+    return f"{settings.INVOICE_NUMBER_PREFIX}-{day.year}"
+
+
+def format_invoice_number(series, number):
+    """Printed invoice number, e.g. INV-2026-0000042"""
+    return f"{series}-{number:07d}"
+
+
+def lock_sequence(series):
+    """
+    Lock a numbering series until the transaction ends, creating it on first use
+    Holding the lock also serializes concurrent invoicing runs
+    """
+    sequence, _ = InvoiceSequence.objects.select_for_update().get_or_create(series=series)
+    return sequence
+
+
+def allocate_invoice_numbers(sequence, count):
+    """Reserve count consecutive numbers of a locked series, in the transaction that uses them"""
+    InvoiceSequence.objects.filter(pk=sequence.pk).update(
+        next_number=F('next_number') + count, updated_at=timezone.now()
+    )
+    first = sequence.next_number
+    sequence.next_number += count
+    return range(first, first + count)
+
+
+def uninvoiced_bookings():
+    """Confirmed bookings without an invoice, flagged with whether a payment succeeded"""
+    return Booking.objects.filter(status='CONFIRMED').filter(
+        ~Exists(Invoice.objects.filter(booking=OuterRef('pk')))
+    ).annotate(
+        paid=Exists(Payment.objects.filter(booking=OuterRef('pk'), status='SUCCESS'))
+    ).order_by('created_at', 'pk')
+
+
+def invoice_batch(series, batch_size, due_date):
+    """
+    Invoice up to batch_size uninvoiced bookings in one transaction, returning the invoices
+    Bookings are picked after the sequence lock is taken, so concurrent runs never
+    invoice the same booking twice
+    """
+    with transaction.atomic():
+        sequence = lock_sequence(series)
+        rows = list(uninvoiced_bookings().values_list('pk', 'total_price', 'paid')[:batch_size])
+        if not rows:
+            return []
+        numbers = allocate_invoice_numbers(sequence, len(rows))
+        return Invoice.objects.bulk_create([
+            Invoice(
+                booking_id=booking_id,
+                invoice_number=format_invoice_number(series, number),
+                amount=total_price,
+                status='PAID' if paid else 'UNPAID',
+                due_date=due_date,
+            )
+            for (booking_id, total_price, paid), number in zip(rows, numbers)
+        ])
+
+
+def generate_invoices(batch_size=None, limit=None):
+    """
+    Invoice every confirmed booking that has none yet, yielding each committed batch
+    Each batch is a sequence lock, one SELECT, one sequence UPDATE and a multi-row INSERT
+    """
+    batch_size = batch_size or settings.INVOICE_BATCH_SIZE
+    series = invoice_series()
+    due_date = timezone.localdate() + timedelta(days=settings.INVOICE_DUE_DAYS)
+    remaining = limit
+    while remaining is None or remaining > 0:
+        size = batch_size if remaining is None else min(batch_size, remaining)
+        invoices = invoice_batch(series, size, due_date)
+        if not invoices:
+            return
+        if remaining is not None:
+            remaining -= len(invoices)
+        yield invoices
+
+
+def render_invoice(invoice, booking=None, template=None):
+    """Render the HTML document of an invoice"""
+    template = template or get_template('payments/invoice.html')
+    booking = booking or invoice.booking
+    return template.render({'invoice': invoice, 'booking': booking})
+
+
+def render_invoice_documents(invoices, directory):
+    """
+    Write the documents of a batch of invoices to directory as <invoice number>.html
+    The template is compiled once and the bookings are loaded in one query
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    template = get_template('payments/invoice.html')
+    bookings = Booking.objects.select_related('user', 'tour', 'package').in_bulk(
+        [invoice.booking_id for invoice in invoices]
+    )
+    for invoice in invoices:
+        document = render_invoice(invoice, bookings[invoice.booking_id], template)
+        (directory / f"{invoice.invoice_number}.html").write_text(document, encoding='utf-8')
+    return len(invoices)
@@ -0,0 +1,52 @@
+"""
+Management command to invoice confirmed bookings in bulk
+"""
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from apps.payments.invoicing import generate_invoices, render_invoice_documents
+
+
+class Command(BaseCommand):
+    help = 'Create numbered invoices for all confirmed bookings that have none, optionally rendering documents'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Bookings invoiced per transaction (default INVOICE_BATCH_SIZE)',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=None,
+            help='Maximum number of invoices created in this run',
+        )
+        parser.add_argument(
+            '--render',
+            action='store_true',
+            help='Write an HTML document per invoice to --output-dir',
+        )
+        parser.add_argument(
+            '--output-dir',
+            default=str(settings.MEDIA_ROOT / 'invoices'),
+            help='Directory for rendered invoice documents',
+        )
+
+    def handle(self, *args, **options):
+        created = 0
+        started = time.monotonic()
+        for invoices in generate_invoices(batch_size=options['batch_size'], limit=options['limit']):
+            created += len(invoices)
+            if options['render']:
+                render_invoice_documents(invoices, options['output_dir'])
+            self.stdout.write(f"  {created} invoice(s), last {invoices[-1].invoice_number}")
+
+        elapsed = time.monotonic() - started
+        rate = created / elapsed if elapsed else 0.0
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {created} invoice(s) in {elapsed:.2f}s ({rate:.0f}/s)"
+        ))
@@ -0,0 +1,42 @@
+"""
+Management command to process pending refunds
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from apps.payments.refunds import process_refunds
+
+
+class Command(BaseCommand):
+    help = 'Process pending refunds in locked chunks, marking payments refunded and releasing booking seats'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=settings.REFUND_CHUNK_SIZE,
+            help='Refunds claimed per transaction',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Threads draining chunks in parallel (PostgreSQL; SQLite serializes writers)',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=None,
+            help='Stop after claiming about this many refunds',
+        )
+
+    def handle(self, *args, **options):
+        metrics = process_refunds(
+            chunk_size=options['chunk_size'], workers=options['workers'], limit=options['limit']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed refunds: {metrics.get('processed', 0)} processed, "
+            f"{metrics.get('rejected', 0)} rejected, {metrics.get('payments_refunded', 0)} payment(s) refunded "
+            f"in {metrics.get('chunks', 0)} chunk(s), {metrics['elapsed']:.2f}s "
+            f"({metrics['per_second']:.1f}/s)"
+        ))
@@ -0,0 +1,58 @@
+"""
+Management command to settle pending payments through the payment gateway
+"""
+
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+from apps.payments.settlement import settle_due_payments
+
+
+class Command(BaseCommand):
+    help = 'Charge due pending payments through the configured gateway and apply the outcomes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Payments claimed per batch (default PAYMENT_SETTLEMENT_BATCH_SIZE)',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=None,
+            help='Gateway charges in flight at once (default PAYMENT_SETTLEMENT_CONCURRENCY)',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep settling batches, polling every --interval seconds when idle',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=1.0,
+            help='Seconds to wait between polls when the outbox is empty',
+        )
+
+    def handle(self, *args, **options):
+        totals = Counter()
+        started = time.monotonic()
+        while True:
+            outcomes = settle_due_payments(limit=options['batch_size'], concurrency=options['concurrency'])
+            totals.update(outcomes)
+            if not outcomes['claimed']:
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+
+        elapsed = time.monotonic() - started
+        rate = totals['claimed'] / elapsed if elapsed else 0.0
+        self.stdout.write(self.style.SUCCESS(
+            f"Settled {totals['claimed']} payment(s) in {elapsed:.2f}s ({rate:.1f}/s): "
+            f"{totals['succeeded']} succeeded, {totals['declined']} declined, "
+            f"{totals['processing']} awaiting webhook, {totals['retried']} retried, "
+            f"{totals['failed']} failed"
+        ))
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:19
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0004_payment_settlement_outbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InvoiceSequence',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, help_text='Unique identifier for this record', primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Timestamp when this record was created')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='Timestamp when this record was last updated')),
+                ('series', models.CharField(max_length=20, unique=True)),
+                ('next_number', models.PositiveBigIntegerField(default=1)),
+            ],
+            options={
+                'verbose_name': 'Invoice Sequence',
+                'verbose_name_plural': 'Invoice Sequences',
+                'db_table': 'payments_invoice_sequence',
+            },
+        ),
+    ]
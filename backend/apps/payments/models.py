@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.db import models
 from apps.core.models import BaseModel
 from apps.bookings.models import Booking
@@ -38,6 +39,24 @@ class Invoice(BaseModel):
         return f"Invoice {self.invoice_number} for Booking {self.booking.id}"
 
 
+class InvoiceSequence(BaseModel):
+    """
+    Next invoice number of a numbering series
+    Numbers are handed out in blocks under a row lock, inside the transaction that uses
+    them, so a rolled-back block is handed out again and the series stays gap-free
+    """
+    series = models.CharField(max_length=20, unique=True)
+    next_number = models.PositiveBigIntegerField(default=1)
+
+    class Meta:
+        db_table = 'payments_invoice_sequence'
+        verbose_name = 'Invoice Sequence'
+        verbose_name_plural = 'Invoice Sequences'
+
+    def __str__(self):
+        return f"{self.series}: next {self.next_number}"
+
+
 class Refund(BaseModel):
     """
     Refund model for payments
@@ -106,10 +125,51 @@ class Payment(BaseModel):
     )
     transaction_id = models.CharField(max_length=100, unique=True, blank=True, null=True)
     payment_date = models.DateTimeField(auto_now_add=True)
+    # Settlement outbox: PENDING payments are charged by apps.payments.settlement once
+    # next_attempt_at is due; a null next_attempt_at waits for the gateway webhook
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(null=True, blank=True)
+    failure_reason = models.CharField(max_length=255, blank=True)
 
     class Meta:
         db_table = 'payments_payment'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='payments_created_id_idx'),
+            models.Index(fields=['status', 'next_attempt_at'], name='payments_outbox_idx'),
+        ]
 
     def __str__(self):
         return f"Payment {self.id} for Booking {self.booking.id}"
+
+
+class IdempotencyKey(BaseModel):
+    """
+    Client-supplied Idempotency-Key of a payment request
+    The unique (user, key) pair claims the request, so a retried request replays its payment
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name='payment_idempotency_keys',
+        on_delete=models.CASCADE
+    )
+    key = models.CharField(max_length=255)
+    request_fingerprint = models.CharField(max_length=64)
+    payment = models.OneToOneField(
+        Payment,
+        related_name='idempotency_key',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True
+    )
+
+    class Meta:
+        db_table = 'payments_idempotency_key'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='payments_idempotency_user_key_uniq'),
+        ]
+        verbose_name = 'Idempotency Key'
+        verbose_name_plural = 'Idempotency Keys'
+
+    def __str__(self):
+        return f"Idempotency key {self.key} for {self.user_id}"
@@ -0,0 +1,82 @@
+"""
+Payment processing for Tours & Travels backend
+Accepts payments into the settlement outbox in one transaction, replaying retried requests by Idempotency-Key
+"""
+
+import hashlib
+import json
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from apps.bookings.models import Booking
+from apps.bookings.reservations import ReservationError, extend_hold
+from .models import IdempotencyKey, Payment
+
+
+# Request fields a retried payment must repeat unchanged
+FINGERPRINT_FIELDS = ('booking', 'amount', 'payment_method')
+
+
+class IdempotencyConflict(Exception):
+    """An Idempotency-Key was reused for a different payment request"""
+
+
+def request_fingerprint(data):
+    """Digest of the payment fields of a request body"""
+    payload = {field: str(data.get(field, '')) for field in FINGERPRINT_FIELDS}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def find_replay(user, key, fingerprint):
+    """
+    Return the payment already recorded for a key, or None for a new key
+    Raises IdempotencyConflict when the key was used for a different request
+    """
+    record = IdempotencyKey.objects.select_related('payment').filter(user=user, key=key).first()
+    if record is None:
+        return None
+    if record.request_fingerprint != fingerprint:
+        raise IdempotencyConflict('Idempotency-Key was already used for a different payment')
+    return record.payment
+
+
+def process_payment(user, booking, amount, payment_method, key=None, fingerprint=None):
+    """
+    Record a PENDING payment for the settlement worker, returning (payment, replayed)
+    The key row, the extended seat hold and the payment commit together, so a failed
+    attempt leaves nothing behind and can be retried with the same key. A concurrent
+    request holding the same key waits on the unique index and then replays its payment
+    """
+    try:
+        with transaction.atomic():
+            record = None
+            if key:
+                record = IdempotencyKey.objects.create(
+                    user=user, key=key, request_fingerprint=fingerprint
+                )
+            # Concurrent requests for one booking queue on its row lock, so only the first
+            # passes the check below
+            locked = Booking.objects.select_for_update().only('status').get(pk=booking.pk)
+            if locked.status in ('CONFIRMED', 'COMPLETED'):
+                raise ReservationError('Booking already paid')
+            if Payment.objects.filter(booking=booking, status__in=('PENDING', 'SUCCESS')).exists():
+                raise ReservationError('Booking already has a payment')
+            # Seats stay held while the gateway settles the charge
+            extend_hold(booking.pk, settings.PAYMENT_SETTLEMENT_HOLD)
+            payment = Payment.objects.create(
+                booking=booking,
+                amount=amount,
+                payment_method=payment_method,
+                status='PENDING',
+                next_attempt_at=timezone.now(),
+            )
+            if record is not None:
+                record.payment = payment
+                record.save(update_fields=['payment', 'updated_at'])
+    except IntegrityError:
+        payment = find_replay(user, key, fingerprint) if key else None
+        if payment is None:
+            raise
+        return payment, True
+    return payment, False
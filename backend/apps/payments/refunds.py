@@ -0,0 +1,124 @@
+"""
+Refund processing for Tours & Travels backend
+Drains PENDING refunds in chunks claimed with SKIP LOCKED, keeping payments and booking seats consistent
+"""
+
+import logging
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.utils import timezone
+from apps.bookings.reservations import ReservationError, cancel_booking
+from .models import Payment, Refund
+
+logger = logging.getLogger('apps.payments')
+
+
+def process_refund_chunk(chunk_size):
+    """
+    Claim and settle up to chunk_size PENDING refunds in one transaction, returning outcome counts
+    Claimed rows stay locked until commit and other workers skip them. A refund is
+    rejected unless its payment succeeded and the refunds processed so far leave room for
+    it; a payment refunded in full becomes REFUNDED and its booking is cancelled, giving
+    its seats back
+    """
+    outcomes = Counter()
+    now = timezone.now()
+    with transaction.atomic():
+        refunds = list(
+            Refund.objects.select_for_update(skip_locked=True)
+            .filter(status='PENDING')
+            .only('id', 'payment_id', 'amount')
+            .order_by('created_at')[:chunk_size]
+        )
+        if not refunds:
+            return outcomes
+
+        # Lock the payments too, in key order, so concurrent chunks refunding the same
+        # payment read each other's committed totals
+        payment_ids = {refund.payment_id for refund in refunds}
+        payments = {
+            payment.pk: payment for payment in Payment.objects.select_for_update()
+            .filter(pk__in=payment_ids).only('id', 'booking_id', 'amount', 'status').order_by('pk')
+        }
+        refunded = dict(
+            Refund.objects.filter(payment_id__in=payment_ids, status='PROCESSED')
+            .values('payment_id').annotate(total=Sum('amount')).values_list('payment_id', 'total')
+        )
+
+        processed, rejected, fully_refunded = [], [], {}
+        for refund in refunds:
+            payment = payments[refund.payment_id]
+            total = refunded.get(payment.pk) or Decimal('0')
+            if payment.status != 'SUCCESS' or total + refund.amount > payment.amount:
+                rejected.append(refund.pk)
+                continue
+            processed.append(refund.pk)
+            refunded[payment.pk] = total + refund.amount
+            if refunded[payment.pk] == payment.amount:
+                fully_refunded[payment.pk] = payment.booking_id
+
+        Refund.objects.filter(pk__in=processed).update(status='PROCESSED', processed_at=now, updated_at=now)
+        Refund.objects.filter(pk__in=rejected).update(status='REJECTED', processed_at=now, updated_at=now)
+        Payment.objects.filter(pk__in=fully_refunded, status='SUCCESS').update(status='REFUNDED', updated_at=now)
+        for booking_id in set(fully_refunded.values()):
+            try:
+                cancel_booking(booking_id)
+            except ReservationError:
+                # Completed trips are refunded without touching capacity
+                outcomes['completed_bookings'] += 1
+
+    outcomes.update(claimed=len(refunds), processed=len(processed), rejected=len(rejected),
+                    payments_refunded=len(fully_refunded))
+    return outcomes
+
+
+def _drain(chunk_size, limit, totals, lock):
+    """Process chunks until none are left or the shared limit is reached"""
+    try:
+        while True:
+            with lock:
+                if limit is not None and totals['claimed'] >= limit:
+                    return
+            outcomes = process_refund_chunk(chunk_size)
+            if not outcomes['claimed']:
+                return
+            with lock:
+                totals.update(outcomes)
+                totals['chunks'] += 1
+    finally:
+        if threading.current_thread() is not threading.main_thread():
+            connection.close()
+
+
+def process_refunds(chunk_size=None, workers=1, limit=None):
+    """
+    Drain the refund backlog with workers threads, returning outcome counts and throughput
+    Each thread claims its own chunks, so threads and separate worker processes can run
+    side by side without processing a refund twice
+    """
+    chunk_size = chunk_size or settings.REFUND_CHUNK_SIZE
+    totals, lock = Counter(), threading.Lock()
+    started = time.monotonic()
+    if workers <= 1:
+        _drain(chunk_size, limit, totals, lock)
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for future in [pool.submit(_drain, chunk_size, limit, totals, lock) for _ in range(workers)]:
+                future.result()
+
+    elapsed = time.monotonic() - started
+    metrics = dict(totals, elapsed=elapsed, per_second=totals['claimed'] / elapsed if elapsed else 0.0)
+    logger.info(
+        "Refund run: %(claimed)d claimed, %(processed)d processed, %(rejected)d rejected "
+        "in %(elapsed).2fs (%(per_second).1f/s)",
+        {'claimed': totals['claimed'], 'processed': totals['processed'],
+         'rejected': totals['rejected'], 'elapsed': elapsed, 'per_second': metrics['per_second']}
+    )
+    return metrics
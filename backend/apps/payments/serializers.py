@@ -3,7 +3,7 @@ from .models import Payment, Invoice, Refund
 
 class InvoiceSerializer(serializers.ModelSerializer):
     """Serializer for Invoice model"""
-    booking_id = serializers.IntegerField(source='booking.id', read_only=True)
+    booking_id = serializers.UUIDField(source='booking.id', read_only=True)
     
     class Meta:
         model = Invoice
@@ -32,7 +32,9 @@ class PaymentSerializer(serializers.ModelSerializer):
         model = Payment
         fields = [
             'id', 'booking', 'amount', 'payment_method',
-            'status', 'transaction_id', 'payment_date',
+            'status', 'transaction_id', 'payment_date', 'failure_reason',
             'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'status', 'transaction_id', 'payment_date', 'created_at', 'updated_at']
+        read_only_fields = [
+            'id', 'status', 'transaction_id', 'payment_date', 'failure_reason', 'created_at', 'updated_at'
+        ]
@@ -0,0 +1,135 @@
+"""
+Payment settlement for Tours & Travels backend
+Claims due PENDING payments from the outbox, charges them concurrently and applies the outcomes
+"""
+
+import asyncio
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from apps.bookings.reservations import ReservationError, confirm_booking
+from .gateways import GatewayError, get_gateway
+from .models import Payment, Refund
+
+
+def claim_due_payments(limit):
+    """
+    Lease up to limit due PENDING payments to this worker
+    Rows locked by another worker are skipped, and the lease pushes next_attempt_at out so
+    a crashed worker's payments come back due once it lapses
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        payments = list(
+            Payment.objects.select_for_update(skip_locked=True)
+            .filter(status='PENDING', next_attempt_at__lte=now)
+            .order_by('next_attempt_at')
+            .only('id', 'booking_id', 'amount', 'payment_method', 'attempts')[:limit]
+        )
+        Payment.objects.filter(pk__in=[payment.pk for payment in payments]).update(
+            next_attempt_at=now + timedelta(seconds=settings.PAYMENT_SETTLEMENT_LEASE),
+            attempts=F('attempts') + 1,
+            updated_at=now,
+        )
+    for payment in payments:
+        payment.attempts += 1
+    return payments
+
+
+async def charge_payments(gateway, payments, concurrency):
+    """Charge payments with at most concurrency calls in flight, returning a result or GatewayError each"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def charge(payment):
+        async with semaphore:
+            try:
+                # The payment id doubles as the gateway idempotency key across retries
+                return await gateway.charge(str(payment.pk), payment.amount, payment.payment_method)
+            except GatewayError as exc:
+                return exc
+
+    return await asyncio.gather(*(charge(payment) for payment in payments))
+
+
+def record_success(payment_id, reference):
+    """
+    Mark a PENDING payment successful and confirm its booking
+    A booking that can no longer be confirmed keeps the charge and gets a PENDING refund
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        if not Payment.objects.filter(pk=payment_id, status='PENDING').update(
+            status='SUCCESS', transaction_id=reference, next_attempt_at=None, updated_at=now
+        ):
+            return False
+        payment = Payment.objects.only('id', 'booking_id', 'amount').get(pk=payment_id)
+        try:
+            confirm_booking(payment.booking_id)
+        except ReservationError as exc:
+            Refund.objects.create(payment=payment, amount=payment.amount, reason=f"Automatic refund: {exc}")
+    return True
+
+
+def record_failure(payment_id, reason, reference=None):
+    """Mark a PENDING payment failed; its booking hold lapses as usual"""
+    fields = {'status': 'FAILED', 'failure_reason': reason[:255], 'next_attempt_at': None,
+              'updated_at': timezone.now()}
+    if reference:
+        fields['transaction_id'] = reference
+    return bool(Payment.objects.filter(pk=payment_id, status='PENDING').update(**fields))
+
+
+def apply_charge_result(payment, result):
+    """Apply one charge outcome, returning the outcome name counted by the worker"""
+    if isinstance(result, GatewayError):
+        if payment.attempts >= settings.PAYMENT_GATEWAY_MAX_ATTEMPTS:
+            record_failure(payment.pk, str(result))
+            return 'failed'
+        backoff = min(2 ** payment.attempts, 300)
+        Payment.objects.filter(pk=payment.pk, status='PENDING').update(
+            next_attempt_at=timezone.now() + timedelta(seconds=backoff)
+        )
+        return 'retried'
+    if result.status == 'SUCCESS':
+        record_success(payment.pk, result.reference)
+        return 'succeeded'
+    if result.status == 'PROCESSING':
+        # Settled by the gateway webhook; keep the reference to match it
+        Payment.objects.filter(pk=payment.pk, status='PENDING').update(
+            transaction_id=result.reference, next_attempt_at=None
+        )
+        return 'processing'
+    record_failure(payment.pk, result.message or 'Declined', result.reference)
+    return 'declined'
+
+
+def settle_due_payments(limit=None, concurrency=None, gateway=None):
+    """Claim, charge and settle one batch of due payments, returning outcome counts"""
+    limit = limit or settings.PAYMENT_SETTLEMENT_BATCH_SIZE
+    concurrency = concurrency or settings.PAYMENT_SETTLEMENT_CONCURRENCY
+    gateway = gateway or get_gateway()
+
+    payments = claim_due_payments(limit)
+    outcomes = Counter(claimed=len(payments))
+    if not payments:
+        return outcomes
+    results = asyncio.run(charge_payments(gateway, payments, concurrency))
+    for payment, result in zip(payments, results):
+        outcomes[apply_charge_result(payment, result)] += 1
+    return outcomes
+
+
+def apply_webhook(event):
+    """Reconcile a payment left PROCESSING with the gateway's final word"""
+    payment_id = Payment.objects.filter(
+        transaction_id=event.reference
+    ).values_list('pk', flat=True).first()
+    if payment_id is None:
+        return False
+    if event.status == 'SUCCESS':
+        return record_success(payment_id, event.reference)
+    return record_failure(payment_id, event.message or 'Declined by gateway')
@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import PaymentViewSet, InvoiceViewSet, RefundViewSet
+from .views import PaymentViewSet, PaymentWebhookView, InvoiceViewSet, RefundViewSet
 
 router = DefaultRouter()
 router.register(r'invoices', InvoiceViewSet, basename='invoice')
@@ -8,5 +8,6 @@ router.register(r'refunds', RefundViewSet, basename='refund')
 router.register(r'', PaymentViewSet, basename='payment')
 
 urlpatterns = [
+    path('webhook/', PaymentWebhookView.as_view(), name='payment-webhook'),
     path('', include(router.urls)),
 ]
@@ -1,12 +1,24 @@
+from django.db import transaction
+from django.http import HttpResponse
 from rest_framework import viewsets, status
+from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.views import APIView
 from .models import Payment, Invoice, Refund
 from .serializers import PaymentSerializer, InvoiceSerializer, RefundSerializer
 from apps.core.response import APIResponse
-import uuid
+from apps.core.pagination import PaginationModeMixin
+from apps.bookings.reservations import ReservationError
+from apps.bookings.models import Booking
+from .gateways import get_gateway
+from .invoicing import (
+    allocate_invoice_numbers, format_invoice_number, invoice_series, lock_sequence, render_invoice
+)
+from .settlement import apply_webhook
+from .processing import IdempotencyConflict, find_replay, process_payment, request_fingerprint
 
-class PaymentViewSet(viewsets.ModelViewSet):
+class PaymentViewSet(PaginationModeMixin, viewsets.ModelViewSet):
     queryset = Payment.objects.all()
     serializer_class = PaymentSerializer
     permission_classes = [IsAuthenticated]
@@ -16,30 +28,85 @@ class PaymentViewSet(viewsets.ModelViewSet):
             return Payment.objects.all()
         return Payment.objects.filter(booking__user=self.request.user)
 
-    def perform_create(self, serializer):
-        # Mock payment processing
-        transaction_id = f"TXN-{uuid.uuid4().hex[:10].upper()}"
-        serializer.save(status='SUCCESS', transaction_id=transaction_id)
-        
-        # Update booking status
-        payment = serializer.instance
-        booking = payment.booking
-        booking.status = 'CONFIRMED'
-        booking.save()
-
     def create(self, request, *args, **kwargs):
-        serializer = self.get_serializer(data=request.data)
-        if serializer.is_valid():
-            self.perform_create(serializer)
-            return APIResponse.success(
-                data=serializer.data,
-                message="Payment processed successfully",
-                status_code=status.HTTP_201_CREATED
+        key = request.headers.get('Idempotency-Key', '').strip()
+        if len(key) > 255:
+            return APIResponse.error(
+                message="Idempotency-Key must be at most 255 characters",
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+        fingerprint = request_fingerprint(request.data)
+
+        try:
+            # A retried request is answered from its recorded payment before any other work
+            payment = find_replay(request.user, key, fingerprint) if key else None
+            if payment is not None:
+                return self.replayed(payment)
+
+            serializer = self.get_serializer(data=request.data)
+            if not serializer.is_valid():
+                return APIResponse.error(
+                    message="Payment failed",
+                    errors=serializer.errors,
+                    status_code=status.HTTP_400_BAD_REQUEST
+                )
+            payment, replayed = process_payment(
+                request.user,
+                serializer.validated_data['booking'],
+                serializer.validated_data['amount'],
+                serializer.validated_data.get('payment_method', 'UPI'),
+                key=key,
+                fingerprint=fingerprint,
             )
-        return APIResponse.error(
-            message="Payment failed",
-            errors=serializer.errors,
-            status_code=status.HTTP_400_BAD_REQUEST
+        except IdempotencyConflict as exc:
+            return APIResponse.error(
+                message=str(exc),
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY
+            )
+        except ReservationError as exc:
+            return APIResponse.error(
+                message=str(exc),
+                status_code=status.HTTP_409_CONFLICT
+            )
+        if replayed:
+            return self.replayed(payment)
+        return APIResponse.success(
+            data=self.get_serializer(payment).data,
+            message="Payment accepted for processing",
+            status_code=status.HTTP_202_ACCEPTED
+        )
+
+    def replayed(self, payment):
+        """Answer a retried request with the payment it already created"""
+        response = APIResponse.success(
+            data=self.get_serializer(payment).data,
+            message="Payment already processed"
+        )
+        response['Idempotent-Replayed'] = 'true'
+        return response
+
+
+class PaymentWebhookView(APIView):
+    """Gateway callbacks settling payments the gateway reported as still processing"""
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        gateway = get_gateway()
+        if not gateway.verify_webhook(request.body, request.headers):
+            return APIResponse.error(
+                message="Invalid webhook signature",
+                status_code=status.HTTP_403_FORBIDDEN
+            )
+        try:
+            event = gateway.parse_webhook(request.body)
+        except (ValueError, KeyError):
+            return APIResponse.error(message="Malformed webhook", status_code=status.HTTP_400_BAD_REQUEST)
+        # Gateways redeliver webhooks, and settled payments ignore repeats
+        applied = apply_webhook(event)
+        return APIResponse.success(
+            data={'reference': event.reference, 'applied': applied},
+            message="Webhook processed"
         )
 
 
@@ -54,6 +121,20 @@ class InvoiceViewSet(viewsets.ModelViewSet):
             return Invoice.objects.all()
         return Invoice.objects.filter(booking__user=self.request.user)
 
+    def perform_create(self, serializer):
+        # Manual invoices take the next number of the same gap-free series
+        with transaction.atomic():
+            series = invoice_series()
+            number = allocate_invoice_numbers(lock_sequence(series), 1)[0]
+            serializer.save(invoice_number=format_invoice_number(series, number))
+
+    @action(detail=True, methods=['get'])
+    def document(self, request, pk=None):
+        """Rendered HTML document of an invoice"""
+        invoice = self.get_object()
+        booking = Booking.objects.select_related('user', 'tour', 'package').get(pk=invoice.booking_id)
+        return HttpResponse(render_invoice(invoice, booking), content_type='text/html; charset=utf-8')
+
 
 class RefundViewSet(viewsets.ModelViewSet):
     """ViewSet for managing refunds"""
@@ -24,6 +24,9 @@ class Review(BaseModel):
     class Meta:
         db_table = 'reviews_review'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='reviews_created_id_idx'),
+        ]
         unique_together = ['user', 'tour']
 
     def __str__(self):
@@ -4,8 +4,9 @@ from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from .models import Review
 from .serializers import ReviewSerializer
 from apps.core.response import APIResponse
+from apps.core.pagination import PaginationModeMixin
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(PaginationModeMixin, viewsets.ModelViewSet):
     queryset = Review.objects.all()
     serializer_class = ReviewSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
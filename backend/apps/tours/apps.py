@@ -5,3 +5,6 @@ class ToursConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.tours'
     verbose_name = 'Tours & Packages'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,106 @@
+"""
+Availability calendar for Tours & Travels backend
+Per-day remaining seats of tour months, built from departure inventory and cached per tour-month
+"""
+
+import calendar
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from apps.core.cache import bump_generation, get_generations
+from .models import Tour, TourDeparture
+
+
+GRID_KEY = 'availability:{}:{}:{}:{}'
+
+
+def availability_family(tour_id):
+    """Cache family whose generation versions one tour's availability grids"""
+    return f'availability:{tour_id}'
+
+
+def invalidate_availability(*tour_ids):
+    """Drop the cached availability grids of the given tours"""
+    bump_generation(*[availability_family(tour_id) for tour_id in tour_ids])
+
+
+def month_bounds(month):
+    """First and last day of a 'YYYY-MM' month"""
+    year, number = (int(part) for part in month.split('-'))
+    first = date(year, number, 1)
+    return first, first.replace(day=calendar.monthrange(year, number)[1])
+
+
+def _build_grids(tour_ids, month, today):
+    """
+    Compute the grids of several tours for one month
+    One query for the tours and one for all their departures in the month, whatever the
+    number of tours or days
+    """
+    first, last = month_bounds(month)
+    tours = Tour.objects.filter(pk__in=tour_ids).annotate(
+        scheduled=Exists(TourDeparture.objects.filter(tour=OuterRef('pk'), is_active=True))
+    ).only('id', 'max_capacity', 'reserved_seats')
+
+    departures = {}
+    for departure in TourDeparture.objects.filter(
+        tour_id__in=tour_ids, is_active=True, departure_date__range=(first, last)
+    ).only('id', 'tour_id', 'departure_date', 'capacity', 'reserved_seats'):
+        departures[departure.tour_id, departure.departure_date] = departure
+
+    days = [first + timedelta(days=offset) for offset in range((last - first).days + 1)]
+    grids = {}
+    for tour in tours:
+        rows = []
+        for day in days:
+            departure = departures.get((tour.pk, day)) if tour.scheduled else None
+            if tour.scheduled:
+                capacity = departure.capacity if departure else 0
+                available = departure.available_seats if departure else 0
+            else:
+                # Undated tours share one tour-wide seat pool on every day
+                capacity = tour.max_capacity
+                available = max(0, tour.max_capacity - tour.reserved_seats)
+            rows.append({
+                'date': day.isoformat(),
+                'departure': str(departure.pk) if departure else None,
+                'capacity': capacity,
+                'available_seats': available if day >= today else 0,
+            })
+        grids[tour.pk] = {
+            'tour': str(tour.pk),
+            'month': month,
+            'scheduled': tour.scheduled,
+            'days': rows,
+        }
+    return grids
+
+
+def get_month_availability(tour_ids, month):
+    """
+    Return {tour_id: grid} for a month, reading cached grids where current
+    Keys carry each tour's generation and today's date, so bookings and day roll-over
+    both retire old grids
+    """
+    tour_ids = list(tour_ids)
+    today = timezone.localdate()
+    generations = get_generations([availability_family(tour_id) for tour_id in tour_ids])
+    keys = {
+        tour_id: GRID_KEY.format(tour_id, month, today.isoformat(), generation)
+        for tour_id, generation in zip(tour_ids, generations)
+    }
+    cached = cache.get_many(list(keys.values()))
+    grids = {tour_id: cached[key] for tour_id, key in keys.items() if key in cached}
+
+    missing = [tour_id for tour_id in tour_ids if tour_id not in grids]
+    if missing:
+        built = _build_grids(missing, month, today)
+        cache.set_many(
+            {keys[tour_id]: grid for tour_id, grid in built.items()},
+            timeout=settings.RESPONSE_CACHE_TIMEOUT
+        )
+        grids.update(built)
+    return grids
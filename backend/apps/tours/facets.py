@@ -0,0 +1,106 @@
+"""
+Search facets for Tours & Travels backend
+Category, difficulty and destination counts plus price/duration histograms of a result set
+"""
+
+from collections import Counter
+
+from django.conf import settings
+from django.db.models import Count, F, IntegerField, Value
+from django.db.models.functions import Cast, Floor
+from .models import Tour
+
+
+GROUP_FIELDS = (
+    'category', 'difficulty_level', 'destination_id', 'destination__name',
+    'price_bucket', 'duration_bucket',
+)
+
+
+def price_bucket(base_price):
+    """Histogram bucket of a price: [n * width, (n + 1) * width)"""
+    return int(base_price // settings.TOUR_FACET_PRICE_BUCKET_WIDTH)
+
+
+def duration_bucket(duration_days):
+    """Histogram bucket of a duration: n * width + 1 to (n + 1) * width days"""
+    return (duration_days - 1) // settings.TOUR_FACET_DURATION_BUCKET_WIDTH
+
+
+def fold_facets(groups):
+    """
+    Fold grouped counts into per-facet counts
+    Each group is (category, difficulty, destination id, destination name, price bucket,
+    duration bucket) mapped to the number of tours sharing all six values
+    """
+    categories, difficulties, destinations = Counter(), Counter(), Counter()
+    prices, durations = Counter(), Counter()
+    destination_names = {}
+    for (category, difficulty, destination_id, destination_name,
+         price, duration), count in groups.items():
+        categories[category] += count
+        difficulties[difficulty] += count
+        destinations[destination_id] += count
+        destination_names[destination_id] = destination_name
+        prices[price] += count
+        durations[duration] += count
+
+    category_labels = dict(Tour.CATEGORY_CHOICES)
+    difficulty_labels = dict(Tour.DIFFICULTY_CHOICES)
+    price_width = settings.TOUR_FACET_PRICE_BUCKET_WIDTH
+    duration_width = settings.TOUR_FACET_DURATION_BUCKET_WIDTH
+
+    def by_count(counter):
+        return sorted(counter.items(), key=lambda item: (-item[1], str(item[0])))
+
+    return {
+        'category': [
+            {'value': value, 'label': category_labels.get(value, value), 'count': count}
+            for value, count in by_count(categories)
+        ],
+        'difficulty': [
+            {'value': value, 'label': difficulty_labels.get(value, value), 'count': count}
+            for value, count in by_count(difficulties)
+        ],
+        'destination': [
+            {'id': str(destination_id), 'name': destination_names[destination_id], 'count': count}
+            for destination_id, count in by_count(destinations)
+        ],
+        'price': [
+            {'min': float(bucket * price_width), 'max': float((bucket + 1) * price_width), 'count': count}
+            for bucket, count in sorted(prices.items())
+        ],
+        'duration': [
+            {'min': bucket * duration_width + 1, 'max': (bucket + 1) * duration_width, 'count': count}
+            for bucket, count in sorted(durations.items())
+        ],
+    }
+
+
+def queryset_facets(queryset):
+    """Facets of a tour queryset, from a single grouped aggregate query"""
+    # Group a bare pk subquery so sort and search annotations stay out of the GROUP BY
+    rows = Tour.objects.filter(
+        pk__in=queryset.order_by().values('pk')
+    ).annotate(
+        price_bucket=Cast(
+            Floor(F('base_price') / Value(settings.TOUR_FACET_PRICE_BUCKET_WIDTH)),
+            IntegerField()
+        ),
+        duration_bucket=Cast(
+            Floor((F('duration_days') - 1) / Value(settings.TOUR_FACET_DURATION_BUCKET_WIDTH)),
+            IntegerField()
+        ),
+    ).order_by().values(*GROUP_FIELDS).annotate(count=Count('pk'))
+    return fold_facets({
+        tuple(row[field] for field in GROUP_FIELDS): row['count'] for row in rows
+    })
+
+
+def document_facets(documents):
+    """Facets of in-memory search engine documents"""
+    return fold_facets(Counter(
+        (doc.category, doc.difficulty_level, doc.destination_id, doc.destination_name,
+         price_bucket(doc.base_price), duration_bucket(doc.duration_days))
+        for doc in documents
+    ))
@@ -0,0 +1,16 @@
+"""
+Management command to rebuild the tour full-text search index
+"""
+
+from django.core.management.base import BaseCommand
+from apps.tours.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search documents of every tour'
+
+    def handle(self, *args, **options):
+        indexed = rebuild_search_index()
+        self.stdout.write(
+            self.style.SUCCESS(f'Rebuilt search index: {indexed} tour(s) indexed')
+        )
@@ -0,0 +1,33 @@
+"""
+Management command to rebuild the stored tour aggregates
+"""
+
+from django.core.management.base import BaseCommand
+from apps.tours.stats import rebuild_tour_stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute stored rating and review aggregates and reserved seat counters for tours'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tour',
+            action='append',
+            dest='tour_ids',
+            help='Limit the rebuild to this tour ID (may be repeated)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of tours written per UPDATE batch',
+        )
+
+    def handle(self, *args, **options):
+        changed = rebuild_tour_stats(
+            tour_ids=options['tour_ids'],
+            batch_size=options['batch_size']
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f'Rebuilt tour aggregates: {changed} tour(s) updated')
+        )
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:40
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_tour_aggregates(apps, schema_editor):
+    Tour = apps.get_model('tours', 'Tour')
+    Review = apps.get_model('reviews', 'Review')
+    Booking = apps.get_model('bookings', 'Booking')
+
+    review_totals = {
+        row['tour_id']: (row['count'], row['total'] or 0)
+        for row in Review.objects.filter(is_verified=True).values('tour_id').annotate(
+            count=Count('id'), total=Sum('rating')
+        )
+    }
+    traveler_totals = {
+        row['tour_id']: row['total'] or 0
+        for row in Booking.objects.filter(status='CONFIRMED').values('tour_id').annotate(
+            total=Sum('travelers_count')
+        )
+    }
+
+    tours = []
+    for tour in Tour.objects.filter(pk__in=set(review_totals) | set(traveler_totals)):
+        tour.verified_review_count, tour.verified_rating_total = review_totals.get(tour.pk, (0, 0))
+        tour.confirmed_travelers = traveler_totals.get(tour.pk, 0)
+        tours.append(tour)
+    Tour.objects.bulk_update(
+        tours,
+        ['verified_review_count', 'verified_rating_total', 'confirmed_travelers'],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tours', '0005_remove_booking_tour_remove_booking_user_and_more'),
+        ('bookings', '0001_initial'),
+        ('reviews', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tour',
+            name='confirmed_travelers',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Travelers held by confirmed bookings'),
+        ),
+        migrations.AddField(
+            model_name='tour',
+            name='verified_rating_total',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Sum of ratings across verified reviews'),
+        ),
+        migrations.AddField(
+            model_name='tour',
+            name='verified_review_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of verified reviews'),
+        ),
+        migrations.RunPython(backfill_tour_aggregates, migrations.RunPython.noop),
+    ]
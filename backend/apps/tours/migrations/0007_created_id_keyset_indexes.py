@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tours', '0006_tour_stored_aggregates'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tour',
+            index=models.Index(fields=['-created_at', '-id'], name='tours_tour_created_id_idx'),
+        ),
+    ]
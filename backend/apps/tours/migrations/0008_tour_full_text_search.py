@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:51
+
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        config = settings.TOUR_SEARCH_CONFIG
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS unaccent')
+        schema_editor.execute(
+            'CREATE INDEX tours_tour_search_gin ON tours_tour USING gin (search_vector)'
+        )
+        schema_editor.execute(
+            "UPDATE tours_tour t SET search_vector = "
+            "setweight(to_tsvector(%s::regconfig, unaccent(coalesce(t.name, ''))), 'A') || "
+            "setweight(to_tsvector(%s::regconfig, unaccent(coalesce(d.name, ''))), 'B') || "
+            "setweight(to_tsvector(%s::regconfig, unaccent(coalesce(t.description, ''))), 'C') "
+            "FROM tours_destination d WHERE d.id = t.destination_id",
+            [config, config, config]
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE tours_tour_fts USING fts5("
+            "tour_id UNINDEXED, name, destination, description, "
+            "tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(
+            "INSERT INTO tours_tour_fts (tour_id, name, destination, description) "
+            "SELECT t.id, t.name, d.name, t.description FROM tours_tour t "
+            "JOIN tours_destination d ON d.id = t.destination_id"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS tours_tour_search_gin')
+    elif vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS tours_tour_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tours', '0007_created_id_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tour',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:58
+
+from django.db import migrations, models
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast
+
+
+def backfill_rating_average(apps, schema_editor):
+    Tour = apps.get_model('tours', 'Tour')
+    Tour.objects.filter(verified_review_count__gt=0).update(
+        rating_average=Cast(F('verified_rating_total'), FloatField()) / F('verified_review_count')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tours', '0008_tour_full_text_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tour',
+            name='rating_average',
+            field=models.FloatField(default=0, editable=False, help_text='Average verified rating, stored for indexed rating sorts'),
+        ),
+        migrations.RunPython(backfill_rating_average, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='tour',
+            index=models.Index(fields=['rating_average', 'verified_review_count', 'name'], name='tours_tour_rating_idx'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:00
+
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def backfill_reserved_seats(apps, schema_editor):
+    Tour = apps.get_model('tours', 'Tour')
+    TourPackage = apps.get_model('tours', 'TourPackage')
+    Booking = apps.get_model('bookings', 'Booking')
+
+    # Bookings made before seat holds existed only take seats once confirmed
+    taken = Booking.objects.filter(status__in=['CONFIRMED', 'COMPLETED'])
+    for model, key in ((Tour, 'tour_id'), (TourPackage, 'package_id')):
+        totals = taken.exclude(**{key: None}).values(key).annotate(total=Sum('travelers_count'))
+        rows = []
+        for row in totals:
+            instance = model(pk=row[key])
+            instance.reserved_seats = row['total']
+            rows.append(instance)
+        model.objects.bulk_update(rows, ['reserved_seats'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tours', '0009_tour_rating_average'),
+        ('bookings', '0002_created_id_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tour',
+            name='reserved_seats',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Seats taken by confirmed bookings and live holds, see apps.bookings.reservations'),
+        ),
+        migrations.AddField(
+            model_name='tourpackage',
+            name='reserved_seats',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Seats taken by confirmed bookings and live holds, see apps.bookings.reservations'),
+        ),
+        migrations.RunPython(backfill_reserved_seats, migrations.RunPython.noop),
+    ]
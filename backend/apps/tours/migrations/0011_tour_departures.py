@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:03
+
+import django.core.validators
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tours', '0010_reserved_seats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TourDeparture',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, help_text='Unique identifier for this record', primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Timestamp when this record was created')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='Timestamp when this record was last updated')),
+                ('departure_date', models.DateField()),
+                ('capacity', models.PositiveIntegerField(blank=True, help_text="Seats on this departure, defaults to the tour's max capacity", validators=[django.core.validators.MinValueValidator(1)])),
+                ('reserved_seats', models.PositiveIntegerField(default=0, editable=False, help_text='Seats taken by confirmed bookings and live holds, see apps.bookings.reservations')),
+                ('is_active', models.BooleanField(default=True)),
+                ('tour', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='departures', to='tours.tour')),
+            ],
+            options={
+                'verbose_name': 'Tour Departure',
+                'verbose_name_plural': 'Tour Departures',
+                'db_table': 'tours_tourdeparture',
+                'ordering': ['departure_date'],
+                'indexes': [models.Index(fields=['departure_date', 'tour'], name='tours_departure_date_idx')],
+                'constraints': [models.UniqueConstraint(fields=('tour', 'departure_date'), name='tours_departure_tour_date_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:06
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tours', '0011_tour_departures'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='tour',
+            name='confirmed_travelers',
+        ),
+    ]
@@ -4,9 +4,11 @@ Implements tour packages, destinations, and related functionality
 """
 
 from django.db import models
+from django.db.models.functions import Coalesce
 from django.utils.text import slugify
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.conf import settings
+from django.contrib.postgres.search import SearchVectorField
 from apps.core.models import BaseModel
 
 
@@ -128,6 +130,68 @@ class Destination(BaseModel):
         return self.name
 
 
+def owned_update_fields(instance, kwargs):
+    """
+    Restrict a full UPDATE save to the fields the instance owns
+    Columns in DERIVED_FIELDS are written by atomic UPDATEs elsewhere and a stale
+    in-memory copy must never be written back over them
+    """
+    if (not instance._state.adding and kwargs.get('update_fields') is None
+            and not kwargs.get('force_insert')):
+        kwargs['update_fields'] = [
+            field.name for field in instance._meta.concrete_fields
+            if not field.primary_key and field.name not in instance.DERIVED_FIELDS
+        ]
+    return kwargs
+
+
+class TourQuerySet(models.QuerySet):
+    """QuerySet helpers for Tour"""
+
+    def with_live_aggregates(self):
+        """
+        Annotate rating, review count and reserved seats computed live
+        Each aggregate is a correlated subquery so the joins never multiply tour rows
+        """
+        from django.apps import apps
+        Review = apps.get_model('reviews', 'Review')
+        Booking = apps.get_model('bookings', 'Booking')
+
+        verified_reviews = Review.objects.filter(
+            tour=models.OuterRef('pk'),
+            is_verified=True
+        ).order_by().values('tour')
+        # The bookings counted in Tour.reserved_seats: dated ones draw on their departure
+        seat_holders = Booking.objects.holding_seats().filter(
+            tour=models.OuterRef('pk'),
+            departure__isnull=True
+        ).order_by().values('tour')
+
+        return self.annotate(
+            annotated_average_rating=Coalesce(
+                models.Subquery(
+                    verified_reviews.annotate(value=models.Avg('rating')).values('value'),
+                    output_field=models.FloatField()
+                ),
+                models.Value(0.0)
+            ),
+            annotated_review_count=Coalesce(
+                models.Subquery(
+                    verified_reviews.annotate(value=models.Count('id')).values('value'),
+                    output_field=models.IntegerField()
+                ),
+                models.Value(0)
+            ),
+            annotated_reserved_seats=Coalesce(
+                models.Subquery(
+                    seat_holders.annotate(value=models.Sum('travelers_count')).values('value'),
+                    output_field=models.IntegerField()
+                ),
+                models.Value(0)
+            ),
+        )
+
+
 class Tour(BaseModel):
     """
     Main Tour model with comprehensive tour information
@@ -203,6 +267,38 @@ class Tour(BaseModel):
         choices=CATEGORY_CHOICES,
         default='CULTURAL'
     )
+
+    # Stored aggregates, maintained incrementally by apps.tours.stats
+    verified_review_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Number of verified reviews"
+    )
+    verified_rating_total = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Sum of ratings across verified reviews"
+    )
+    rating_average = models.FloatField(
+        default=0,
+        editable=False,
+        help_text="Average verified rating, stored for indexed rating sorts"
+    )
+    reserved_seats = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Seats taken by confirmed bookings and live holds, see apps.bookings.reservations"
+    )
+
+    # Full-text document, maintained by apps.tours.search (PostgreSQL only)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    STATS_FIELDS = ('verified_review_count', 'verified_rating_total', 'rating_average')
+
+    # Columns written outside save(), which must never be overwritten from memory
+    DERIVED_FIELDS = STATS_FIELDS + ('search_vector', 'reserved_seats')
+
+    objects = TourQuerySet.as_manager()
     
     class Meta:
         db_table = 'tours_tour'
@@ -215,43 +311,39 @@ class Tour(BaseModel):
             models.Index(fields=['base_price']),
             models.Index(fields=['is_active']),
             models.Index(fields=['difficulty_level']),
+            models.Index(fields=['-created_at', '-id'], name='tours_tour_created_id_idx'),
+            models.Index(
+                fields=['rating_average', 'verified_review_count', 'name'],
+                name='tours_tour_rating_idx'
+            ),
         ]
 
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.name)
-        super().save(*args, **kwargs)
+
+        # Never write back stale aggregates over concurrent incremental updates
+        super().save(*args, **owned_update_fields(self, kwargs))
 
     def __str__(self):
         return self.name
 
     @property
     def average_rating(self):
-        """Calculate average rating from reviews"""
-        reviews = self.reviews.filter(is_verified=True)
-        if reviews.exists():
-            return reviews.aggregate(
-                avg_rating=models.Avg('rating')
-            )['avg_rating']
+        """Average rating of verified reviews"""
+        if self.verified_review_count:
+            return self.verified_rating_total / self.verified_review_count
         return 0
 
     @property
     def review_count(self):
         """Get total number of verified reviews"""
-        return self.reviews.filter(is_verified=True).count()
+        return self.verified_review_count
 
     @property
     def available_capacity(self):
-        """Calculate available capacity based on confirmed bookings"""
-        from apps.bookings.models import Booking
-        confirmed_bookings = Booking.objects.filter(
-            tour=self,
-            status='CONFIRMED'
-        ).aggregate(
-            total_participants=models.Sum('travelers_count')
-        )['total_participants'] or 0
-        
-        return max(0, self.max_capacity - confirmed_bookings)
+        """Seats not taken by confirmed bookings or live holds"""
+        return max(0, self.max_capacity - self.reserved_seats)
 
 
 class TourPackage(BaseModel):
@@ -290,6 +382,13 @@ class TourPackage(BaseModel):
         default='STANDARD'
     )
     is_available = models.BooleanField(default=True)
+    reserved_seats = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Seats taken by confirmed bookings and live holds, see apps.bookings.reservations"
+    )
+
+    DERIVED_FIELDS = ('reserved_seats',)
 
     class Meta:
         db_table = 'tours_tourpackage'
@@ -298,6 +397,9 @@ class TourPackage(BaseModel):
         verbose_name_plural = 'Tour Packages'
         unique_together = ['tour', 'name']
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **owned_update_fields(self, kwargs))
+
     def __str__(self):
         return f"{self.tour.name} - {self.name}"
 
@@ -308,16 +410,60 @@ class TourPackage(BaseModel):
 
     @property
     def available_capacity(self):
-        """Calculate available capacity for this package"""
-        from apps.bookings.models import Booking
-        confirmed_bookings = Booking.objects.filter(
-            package=self,
-            status='CONFIRMED'
-        ).aggregate(
-            total_participants=models.Sum('travelers_count')
-        )['total_participants'] or 0
-        
-        return max(0, self.max_participants - confirmed_bookings)
+        """Seats of this package not taken by confirmed bookings or live holds"""
+        return max(0, self.max_participants - self.reserved_seats)
+
+
+class TourDeparture(BaseModel):
+    """
+    Scheduled departure of a tour with its own seat inventory
+    Bookings for a departure take seats from it instead of the tour-wide counter
+    """
+    tour = models.ForeignKey(
+        Tour,
+        related_name='departures',
+        on_delete=models.CASCADE
+    )
+    departure_date = models.DateField()
+    capacity = models.PositiveIntegerField(
+        blank=True,
+        validators=[MinValueValidator(1)],
+        help_text="Seats on this departure, defaults to the tour's max capacity"
+    )
+    reserved_seats = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Seats taken by confirmed bookings and live holds, see apps.bookings.reservations"
+    )
+    is_active = models.BooleanField(default=True)
+
+    DERIVED_FIELDS = ('reserved_seats',)
+
+    class Meta:
+        db_table = 'tours_tourdeparture'
+        ordering = ['departure_date']
+        verbose_name = 'Tour Departure'
+        verbose_name_plural = 'Tour Departures'
+        constraints = [
+            models.UniqueConstraint(fields=['tour', 'departure_date'], name='tours_departure_tour_date_uniq'),
+        ]
+        indexes = [
+            # Availability across tours for a date range
+            models.Index(fields=['departure_date', 'tour'], name='tours_departure_date_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.capacity is None:
+            self.capacity = self.tour.max_capacity
+        super().save(*args, **owned_update_fields(self, kwargs))
+
+    def __str__(self):
+        return f"{self.tour.name} on {self.departure_date}"
+
+    @property
+    def available_seats(self):
+        """Seats still open for booking on this departure"""
+        return max(0, self.capacity - self.reserved_seats)
 
 
 class Hotel(BaseModel):
@@ -0,0 +1,90 @@
+"""
+Active offer index for Tours & Travels backend
+Keeps the offers valid today and their best discount per tour in memory, rebuilt per day or on change
+"""
+
+import threading
+from collections import Counter
+
+from django.utils import timezone
+from apps.core.cache import get_generations
+from .models import Offer
+
+
+# Cache families bumped by Offer, Tour and offer-tour link writes (see signals)
+SYNC_FAMILIES = ('offers',)
+
+
+class ActiveOfferIndex:
+    """
+    Per-process index of offers valid today
+    Built with two queries: the current offers, then their tour links. The index is
+    replaced whole when the day changes or the offers generation is bumped
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.day = None
+        self.generation = None
+        self.offers = []
+        self.best_by_tour = {}
+
+    def rebuild(self, today):
+        """Load the offers valid on today and index their tours"""
+        generation = get_generations(SYNC_FAMILIES)
+        offers = list(Offer.objects.filter(
+            is_active=True, start_date__lte=today, end_date__gte=today
+        ).order_by('-start_date'))
+        by_id = {offer.pk: offer for offer in offers}
+
+        counts = Counter()
+        best_by_tour = {}
+        for offer_id, tour_id in Offer.applicable_tours.through.objects.filter(
+            offer_id__in=by_id
+        ).values_list('offer_id', 'tour_id'):
+            offer = by_id[offer_id]
+            counts[offer_id] += 1
+            best = best_by_tour.get(tour_id)
+            if best is None or offer.discount_percentage > best.discount_percentage:
+                best_by_tour[tour_id] = offer
+        for offer in offers:
+            offer.applicable_tours_total = counts[offer.pk]
+
+        self.offers, self.best_by_tour = offers, best_by_tour
+        self.day, self.generation = today, generation
+
+    def ensure_current(self):
+        """Rebuild when the day rolled over or offers changed since the last look"""
+        today = timezone.localdate()
+        with self._lock:
+            if self.day != today or get_generations(SYNC_FAMILIES) != self.generation:
+                self.rebuild(today)
+
+    def current_offers(self):
+        """Offers valid today, newest first, with applicable_tours_total set"""
+        return self.offers
+
+    def best_offer(self, tour_id):
+        """The highest-discount offer valid today for a tour, or None"""
+        return self.best_by_tour.get(tour_id)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_offer_index():
+    """Process-wide offer index, built on first use and kept current on every call"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = ActiveOfferIndex()
+    _index.ensure_current()
+    return _index
+
+
+def reset_offer_index():
+    """Discard the process-wide index so the next call rebuilds it"""
+    global _index
+    with _index_lock:
+        _index = None
@@ -0,0 +1,175 @@
+"""
+Price resolution for Tours & Travels backend
+Quotes tour prices for travel dates from preloaded seasonal month tables and active offers
+"""
+
+from collections import namedtuple
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.utils import timezone
+from .models import Tour, TourPackage, TourPricing
+from .offer_index import get_offer_index
+
+
+CENT = Decimal('0.01')
+HUNDRED = Decimal('100')
+
+QuoteRequest = namedtuple('QuoteRequest', ['tour_id', 'package_id', 'travel_date', 'travelers'])
+
+Quote = namedtuple('Quote', [
+    'tour_id', 'package_id', 'travel_date', 'travelers', 'base_price', 'season',
+    'seasonal_price', 'price_modifier', 'unit_price', 'offer', 'discount_percentage',
+    'subtotal', 'total_price',
+])
+
+
+class PricingError(Exception):
+    """A quote cannot be resolved for the requested tour, package or travelers"""
+
+
+def season_months(start_month, end_month):
+    """Months covered by a season, wrapping past December when it ends before it starts"""
+    if start_month <= end_month:
+        return list(range(start_month, end_month + 1))
+    return list(range(start_month, 13)) + list(range(1, end_month + 1))
+
+
+def month_table(pricings):
+    """
+    Twelve-slot (season name, price) lookup of one tour, indexed by month - 1
+    Where active seasons overlap, the shorter season wins, so peaks override broad seasons
+    """
+    table = [None] * 12
+    spans = sorted(
+        ((season_months(pricing.season.start_month, pricing.season.end_month), pricing)
+         for pricing in pricings),
+        key=lambda item: (-len(item[0]), item[1].season.start_month)
+    )
+    for months, pricing in spans:
+        for month in months:
+            table[month - 1] = (pricing.season.name, pricing.price)
+    return table
+
+
+def quote_data(quote):
+    """Plain response representation of a quote"""
+    return {
+        'tour': str(quote.tour_id),
+        'package': str(quote.package_id) if quote.package_id else None,
+        'travel_date': quote.travel_date.isoformat(),
+        'travelers': quote.travelers,
+        'base_price': quote.base_price,
+        'season': quote.season,
+        'seasonal_price': quote.seasonal_price,
+        'price_modifier': quote.price_modifier,
+        'unit_price': quote.unit_price,
+        'offer': quote.offer,
+        'discount_percentage': quote.discount_percentage,
+        'subtotal': quote.subtotal,
+        'total_price': quote.total_price,
+    }
+
+
+class PriceBook:
+    """
+    Prices of a set of tours preloaded for quoting without further queries
+    Offers apply when active today, whatever the travel date; the best one wins
+    """
+
+    def __init__(self, base_prices, modifiers, month_tables, offers):
+        self.base_prices = base_prices
+        self.modifiers = modifiers
+        self.month_tables = month_tables
+        self.offers = offers
+
+    @classmethod
+    def load(cls, tour_ids, package_ids=(), tours=None):
+        """
+        Preload tours, packages and seasonal pricings, one query each, and current offers
+        from the process-wide offer index
+        tours narrows which tours can be quoted, e.g. to those visible to the caller
+        """
+        tour_ids = set(tour_ids)
+        tours = Tour.objects.all() if tours is None else tours
+        base_prices = dict(tours.filter(pk__in=tour_ids).values_list('pk', 'base_price'))
+
+        modifiers = {}
+        if package_ids:
+            for pk, tour_id, modifier in TourPackage.objects.filter(
+                pk__in=set(package_ids), tour_id__in=base_prices, is_available=True
+            ).values_list('pk', 'tour_id', 'price_modifier'):
+                modifiers[pk] = (tour_id, modifier)
+
+        pricings = {}
+        for pricing in TourPricing.objects.filter(
+            tour_id__in=base_prices, season__is_active=True
+        ).select_related('season').only(
+            'tour_id', 'price', 'season__name', 'season__start_month', 'season__end_month'
+        ):
+            pricings.setdefault(pricing.tour_id, []).append(pricing)
+        month_tables = {tour_id: month_table(rows) for tour_id, rows in pricings.items()}
+
+        offer_index = get_offer_index()
+        offers = {}
+        for tour_id in base_prices:
+            offer = offer_index.best_offer(tour_id)
+            if offer is not None:
+                offers[tour_id] = (offer.name, offer.discount_percentage)
+
+        return cls(base_prices, modifiers, month_tables, offers)
+
+    def quote(self, tour_id, package_id=None, travel_date=None, travelers=1):
+        """Quote one booking, raising PricingError if it cannot be priced"""
+        result = self.quote_many([QuoteRequest(tour_id, package_id, travel_date, travelers)])[0]
+        if isinstance(result, PricingError):
+            raise result
+        return result
+
+    def quote_many(self, requests):
+        """
+        Quote a batch of QuoteRequests, returning a Quote or PricingError per request
+        Seasons resolve through the month tables, so the batch costs no queries
+        """
+        today = timezone.localdate()
+        results = []
+        for tour_id, package_id, travel_date, travelers in requests:
+            travel_date = travel_date or today
+            base_price = self.base_prices.get(tour_id)
+            if base_price is None:
+                results.append(PricingError('Tour not found'))
+                continue
+            if travelers < 1:
+                results.append(PricingError('Travelers must be at least 1'))
+                continue
+
+            modifier = Decimal('0')
+            if package_id is not None:
+                package = self.modifiers.get(package_id)
+                if package is None or package[0] != tour_id:
+                    results.append(PricingError('Package not available for this tour'))
+                    continue
+                modifier = package[1]
+
+            season = self.month_tables.get(tour_id, [None] * 12)[travel_date.month - 1]
+            season_name, seasonal_price = season or (None, None)
+            unit_price = (base_price if seasonal_price is None else seasonal_price) + modifier
+            offer_name, discount = self.offers.get(tour_id, (None, Decimal('0')))
+            subtotal = unit_price * travelers
+            total = (subtotal * (HUNDRED - discount) / HUNDRED).quantize(CENT, rounding=ROUND_HALF_UP)
+
+            results.append(Quote(
+                tour_id=tour_id,
+                package_id=package_id,
+                travel_date=travel_date,
+                travelers=travelers,
+                base_price=base_price,
+                season=season_name,
+                seasonal_price=seasonal_price,
+                price_modifier=modifier,
+                unit_price=unit_price,
+                offer=offer_name,
+                discount_percentage=discount,
+                subtotal=subtotal,
+                total_price=total,
+            ))
+        return results
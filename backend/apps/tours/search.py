@@ -0,0 +1,170 @@
+"""
+Full-text tour search for Tours & Travels backend
+PostgreSQL tsvector column with a GIN index in production, SQLite FTS5 in development
+"""
+
+import re
+import unicodedata
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q, F, Func, Value, FloatField, TextField, OuterRef, Subquery
+from django.db.models.expressions import RawSQL
+from apps.core.cache import bump_generation
+
+
+FTS_TABLE = 'tours_tour_fts'
+
+# bm25 weights per FTS5 column: tour_id (unindexed), name, destination, description
+FTS_WEIGHTS = (0.0, 10.0, 5.0, 1.0)
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def normalize_terms(text):
+    """Split free text into lowercase, accent-free search tokens"""
+    decomposed = unicodedata.normalize('NFKD', text)
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return [token.lower() for token in TOKEN_RE.findall(stripped)]
+
+
+def get_search_backend():
+    """Name of the full-text backend for the default database, if any"""
+    if connection.vendor in ('postgresql', 'sqlite'):
+        return connection.vendor
+    return None
+
+
+def _postgres_vector():
+    """Weighted, unaccented tsvector over tour name, destination and description"""
+    from django.contrib.postgres.search import SearchVector
+
+    Destination = apps.get_model('tours', 'Destination')
+    config = settings.TOUR_SEARCH_CONFIG
+    destination_name = Subquery(
+        Destination.objects.filter(pk=OuterRef('destination_id')).values('name')[:1],
+        output_field=TextField()
+    )
+
+    def unaccent(expression):
+        return Func(expression, function='unaccent', output_field=TextField())
+
+    return (
+        SearchVector(unaccent(F('name')), weight='A', config=config)
+        + SearchVector(unaccent(destination_name), weight='B', config=config)
+        + SearchVector(unaccent(F('description')), weight='C', config=config)
+    )
+
+
+def _sqlite_reindex(db_ids=None):
+    """Replace FTS5 rows from the tour table, for the given ids or for all tours"""
+    delete_sql = f"DELETE FROM {FTS_TABLE}"
+    insert_sql = (
+        f"INSERT INTO {FTS_TABLE} (tour_id, name, destination, description) "
+        f"SELECT t.id, t.name, d.name, t.description FROM tours_tour t "
+        f"JOIN tours_destination d ON d.id = t.destination_id"
+    )
+    params = []
+    if db_ids is not None:
+        placeholders = ', '.join(['%s'] * len(db_ids))
+        delete_sql += f" WHERE tour_id IN ({placeholders})"
+        insert_sql += f" WHERE t.id IN ({placeholders})"
+        params = list(db_ids)
+    with connection.cursor() as cursor:
+        cursor.execute(delete_sql, params)
+        cursor.execute(insert_sql, params)
+
+
+def _db_ids(tour_ids):
+    Tour = apps.get_model('tours', 'Tour')
+    return [Tour._meta.pk.get_db_prep_value(pk, connection) for pk in tour_ids]
+
+
+def index_tours(tour_ids):
+    """Refresh the search index entries of the given tours"""
+    tour_ids = list(tour_ids)
+    if not tour_ids:
+        return
+    backend = get_search_backend()
+    if backend == 'postgresql':
+        Tour = apps.get_model('tours', 'Tour')
+        Tour.objects.filter(pk__in=tour_ids).update(search_vector=_postgres_vector())
+    elif backend == 'sqlite':
+        _sqlite_reindex(_db_ids(tour_ids))
+
+
+def remove_tours(tour_ids):
+    """Drop deleted tours from the development index"""
+    tour_ids = list(tour_ids)
+    if tour_ids and get_search_backend() == 'sqlite':
+        placeholders = ', '.join(['%s'] * len(tour_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {FTS_TABLE} WHERE tour_id IN ({placeholders})",
+                _db_ids(tour_ids)
+            )
+
+
+def rebuild_search_index():
+    """Rebuild the whole search index from the tour table and return the tour count"""
+    Tour = apps.get_model('tours', 'Tour')
+    backend = get_search_backend()
+    if backend == 'postgresql':
+        indexed = Tour.objects.update(search_vector=_postgres_vector())
+    else:
+        if backend == 'sqlite':
+            _sqlite_reindex()
+        indexed = Tour.objects.count()
+    # Cached search responses were built from the old documents
+    bump_generation('tours')
+    return indexed
+
+
+def search_tours(queryset, text):
+    """
+    Filter tours matching every search term, by prefix and ignoring accents
+    Matches are annotated with search_rank, higher meaning more relevant
+    """
+    terms = normalize_terms(text)
+    if not terms:
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    backend = get_search_backend()
+    if backend == 'postgresql':
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+
+        query = SearchQuery(
+            ' & '.join(f'{term}:*' for term in terms),
+            search_type='raw',
+            config=settings.TOUR_SEARCH_CONFIG
+        )
+        return queryset.filter(search_vector=query).annotate(
+            search_rank=SearchRank(F('search_vector'), query)
+        )
+
+    if backend == 'sqlite':
+        match = ' '.join(f'"{term}"*' for term in terms)
+        weights = ', '.join(str(weight) for weight in FTS_WEIGHTS)
+        table = queryset.model._meta.db_table
+        # bm25 is lower-is-better, so negate it into a rank
+        return queryset.filter(
+            pk__in=RawSQL(f"SELECT tour_id FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match])
+        ).annotate(
+            search_rank=RawSQL(
+                f"SELECT -bm25({FTS_TABLE}, {weights}) FROM {FTS_TABLE} "
+                f"WHERE {FTS_TABLE} MATCH %s AND {FTS_TABLE}.tour_id = {table}.id",
+                [match],
+                output_field=FloatField()
+            )
+        )
+
+    # No full-text support on this database: plain substring match, unranked
+    condition = Q()
+    for term in terms:
+        condition &= (
+            Q(name__icontains=term) |
+            Q(description__icontains=term) |
+            Q(destination__name__icontains=term)
+        )
+    return queryset.filter(condition).annotate(search_rank=Value(0.0, output_field=FloatField()))
@@ -0,0 +1,363 @@
+"""
+In-process tour search engine for Tours & Travels backend
+Answers tour search filters and sorts from memory with an inverted index and bitmaps
+"""
+
+import logging
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict, namedtuple
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db import DatabaseError
+from django.db.models import Q
+from django.utils import timezone
+from apps.core.cache import get_generations
+from .facets import document_facets
+from .search import normalize_terms
+
+logger = logging.getLogger(__name__)
+
+
+# Field weights of the in-memory document, mirroring the database search ranking
+FIELD_WEIGHTS = {'name': 10.0, 'destination': 5.0, 'description': 1.0, 'packages': 1.0}
+
+# Cache families whose generation bumps signal catalogue changes to every worker
+SYNC_FAMILIES = ('tours',)
+
+# Delta syncs re-read rows changed this long before the previous sync started,
+# so rows committed late with an older updated_at are not missed
+SYNC_OVERLAP = timedelta(seconds=60)
+
+TourDocument = namedtuple('TourDocument', [
+    'id', 'name', 'base_price', 'duration_days', 'rating_average', 'review_count',
+    'created_at', 'updated_at', 'category', 'difficulty_level', 'destination_id',
+    'destination_name', 'is_active', 'tokens',
+])
+
+SearchResult = namedtuple('SearchResult', ['ids', 'last_modified'])
+
+
+def mask_of(slots):
+    """Bitmap with the given slot bits set"""
+    slots = list(slots)
+    if not slots:
+        return 0
+    buffer = bytearray(max(slots) // 8 + 1)
+    for slot in slots:
+        buffer[slot >> 3] |= 1 << (slot & 7)
+    return int.from_bytes(buffer, 'little')
+
+
+def slots_of(mask):
+    """Slot numbers set in a bitmap, ascending"""
+    bits = bin(mask)[:1:-1]
+    slots = []
+    position = bits.find('1')
+    while position != -1:
+        slots.append(position)
+        position = bits.find('1', position + 1)
+    return slots
+
+
+def build_document(tour, package_names):
+    """Snapshot the searchable and sortable state of a tour"""
+    tokens = {}
+    fields = (
+        ('name', tour.name),
+        ('destination', tour.destination.name),
+        ('description', tour.description),
+        ('packages', ' '.join(package_names)),
+    )
+    for field, text in fields:
+        weight = FIELD_WEIGHTS[field]
+        for token in normalize_terms(text):
+            if tokens.get(token, 0) < weight:
+                tokens[token] = weight
+    return TourDocument(
+        id=tour.pk,
+        name=tour.name,
+        base_price=tour.base_price,
+        duration_days=tour.duration_days,
+        rating_average=tour.rating_average,
+        review_count=tour.verified_review_count,
+        created_at=tour.created_at,
+        updated_at=tour.updated_at,
+        category=tour.category,
+        difficulty_level=tour.difficulty_level,
+        destination_id=tour.destination_id,
+        destination_name=tour.destination.name,
+        is_active=tour.is_active,
+        tokens=tokens,
+    )
+
+
+class TourSearchEngine:
+    """
+    Memory-resident index of the tour catalogue
+    Each tour occupies a slot; filters are bitmaps over slots combined with & and |
+    """
+
+    SORT_KEYS = {
+        'name': lambda doc: doc.name,
+        'price': lambda doc: doc.base_price,
+        'duration': lambda doc: doc.duration_days,
+        'rating': lambda doc: (doc.rating_average, doc.review_count),
+        'created_at': lambda doc: doc.created_at,
+    }
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._reset()
+        self.generation = None
+        self.built_at = None
+        self.synced_at = None
+
+    def _reset(self):
+        self.slots = {}
+        self.documents = []
+        self.postings = {}
+        self.token_masks = {}
+        self.vocabulary = []
+        self.vocabulary_stale = False
+        self.category_masks = defaultdict(int)
+        self.difficulty_masks = defaultdict(int)
+        self.destination_masks = defaultdict(int)
+        self.destination_names = {}
+        self.live_mask = 0
+        self.active_mask = 0
+        self.by_price = []
+        self.by_duration = []
+
+    # Index maintenance
+
+    def _add(self, document):
+        slot = len(self.documents)
+        self.documents.append(document)
+        self.slots[document.id] = slot
+        bit = 1 << slot
+        for token, weight in document.tokens.items():
+            if token not in self.postings:
+                self.postings[token] = {}
+                self.token_masks[token] = 0
+                self.vocabulary_stale = True
+            self.postings[token][slot] = weight
+            self.token_masks[token] |= bit
+        self.category_masks[document.category] |= bit
+        self.difficulty_masks[document.difficulty_level] |= bit
+        self.destination_masks[document.destination_id] |= bit
+        self.live_mask |= bit
+        if document.is_active:
+            self.active_mask |= bit
+        insort(self.by_price, (document.base_price, slot))
+        insort(self.by_duration, (document.duration_days, slot))
+
+    def _remove(self, tour_id):
+        slot = self.slots.pop(tour_id, None)
+        if slot is None:
+            return
+        document = self.documents[slot]
+        self.documents[slot] = None
+        clear = ~(1 << slot)
+        for token in document.tokens:
+            del self.postings[token][slot]
+            self.token_masks[token] &= clear
+            if not self.postings[token]:
+                del self.postings[token]
+                del self.token_masks[token]
+                self.vocabulary_stale = True
+        self.category_masks[document.category] &= clear
+        self.difficulty_masks[document.difficulty_level] &= clear
+        self.destination_masks[document.destination_id] &= clear
+        self.live_mask &= clear
+        self.active_mask &= clear
+        for ordered, value in ((self.by_price, document.base_price),
+                               (self.by_duration, document.duration_days)):
+            del ordered[bisect_left(ordered, (value, slot))]
+
+    def _load(self, tours, complete=False):
+        """Index tours from the database, replacing any previous documents"""
+        TourPackage = apps.get_model('tours', 'TourPackage')
+        tours = list(tours)
+        packages = TourPackage.objects.all()
+        if not complete:
+            packages = packages.filter(tour__in=[tour.pk for tour in tours])
+        package_names = defaultdict(list)
+        for tour_id, name in packages.values_list('tour_id', 'name'):
+            package_names[tour_id].append(name)
+        for tour in tours:
+            self._remove(tour.pk)
+            self._add(build_document(tour, package_names[tour.pk]))
+            self.destination_names[tour.destination_id] = tour.destination.name.lower()
+
+    def _tour_queryset(self):
+        Tour = apps.get_model('tours', 'Tour')
+        return Tour.objects.select_related('destination').defer('search_vector', 'itinerary')
+
+    def rebuild(self):
+        """Build the index from scratch, compacting slots freed by deletes"""
+        with self._lock:
+            started = timezone.now()
+            generation = get_generations(SYNC_FAMILIES)
+            self._reset()
+            self._load(self._tour_queryset(), complete=True)
+            self.generation = generation
+            self.built_at = time.monotonic()
+            self.synced_at = started
+
+    def sync(self):
+        """Apply tours changed since the previous sync, and drop deleted ones"""
+        with self._lock:
+            started = timezone.now()
+            generation = get_generations(SYNC_FAMILIES)
+            since = self.synced_at - SYNC_OVERLAP
+            changed = self._tour_queryset().filter(
+                Q(updated_at__gte=since) |
+                Q(destination__updated_at__gte=since) |
+                Q(packages__updated_at__gte=since)
+            ).distinct()
+            self._load(changed)
+
+            Tour = apps.get_model('tours', 'Tour')
+            existing = set(Tour.objects.values_list('pk', flat=True))
+            for tour_id in set(self.slots) - existing:
+                self._remove(tour_id)
+            self.generation = generation
+            self.synced_at = started
+
+    def ensure_current(self):
+        """Rebuild or delta-sync when the catalogue changed since the last look"""
+        with self._lock:
+            if (self.built_at is None or
+                    time.monotonic() - self.built_at > settings.TOUR_SEARCH_ENGINE_REBUILD_INTERVAL):
+                self.rebuild()
+            elif get_generations(SYNC_FAMILIES) != self.generation:
+                self.sync()
+
+    # Queries
+
+    def _prefix_matches(self, term):
+        if self.vocabulary_stale:
+            self.vocabulary = sorted(self.postings)
+            self.vocabulary_stale = False
+        start = bisect_left(self.vocabulary, term)
+        matches = []
+        for token in self.vocabulary[start:]:
+            if not token.startswith(term):
+                break
+            matches.append(token)
+        return matches
+
+    def _range_mask(self, ordered, low, high):
+        start = 0 if low is None else bisect_left(ordered, (low, -1))
+        end = len(ordered) if high is None else bisect_right(ordered, (high, len(self.documents)))
+        return mask_of(slot for _, slot in ordered[start:end])
+
+    def _text_scores(self, terms, mask):
+        """Narrow the mask to tours matching every term prefix, scoring each match"""
+        scores = defaultdict(float)
+        for term in terms:
+            tokens = self._prefix_matches(term)
+            term_mask = 0
+            best = {}
+            for token in tokens:
+                term_mask |= self.token_masks[token]
+                for slot, weight in self.postings[token].items():
+                    if best.get(slot, 0) < weight:
+                        best[slot] = weight
+            mask &= term_mask
+            for slot, weight in best.items():
+                scores[slot] += weight
+        return mask, scores
+
+    def search(self, params, include_inactive=False):
+        """Resolve TourSearchSerializer data into ordered tour ids"""
+        with self._lock:
+            mask = self.live_mask if include_inactive else self.active_mask
+            scores = {}
+
+            destination = params.get('destination')
+            if destination:
+                needle = destination.lower()
+                destination_mask = 0
+                for destination_id, name in self.destination_names.items():
+                    if needle in name:
+                        destination_mask |= self.destination_masks[destination_id]
+                mask &= destination_mask
+            if params.get('category'):
+                mask &= self.category_masks.get(params['category'], 0)
+            if params.get('difficulty'):
+                mask &= self.difficulty_masks.get(params['difficulty'], 0)
+            if params.get('min_price') or params.get('max_price'):
+                mask &= self._range_mask(
+                    self.by_price, params.get('min_price') or None, params.get('max_price') or None
+                )
+            if params.get('min_duration') or params.get('max_duration'):
+                mask &= self._range_mask(
+                    self.by_duration, params.get('min_duration') or None, params.get('max_duration') or None
+                )
+
+            terms = normalize_terms(params.get('search') or '')
+            if terms and mask:
+                mask, scores = self._text_scores(terms, mask)
+
+            documents = [self.documents[slot] for slot in slots_of(mask)]
+            sort_by = params.get('sort_by', 'relevance')
+            descending = params.get('sort_order', 'asc') == 'desc'
+            if sort_by == 'relevance':
+                # Best matches first; without a search term there is nothing to rank
+                if terms:
+                    documents.sort(key=lambda doc: (-scores[self.slots[doc.id]], doc.name))
+                else:
+                    documents.sort(key=lambda doc: doc.name, reverse=descending)
+            else:
+                key = self.SORT_KEYS[sort_by]
+                documents.sort(key=lambda doc: (key(doc), doc.name), reverse=descending)
+
+            last_modified = max((doc.updated_at for doc in documents), default=None)
+            return SearchResult([doc.id for doc in documents], last_modified)
+
+    def facets(self, tour_ids):
+        """Facet counts over a search result"""
+        with self._lock:
+            return document_facets(
+                self.documents[self.slots[tour_id]] for tour_id in tour_ids if tour_id in self.slots
+            )
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_search_engine():
+    """Process-wide engine, built on first use and kept current on every call"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = TourSearchEngine()
+    _engine.ensure_current()
+    return _engine
+
+
+def warm_search_engine():
+    """
+    Build the process-wide engine now when TOUR_SEARCH_ENGINE is 'memory'
+    Called once per worker at startup, so no search request pays for the first build
+    """
+    if settings.TOUR_SEARCH_ENGINE != 'memory':
+        return
+    try:
+        get_search_engine()
+    except DatabaseError:
+        # e.g. before the first migrate; the first search builds it instead
+        logger.warning("Tour search engine was not built at startup", exc_info=True)
+
+
+def reset_search_engine():
+    """Discard the process-wide engine so the next call rebuilds it"""
+    global _engine
+    with _engine_lock:
+        _engine = None
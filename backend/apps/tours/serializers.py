@@ -2,12 +2,16 @@
 Serializers for Tours & Travels backend
 """
 
+import uuid
+
 from rest_framework import serializers
 from django.db import models
+from django.conf import settings
+from django.utils import timezone
 from .models import (
     Destination, Tour, TourPackage, Hotel, Vehicle, 
     Offer, CustomPackage, Inquiry, Season, TourPricing,
-    TourItinerary
+    TourItinerary, TourDeparture
 )
 
 
@@ -91,12 +95,122 @@ class TourPackageSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
-class TourListSerializer(serializers.ModelSerializer):
+class TourDepartureSerializer(serializers.ModelSerializer):
+    """Serializer for TourDeparture model"""
+    available_seats = serializers.ReadOnlyField()
+
+    class Meta:
+        model = TourDeparture
+        fields = [
+            'id', 'tour', 'departure_date', 'capacity', 'reserved_seats',
+            'available_seats', 'is_active', 'created_at', 'updated_at'
+        ]
+        read_only_fields = ['id', 'tour', 'reserved_seats', 'created_at', 'updated_at']
+
+    def validate_capacity(self, value):
+        """Capacity cannot drop below the seats already sold or held"""
+        if self.instance is not None and value < self.instance.reserved_seats:
+            raise serializers.ValidationError(
+                f"{self.instance.reserved_seats} seats are already reserved on this departure"
+            )
+        return value
+
+
+class DepartureRangeSerializer(serializers.Serializer):
+    """Serializer for departure date range filters"""
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+
+    def validate(self, data):
+        """Validate the date range"""
+        if data.get('start') and data.get('end') and data['start'] > data['end']:
+            raise serializers.ValidationError("End date must not be before start date")
+        return data
+
+
+class AvailabilityQuerySerializer(serializers.Serializer):
+    """Serializer for availability calendar parameters"""
+    MAX_TOURS = 50
+
+    month = serializers.RegexField(
+        r'^\d{4}-(0[1-9]|1[0-2])$',
+        required=False,
+        error_messages={'invalid': 'Use the YYYY-MM format'}
+    )
+    tours = serializers.CharField(required=False)
+
+    def validate_tours(self, value):
+        """Parse a comma-separated list of tour IDs"""
+        try:
+            tour_ids = list(dict.fromkeys(uuid.UUID(part.strip()) for part in value.split(',') if part.strip()))
+        except ValueError:
+            raise serializers.ValidationError("Tours must be comma-separated tour IDs")
+        if len(tour_ids) > self.MAX_TOURS:
+            raise serializers.ValidationError(f"At most {self.MAX_TOURS} tours per request")
+        return tour_ids
+
+    def validate(self, data):
+        """Default to the current month"""
+        data.setdefault('month', timezone.localdate().strftime('%Y-%m'))
+        return data
+
+
+class QuoteQuerySerializer(serializers.Serializer):
+    """Serializer for price quote parameters"""
+    date = serializers.DateField(required=False)
+    package = serializers.UUIDField(required=False)
+    travelers = serializers.IntegerField(required=False, default=1, min_value=1, max_value=100)
+
+
+class QuoteItemSerializer(serializers.Serializer):
+    """Serializer for one item of a bulk price quote"""
+    tour = serializers.UUIDField()
+    package = serializers.UUIDField(required=False, allow_null=True)
+    date = serializers.DateField(required=False, allow_null=True)
+    travelers = serializers.IntegerField(required=False, default=1, min_value=1, max_value=100)
+
+
+class BulkQuoteSerializer(serializers.Serializer):
+    """Serializer for bulk price quote requests; items are validated one by one"""
+    quotes = serializers.ListField(child=serializers.JSONField(), allow_empty=False)
+
+    def validate_quotes(self, value):
+        """Cap the batch size"""
+        if len(value) > settings.TOUR_BULK_QUOTE_LIMIT:
+            raise serializers.ValidationError(
+                f"At most {settings.TOUR_BULK_QUOTE_LIMIT} quotes per request"
+            )
+        return value
+
+
+class TourAggregateFieldsMixin:
+    """
+    Read tour aggregates from queryset annotations when present
+    Falls back to the Tour properties for instances loaded without them
+    """
+
+    def get_average_rating(self, obj):
+        if hasattr(obj, 'annotated_average_rating'):
+            return obj.annotated_average_rating
+        return obj.average_rating
+
+    def get_review_count(self, obj):
+        if hasattr(obj, 'annotated_review_count'):
+            return obj.annotated_review_count
+        return obj.review_count
+
+    def get_available_capacity(self, obj):
+        if hasattr(obj, 'annotated_reserved_seats'):
+            return max(0, obj.max_capacity - obj.annotated_reserved_seats)
+        return obj.available_capacity
+
+
+class TourListSerializer(TourAggregateFieldsMixin, serializers.ModelSerializer):
     """Serializer for Tour list view (minimal data)"""
     destination_name = serializers.CharField(source='destination.name', read_only=True)
-    average_rating = serializers.ReadOnlyField()
-    review_count = serializers.ReadOnlyField()
-    available_capacity = serializers.ReadOnlyField()
+    average_rating = serializers.SerializerMethodField()
+    review_count = serializers.SerializerMethodField()
+    available_capacity = serializers.SerializerMethodField()
     
     class Meta:
         model = Tour
@@ -108,14 +222,14 @@ class TourListSerializer(serializers.ModelSerializer):
         ]
 
 
-class TourDetailSerializer(serializers.ModelSerializer):
+class TourDetailSerializer(TourAggregateFieldsMixin, serializers.ModelSerializer):
     """Serializer for Tour detail view (complete data)"""
     destination = DestinationSerializer(read_only=True)
     destination_id = serializers.UUIDField(write_only=True)
     packages = TourPackageSerializer(many=True, read_only=True)
-    average_rating = serializers.ReadOnlyField()
-    review_count = serializers.ReadOnlyField()
-    available_capacity = serializers.ReadOnlyField()
+    average_rating = serializers.SerializerMethodField()
+    review_count = serializers.SerializerMethodField()
+    available_capacity = serializers.SerializerMethodField()
     
     class Meta:
         model = Tour
@@ -206,7 +320,9 @@ class OfferSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
     def get_applicable_tours_count(self, obj):
-        """Get count of applicable tours"""
+        """Get count of applicable tours, preferring the grouped count set by the view"""
+        if hasattr(obj, 'applicable_tours_total'):
+            return obj.applicable_tours_total
         return obj.applicable_tours.count()
 
     def validate(self, data):
@@ -299,6 +415,7 @@ class TourSearchSerializer(serializers.Serializer):
     max_duration = serializers.IntegerField(required=False, min_value=1)
     sort_by = serializers.ChoiceField(
         choices=[
+            ('relevance', 'Relevance'),
             ('name', 'Name'),
             ('price', 'Price'),
             ('duration', 'Duration'),
@@ -306,13 +423,14 @@ class TourSearchSerializer(serializers.Serializer):
             ('created_at', 'Newest'),
         ],
         required=False,
-        default='name'
+        default='relevance'
     )
     sort_order = serializers.ChoiceField(
         choices=[('asc', 'Ascending'), ('desc', 'Descending')],
         required=False,
         default='asc'
     )
+    facets = serializers.BooleanField(required=False, default=False)
 
     def validate(self, data):
         """Validate search parameters"""
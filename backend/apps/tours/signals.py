@@ -0,0 +1,119 @@
+"""
+Signal handlers for Tours & Travels backend
+Keeps derived tour data and cached responses in step with model changes
+"""
+
+from django.db.models.signals import pre_save, post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+from apps.bookings.reservations import release_booking_seats
+from apps.core.cache import bump_generation
+from .availability import invalidate_availability
+from .models import Offer, TourDeparture
+from .search import index_tours, remove_tours
+from .stats import adjust_tour_stats, review_contribution
+
+
+# Response cache families invalidated by each model's writes
+RESPONSE_CACHE_FAMILIES = {
+    'tours.Tour': ('tours', 'offers'),
+    'tours.TourPackage': ('tours',),
+    'tours.Destination': ('destinations', 'tours'),
+    'tours.Hotel': ('hotels',),
+    'tours.Offer': ('offers',),
+    'tours.Season': ('seasons',),
+    'reviews.Review': ('tours',),
+    'bookings.Booking': ('tours',),
+}
+
+
+def _invalidate_families(families):
+    def handler(sender, **kwargs):
+        bump_generation(*families)
+    return handler
+
+
+for model_label, families in RESPONSE_CACHE_FAMILIES.items():
+    handler = _invalidate_families(families)
+    post_save.connect(handler, sender=model_label, weak=False,
+                      dispatch_uid=f'response-cache-save-{model_label}')
+    post_delete.connect(handler, sender=model_label, weak=False,
+                        dispatch_uid=f'response-cache-delete-{model_label}')
+
+m2m_changed.connect(
+    _invalidate_families(('offers',)),
+    sender=Offer.applicable_tours.through,
+    weak=False,
+    dispatch_uid='response-cache-offer-tours'
+)
+
+
+def _previous_values(sender, instance, fields):
+    """Fetch the stored values of an existing row before it is overwritten"""
+    if instance._state.adding or instance.pk is None:
+        return None
+    return sender.objects.filter(pk=instance.pk).values(*fields).first()
+
+
+@receiver(pre_save, sender='reviews.Review')
+def capture_review_state(sender, instance, raw=False, **kwargs):
+    """Remember the review's previous rating state for the post_save delta"""
+    if raw:
+        return
+    instance._stats_previous = _previous_values(sender, instance, ('tour_id', 'is_verified', 'rating'))
+
+
+@receiver(post_save, sender='reviews.Review')
+def apply_review_stats(sender, instance, raw=False, **kwargs):
+    """Move the review's contribution between its old and new state"""
+    if raw:
+        return
+    previous = getattr(instance, '_stats_previous', None)
+    if previous:
+        count, total = review_contribution(previous['is_verified'], previous['rating'])
+        adjust_tour_stats(previous['tour_id'], review_count=-count, rating_total=-total)
+    count, total = review_contribution(instance.is_verified, instance.rating)
+    adjust_tour_stats(instance.tour_id, review_count=count, rating_total=total)
+    instance._stats_previous = None
+
+
+@receiver(post_delete, sender='reviews.Review')
+def remove_review_stats(sender, instance, **kwargs):
+    """Withdraw a deleted review's contribution"""
+    count, total = review_contribution(instance.is_verified, instance.rating)
+    adjust_tour_stats(instance.tour_id, review_count=-count, rating_total=-total)
+
+
+@receiver(post_delete, sender='bookings.Booking')
+def release_deleted_booking_seats(sender, instance, **kwargs):
+    """Give back the reserved seats of a deleted booking"""
+    release_booking_seats(instance)
+
+
+@receiver(post_save, sender='tours.Tour')
+def index_tour(sender, instance, raw=False, **kwargs):
+    """Refresh the search document of a saved tour"""
+    if raw:
+        return
+    index_tours([instance.pk])
+
+
+@receiver(post_delete, sender='tours.Tour')
+def unindex_tour(sender, instance, **kwargs):
+    """Drop a deleted tour from the search index"""
+    remove_tours([instance.pk])
+
+
+@receiver(post_save, sender='tours.Destination')
+def reindex_destination_tours(sender, instance, raw=False, **kwargs):
+    """Destination names are part of every tour document at that destination"""
+    if raw or kwargs.get('created'):
+        return
+    index_tours(instance.tours.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender='tours.Tour')
+@receiver(post_save, sender='tours.TourDeparture')
+@receiver(post_delete, sender='tours.TourDeparture')
+def invalidate_tour_availability(sender, instance, **kwargs):
+    """Capacity and schedule edits change the tour's availability grids"""
+    invalidate_availability(instance.tour_id if sender is TourDeparture else instance.pk)
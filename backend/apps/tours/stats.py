@@ -0,0 +1,146 @@
+"""
+Stored tour aggregates for Tours & Travels backend
+Keeps the rating/review columns on Tour in step with reviews, and rebuilds them and the seat counters
+"""
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models import (
+    Case, Count, F, FloatField, IntegerField, OuterRef, Subquery, Sum, Value, When
+)
+from django.db.models.functions import Cast, Coalesce, Greatest, Now
+from django.db.models.lookups import GreaterThan
+from django.utils import timezone
+from apps.core.cache import bump_generation
+from .availability import invalidate_availability
+
+
+def review_contribution(is_verified, rating):
+    """Return the (review_count, rating_total) a review adds to its tour"""
+    if is_verified:
+        return 1, rating
+    return 0, 0
+
+
+def rating_average(review_count, rating_total):
+    """Average verified rating stored for sorting, 0 without verified reviews"""
+    if review_count:
+        return rating_total / review_count
+    return 0.0
+
+
+def adjust_tour_stats(tour_id, review_count=0, rating_total=0):
+    """
+    Apply an incremental change to the stored aggregates of a single tour
+    Runs as one conditional UPDATE so concurrent writers never lose updates
+    """
+    if not tour_id or not (review_count or rating_total):
+        return
+
+    Tour = apps.get_model('tours', 'Tour')
+    new_count = Greatest(F('verified_review_count') + review_count, 0)
+    new_total = Greatest(F('verified_rating_total') + rating_total, 0)
+    Tour.objects.filter(pk=tour_id).update(
+        verified_review_count=new_count,
+        verified_rating_total=new_total,
+        # SET expressions all read the pre-update row, so the average repeats the deltas
+        rating_average=Case(
+            When(GreaterThan(new_count, 0), then=Cast(new_total, FloatField()) / new_count),
+            default=Value(0.0),
+            output_field=FloatField()
+        ),
+        updated_at=timezone.now(),
+    )
+
+
+def rebuild_reserved_seats(tour_ids=None):
+    """
+    Recompute the seat counters of tours, packages and departures from the bookings holding seats
+    Each counter is set by one UPDATE ... SET reserved_seats = (subquery), so seats taken
+    meanwhile are counted rather than overwritten from a stale read. Returns the ids of the
+    tours whose counters changed
+    """
+    Tour = apps.get_model('tours', 'Tour')
+    TourPackage = apps.get_model('tours', 'TourPackage')
+    TourDeparture = apps.get_model('tours', 'TourDeparture')
+    Booking = apps.get_model('bookings', 'Booking')
+
+    # Dated bookings draw on their departure alone, undated ones on the tour and package
+    holding = Booking.objects.holding_seats().order_by()
+    undated = holding.filter(departure__isnull=True)
+    counters = (
+        (Tour, undated, 'tour', 'pk'),
+        (TourPackage, undated, 'package', 'tour_id'),
+        (TourDeparture, holding, 'departure', 'tour_id'),
+    )
+
+    changed = set()
+    for model, bookings, key, tour_field in counters:
+        seats = Coalesce(
+            Subquery(
+                bookings.filter(**{key: OuterRef('pk')}).values(key).annotate(
+                    total=Sum('travelers_count')
+                ).values('total'),
+                output_field=IntegerField()
+            ),
+            Value(0)
+        )
+        stale = model.objects.exclude(reserved_seats=seats)
+        if tour_ids is not None:
+            stale = stale.filter(**{f'{tour_field}__in': tour_ids})
+        rows = dict(stale.values_list('pk', tour_field))
+        if rows:
+            model.objects.filter(pk__in=rows).update(reserved_seats=seats, updated_at=Now())
+            changed.update(rows.values())
+    return changed
+
+
+def rebuild_tour_stats(tour_ids=None, batch_size=500):
+    """
+    Recompute the stored aggregates and seat counters from scratch
+    Uses one grouped query per source table and returns the number of tours changed
+    """
+    Tour = apps.get_model('tours', 'Tour')
+    Review = apps.get_model('reviews', 'Review')
+
+    reviews = Review.objects.filter(is_verified=True)
+    tours = Tour.objects.only(
+        'id', 'verified_review_count', 'verified_rating_total', 'rating_average'
+    ).order_by('pk')
+    if tour_ids is not None:
+        reviews = reviews.filter(tour_id__in=tour_ids)
+        tours = tours.filter(pk__in=tour_ids)
+
+    review_totals = {
+        row['tour_id']: (row['count'], row['total'] or 0)
+        for row in reviews.values('tour_id').annotate(
+            count=Count('id'), total=Sum('rating')
+        )
+    }
+
+    now = timezone.now()
+    changed = []
+    for tour in tours.iterator(chunk_size=batch_size):
+        count, total = review_totals.get(tour.pk, (0, 0))
+        average = rating_average(count, total)
+        current = (tour.verified_review_count, tour.verified_rating_total, tour.rating_average)
+        if current == (count, total, average):
+            continue
+        tour.verified_review_count = count
+        tour.verified_rating_total = total
+        tour.rating_average = average
+        tour.updated_at = now
+        changed.append(tour)
+
+    with transaction.atomic():
+        Tour.objects.bulk_update(
+            changed,
+            ['verified_review_count', 'verified_rating_total', 'rating_average', 'updated_at'],
+            batch_size=batch_size,
+        )
+        seat_tours = rebuild_reserved_seats(tour_ids)
+    if seat_tours:
+        invalidate_availability(*seat_tours)
+    if changed or seat_tours:
+        bump_generation('tours')
+    return len({tour.pk for tour in changed} | seat_tours)
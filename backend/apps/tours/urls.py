@@ -9,7 +9,7 @@ from .views import (
     DestinationViewSet, TourViewSet, TourPackageViewSet,
     HotelViewSet, VehicleViewSet, OfferViewSet,
     CustomPackageViewSet, InquiryViewSet, SeasonViewSet,
-    TourPricingViewSet, TourItineraryViewSet
+    TourPricingViewSet, TourItineraryViewSet, TourDepartureViewSet
 )
 
 # Create main router for non-tour resources
@@ -32,7 +32,13 @@ urlpatterns = [
     path('<uuid:pk>/', TourViewSet.as_view({'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy'}), name='tour-detail'),
     path('<uuid:tour_pk>/packages/', TourPackageViewSet.as_view({'get': 'list', 'post': 'create'}), name='tour-packages-list'),
     path('<uuid:tour_pk>/packages/<uuid:pk>/', TourPackageViewSet.as_view({'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy'}), name='tour-packages-detail'),
+    path('<uuid:tour_pk>/departures/', TourDepartureViewSet.as_view({'get': 'list', 'post': 'create'}), name='tour-departures-list'),
+    path('<uuid:tour_pk>/departures/<uuid:pk>/', TourDepartureViewSet.as_view({'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy'}), name='tour-departures-detail'),
+    path('<uuid:pk>/quote/', TourViewSet.as_view({'get': 'quote'}), name='tour-quote'),
+    path('<uuid:pk>/availability/', TourViewSet.as_view({'get': 'availability'}), name='tour-availability'),
     path('search/', TourViewSet.as_view({'get': 'search'}), name='tour-search'),
+    path('quotes/bulk/', TourViewSet.as_view({'post': 'bulk_quote'}), name='tour-bulk-quote'),
+    path('availability/', TourViewSet.as_view({'get': 'availability_calendar'}), name='tour-availability-calendar'),
     
     # Other resources
     path('', include(router.urls)),
@@ -5,32 +5,47 @@ Views for Tours & Travels backend
 from rest_framework import status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Q, Avg
+from django.db.models import Count
 from django.db import transaction
+from django.shortcuts import get_object_or_404
+from django.conf import settings
 from apps.core.viewsets import BaseViewSet
+from apps.core.cache import CachedResponseMixin, cache_response
+from apps.core.conditional import (
+    make_etag, build_validators, is_not_modified, apply_validators, not_modified_response
+)
 from apps.core.permissions import IsAdminUser, IsCustomerUser, IsOwnerOrAdmin
 from apps.core.response import APIResponse
 from .models import (
     Destination, Tour, TourPackage, Hotel, Vehicle,
     Offer, CustomPackage, Inquiry, Season, TourPricing,
-    TourItinerary
+    TourItinerary, TourDeparture
 )
+from .availability import get_month_availability
+from .facets import queryset_facets
+from .offer_index import get_offer_index
+from .pricing import PriceBook, PricingError, QuoteRequest, quote_data
+from .search import search_tours
+from .search_engine import get_search_engine
 from .serializers import (
     DestinationSerializer, TourListSerializer, TourDetailSerializer,
     TourPackageSerializer, HotelSerializer, VehicleSerializer,
     OfferSerializer, CustomPackageSerializer, InquirySerializer,
     TourSearchSerializer, SeasonSerializer, TourPricingSerializer,
-    TourItinerarySerializer
+    TourItinerarySerializer, TourDepartureSerializer, DepartureRangeSerializer,
+    AvailabilityQuerySerializer, QuoteQuerySerializer, QuoteItemSerializer,
+    BulkQuoteSerializer
 )
 import logging
 
 logger = logging.getLogger('apps.tours')
 
 
-class SeasonViewSet(BaseViewSet):
+class SeasonViewSet(CachedResponseMixin, BaseViewSet):
     """ViewSet for managing seasons"""
     queryset = Season.objects.all()
     serializer_class = SeasonSerializer
+    cache_families = ('seasons',)
 
     def get_permissions(self):
         if self.action in ['create', 'update', 'partial_update', 'destroy']:
@@ -66,10 +81,11 @@ class TourItineraryViewSet(BaseViewSet):
         return [permission() for permission in permission_classes]
 
 
-class DestinationViewSet(BaseViewSet):
+class DestinationViewSet(CachedResponseMixin, BaseViewSet):
     """ViewSet for managing destinations"""
     queryset = Destination.objects.all()
     serializer_class = DestinationSerializer
+    cache_families = ('destinations',)
 
     def get_permissions(self):
         """Set permissions based on action"""
@@ -87,9 +103,10 @@ class DestinationViewSet(BaseViewSet):
         return queryset.order_by('name')
 
 
-class TourViewSet(BaseViewSet):
+class TourViewSet(CachedResponseMixin, BaseViewSet):
     """ViewSet for managing tours"""
-    queryset = Tour.objects.select_related('destination').prefetch_related('packages')
+    queryset = Tour.objects.select_related('destination')
+    cache_families = ('tours',)
 
     def get_serializer_class(self):
         """Return appropriate serializer based on action"""
@@ -110,9 +127,20 @@ class TourViewSet(BaseViewSet):
         queryset = super().get_queryset()
         if not (self.request.user.is_authenticated and self.request.user.is_admin):
             queryset = queryset.filter(is_active=True)
+
+        # Optionally compute aggregates live instead of reading the stored columns
+        if settings.TOUR_AGGREGATES_SOURCE == 'annotated':
+            queryset = queryset.with_live_aggregates()
+
+        # Only detail views nest packages
+        if self.action not in [
+            'list', 'search', 'availability', 'availability_calendar', 'quote', 'bulk_quote'
+        ]:
+            queryset = queryset.prefetch_related('packages')
         return queryset
 
     @action(detail=False, methods=['get'])
+    @cache_response
     def search(self, request):
         """Advanced tour search endpoint"""
         serializer = TourSearchSerializer(data=request.query_params)
@@ -125,16 +153,15 @@ class TourViewSet(BaseViewSet):
             )
 
         search_params = serializer.validated_data
+        if settings.TOUR_SEARCH_ENGINE == 'memory':
+            return self.search_in_memory(request, search_params)
+
         queryset = self.get_queryset()
 
         # Apply search filters
-        if search_params.get('search'):
-            search_term = search_params['search']
-            queryset = queryset.filter(
-                Q(name__icontains=search_term) |
-                Q(description__icontains=search_term) |
-                Q(destination__name__icontains=search_term)
-            )
+        search_term = search_params.get('search')
+        if search_term:
+            queryset = search_tours(queryset, search_term)
 
         if search_params.get('destination'):
             queryset = queryset.filter(
@@ -160,15 +187,21 @@ class TourViewSet(BaseViewSet):
             queryset = queryset.filter(duration_days__lte=search_params['max_duration'])
 
         # Apply sorting
-        sort_by = search_params.get('sort_by', 'name')
+        sort_by = search_params.get('sort_by', 'relevance')
         sort_order = search_params.get('sort_order', 'asc')
         
-        if sort_by == 'rating':
-            # Sort by average rating (requires annotation)
-            queryset = queryset.annotate(
-                avg_rating=Avg('reviews__rating')
-            ).order_by(
-                f"{'-' if sort_order == 'desc' else ''}avg_rating"
+        if sort_by == 'relevance':
+            # Best matches first; without a search term there is nothing to rank
+            if search_term:
+                queryset = queryset.order_by('-search_rank', 'name')
+            else:
+                queryset = queryset.order_by('-name' if sort_order == 'desc' else 'name')
+        elif sort_by == 'rating':
+            # Stored verified average, tie-broken by review count then unique name,
+            # in the column order of tours_tour_rating_idx
+            prefix = '-' if sort_order == 'desc' else ''
+            queryset = queryset.order_by(
+                f'{prefix}rating_average', f'{prefix}verified_review_count', f'{prefix}name'
             )
         else:
             order_field = sort_by
@@ -181,23 +214,159 @@ class TourViewSet(BaseViewSet):
                 f"{'-' if sort_order == 'desc' else ''}{order_field}"
             )
 
+        validators = self.get_list_validators(queryset)
+        if is_not_modified(request, validators):
+            return not_modified_response(validators)
+
         # Paginate results
         page = self.paginate_queryset(queryset)
         if page is not None:
             serializer = TourListSerializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+            response = self.get_paginated_response(serializer.data)
+        else:
+            serializer = TourListSerializer(queryset, many=True)
+            response = APIResponse.success(
+                data=serializer.data,
+                message="Tours retrieved successfully"
+            )
+        if search_params.get('facets'):
+            response.data['facets'] = queryset_facets(queryset)
+        return apply_validators(response, validators)
+
+    def search_in_memory(self, request, search_params):
+        """Resolve the search from the in-process index; only the page rows are loaded"""
+        include_inactive = request.user.is_authenticated and request.user.is_admin
+        engine = get_search_engine()
+        result = engine.search(search_params, include_inactive=include_inactive)
+
+        validators = build_validators(
+            make_etag('tours.Tour', len(result.ids), result.last_modified, *self.get_validator_context())
+        )
+        if is_not_modified(request, validators):
+            return not_modified_response(validators)
+
+        self.known_row_count = len(result.ids)
+        page = self.paginate_queryset(result.ids)
+        tour_ids = page if page is not None else result.ids
+        tours = self.get_queryset().in_bulk(tour_ids)
+        serializer = TourListSerializer(
+            [tours[tour_id] for tour_id in tour_ids if tour_id in tours], many=True
+        )
+        if page is not None:
+            response = self.get_paginated_response(serializer.data)
+        else:
+            response = APIResponse.success(
+                data=serializer.data,
+                message="Tours retrieved successfully"
+            )
+        if search_params.get('facets'):
+            response.data['facets'] = engine.facets(result.ids)
+        return apply_validators(response, validators)
 
-        serializer = TourListSerializer(queryset, many=True)
+    @action(detail=True, methods=['get'])
+    def availability(self, request, pk=None):
+        """Remaining seats per day of ?month=YYYY-MM for one tour"""
+        query = AvailabilityQuerySerializer(data=request.query_params)
+        if not query.is_valid():
+            return APIResponse.error(
+                message="Invalid availability parameters",
+                errors=query.errors,
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+        tour = self.get_object()
+        grids = get_month_availability([tour.pk], query.validated_data['month'])
         return APIResponse.success(
-            data=serializer.data,
-            message="Tours retrieved successfully"
+            data=grids[tour.pk],
+            message="Tour availability retrieved successfully"
+        )
+
+    @action(detail=False, methods=['get'], url_path='availability')
+    def availability_calendar(self, request):
+        """Remaining seats per day of ?month=YYYY-MM for the tours in ?tours=id,id"""
+        query = AvailabilityQuerySerializer(data=request.query_params)
+        if not query.is_valid() or not query.validated_data.get('tours'):
+            return APIResponse.error(
+                message="Invalid availability parameters",
+                errors=query.errors or {'tours': ['This field is required.']},
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+        requested = query.validated_data['tours']
+        visible = set(self.get_queryset().filter(pk__in=requested).values_list('pk', flat=True))
+        tour_ids = [tour_id for tour_id in requested if tour_id in visible]
+        grids = get_month_availability(tour_ids, query.validated_data['month'])
+        return APIResponse.success(
+            data=[grids[tour_id] for tour_id in tour_ids],
+            message="Tour availability retrieved successfully"
         )
 
+    @action(detail=True, methods=['get'])
+    def quote(self, request, pk=None):
+        """Price ?travelers= on ?date= for the tour or one of its ?package="""
+        query = QuoteQuerySerializer(data=request.query_params)
+        if not query.is_valid():
+            return APIResponse.error(
+                message="Invalid quote parameters",
+                errors=query.errors,
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+        params = query.validated_data
+        package_id = params.get('package')
+        prices = PriceBook.load(
+            [pk], [package_id] if package_id else (), tours=self.get_queryset()
+        )
+        if pk not in prices.base_prices:
+            return APIResponse.error(message="Tour not found", status_code=status.HTTP_404_NOT_FOUND)
+        try:
+            quote = prices.quote(pk, package_id, params.get('date'), params['travelers'])
+        except PricingError as exc:
+            return APIResponse.error(message=str(exc), status_code=status.HTTP_400_BAD_REQUEST)
+        return APIResponse.success(
+            data=quote_data(quote),
+            message="Tour price quoted successfully"
+        )
+
+    @action(detail=False, methods=['post'], url_path='quotes/bulk')
+    def bulk_quote(self, request):
+        """
+        Price a batch of {tour, package, date, travelers} items, streaming one result per item
+        Tours, packages, seasonal pricings and offers are each loaded once for the whole batch
+        """
+        batch = BulkQuoteSerializer(data=request.data)
+        if not batch.is_valid():
+            return APIResponse.error(
+                message="Invalid quote request",
+                errors=batch.errors,
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+
+        results = [None] * len(batch.validated_data['quotes'])
+        requests, positions = [], []
+        for index, raw in enumerate(batch.validated_data['quotes']):
+            item = QuoteItemSerializer(data=raw)
+            if not item.is_valid():
+                results[index] = {'index': index, 'success': False, 'errors': item.errors}
+                continue
+            data = item.validated_data
+            requests.append(QuoteRequest(data['tour'], data.get('package'), data.get('date'), data['travelers']))
+            positions.append(index)
+
+        prices = PriceBook.load(
+            {wanted.tour_id for wanted in requests},
+            {wanted.package_id for wanted in requests if wanted.package_id},
+            tours=self.get_queryset()
+        )
+        for index, quote in zip(positions, prices.quote_many(requests)):
+            if isinstance(quote, PricingError):
+                results[index] = {'index': index, 'success': False, 'errors': {'detail': [str(quote)]}}
+            else:
+                results[index] = {'index': index, 'success': True, 'quote': quote_data(quote)}
+        return APIResponse.streamed(results, message="Tour prices quoted")
+
     @action(detail=True, methods=['get'])
     def packages(self, request, pk=None):
         """Get packages for a specific tour"""
         tour = self.get_object()
-        packages = tour.packages.filter(is_available=True)
+        packages = [package for package in tour.packages.all() if package.is_available]
         serializer = TourPackageSerializer(packages, many=True)
         
         return APIResponse.success(
@@ -286,10 +455,75 @@ class TourPackageViewSet(BaseViewSet):
             )
 
 
-class HotelViewSet(BaseViewSet):
+class TourDepartureViewSet(BaseViewSet):
+    """ViewSet for managing the dated departures of a tour"""
+    serializer_class = TourDepartureSerializer
+
+    def get_permissions(self):
+        """Set permissions based on action"""
+        if self.action in ['create', 'update', 'partial_update', 'destroy']:
+            permission_classes = [IsAdminUser]
+        else:
+            permission_classes = []
+        return [permission() for permission in permission_classes]
+
+    def get_queryset(self):
+        """Departures of a tour, optionally limited to ?start=&end= dates"""
+        tour_id = self.kwargs.get('tour_pk')
+        if not tour_id:
+            return TourDeparture.objects.none()
+        queryset = TourDeparture.objects.filter(tour_id=tour_id)
+        if not (self.request.user.is_authenticated and self.request.user.is_admin):
+            queryset = queryset.filter(is_active=True, tour__is_active=True)
+        if self.action == 'list':
+            date_range = DepartureRangeSerializer(data=self.request.query_params)
+            date_range.is_valid(raise_exception=True)
+            if date_range.validated_data.get('start'):
+                queryset = queryset.filter(departure_date__gte=date_range.validated_data['start'])
+            if date_range.validated_data.get('end'):
+                queryset = queryset.filter(departure_date__lte=date_range.validated_data['end'])
+        return queryset.order_by('departure_date')
+
+    def create(self, request, *args, **kwargs):
+        """Schedule a new departure for the tour"""
+        tour = get_object_or_404(Tour, pk=self.kwargs.get('tour_pk'))
+        serializer = self.get_serializer(data=request.data)
+        if not serializer.is_valid():
+            return APIResponse.error(
+                message="Departure creation failed",
+                errors=serializer.errors,
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+        if TourDeparture.objects.filter(
+            tour=tour, departure_date=serializer.validated_data['departure_date']
+        ).exists():
+            return APIResponse.error(
+                message="This tour already departs on that date",
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+        serializer.save(tour=tour)
+        return APIResponse.success(
+            data=serializer.data,
+            message="Tour departure created successfully",
+            status_code=status.HTTP_201_CREATED
+        )
+
+    def destroy(self, request, *args, **kwargs):
+        """Delete a departure that has no bookings"""
+        departure = self.get_object()
+        if departure.bookings.exists():
+            return APIResponse.error(
+                message="Departure has bookings; deactivate it instead",
+                status_code=status.HTTP_409_CONFLICT
+            )
+        return super().destroy(request, *args, **kwargs)
+
+
+class HotelViewSet(CachedResponseMixin, BaseViewSet):
     """ViewSet for managing hotels"""
     queryset = Hotel.objects.select_related('destination')
     serializer_class = HotelSerializer
+    cache_families = ('hotels',)
 
     def get_permissions(self):
         """Set permissions based on action"""
@@ -328,10 +562,11 @@ class VehicleViewSet(BaseViewSet):
         return queryset.order_by('name')
 
 
-class OfferViewSet(BaseViewSet):
+class OfferViewSet(CachedResponseMixin, BaseViewSet):
     """ViewSet for managing offers"""
     queryset = Offer.objects.all()
     serializer_class = OfferSerializer
+    cache_families = ('offers',)
 
     def get_permissions(self):
         """Set permissions based on action"""
@@ -346,25 +581,29 @@ class OfferViewSet(BaseViewSet):
         queryset = super().get_queryset()
         if not (self.request.user.is_authenticated and self.request.user.is_admin):
             queryset = queryset.filter(is_active=True)
-        return queryset.order_by('-start_date')
+        # Tour counts come from the same grouped query instead of a COUNT per offer
+        return queryset.annotate(
+            applicable_tours_total=Count('applicable_tours')
+        ).order_by('-start_date')
 
     @action(detail=False, methods=['get'])
+    @cache_response
     def current(self, request):
-        """Get currently valid offers"""
-        from django.utils import timezone
-        today = timezone.now().date()
-        
-        offers = self.get_queryset().filter(
-            start_date__lte=today,
-            end_date__gte=today,
-            is_active=True
+        """Get currently valid offers, served from the process-wide offer index"""
+        offers = get_offer_index().current_offers()
+
+        last_modified = max((offer.updated_at for offer in offers), default=None)
+        validators = build_validators(
+            make_etag(Offer._meta.label, len(offers), last_modified, *self.get_validator_context())
         )
+        if is_not_modified(request, validators):
+            return not_modified_response(validators)
         
         serializer = self.get_serializer(offers, many=True)
-        return APIResponse.success(
+        return apply_validators(APIResponse.success(
             data=serializer.data,
             message="Current offers retrieved successfully"
-        )
+        ), validators)
 
 
 class CustomPackageViewSet(BaseViewSet):
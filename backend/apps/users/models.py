@@ -80,4 +80,21 @@ class User(AbstractUser):
         if self.role == 'ADMIN':
             from django.core.exceptions import ValidationError
             raise ValidationError("Admin user cannot be deleted.")
-        super().delete(*args, **kwargs)
\ No newline at end of file
+        super().delete(*args, **kwargs)
+
+
+class TokenUser(User):
+    """
+    User rebuilt from access token claims without a database query
+    Fields missing from the token stay deferred and are loaded together on first access
+    """
+
+    class Meta:
+        proxy = True
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        """Load every deferred field in one query instead of one query per field"""
+        deferred = self.get_deferred_fields()
+        if fields is not None and deferred and set(fields) <= deferred:
+            fields = deferred
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
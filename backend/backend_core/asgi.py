@@ -13,4 +13,11 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend_core.settings.development')
 
-application = get_asgi_application()
\ No newline at end of file
+application = get_asgi_application()
+
+# Worker-start hooks, after the app registry is ready
+from apps.authentication.activity import start_login_activity_flusher  # noqa: E402
+from apps.tours.search_engine import warm_search_engine  # noqa: E402
+
+start_login_activity_flusher()
+warm_search_engine()
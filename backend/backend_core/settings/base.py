@@ -96,6 +96,35 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing policy: 'pbkdf2' (Django's default), 'scrypt' or 'argon2' (needs
+# argon2-cffi). New hashes use the policy's hasher with PASSWORD_HASHING_PARAMS; hashes
+# from another policy or other parameters still verify and are upgraded on login
+PASSWORD_HASHING_POLICIES = {
+    'pbkdf2': 'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'scrypt': 'apps.authentication.hashers.TunedScryptPasswordHasher',
+    'argon2': 'apps.authentication.hashers.TunedArgon2PasswordHasher',
+}
+PASSWORD_HASHING_POLICY = os.environ.get('PASSWORD_HASHING_POLICY', 'pbkdf2')
+PASSWORD_HASHING_PARAMS = {
+    'scrypt': {
+        'work_factor': int(os.environ.get('SCRYPT_WORK_FACTOR', 2 ** 14)),
+        'block_size': 8,
+        'parallelism': int(os.environ.get('SCRYPT_PARALLELISM', 1)),
+    },
+    'argon2': {
+        'time_cost': int(os.environ.get('ARGON2_TIME_COST', 2)),
+        'memory_cost': int(os.environ.get('ARGON2_MEMORY_COST', 19456)),
+        'parallelism': int(os.environ.get('ARGON2_PARALLELISM', 1)),
+    },
+}
+PASSWORD_HASHERS = [PASSWORD_HASHING_POLICIES[PASSWORD_HASHING_POLICY]] + [
+    hasher for policy, hasher in PASSWORD_HASHING_POLICIES.items() if policy != PASSWORD_HASHING_POLICY
+] + ['django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher']
+
+# Password upgrades made while authenticating are saved by the login views'
+# last_login write instead of a separate UPDATE
+AUTHENTICATION_BACKENDS = ['apps.authentication.backends.LoginBackend']
+
 # Internationalization
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
@@ -116,7 +145,9 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Django REST Framework configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # Authenticates from token claims; use rest_framework_simplejwt's
+        # JWTAuthentication to load the user row on every request instead
+        'apps.authentication.authentication.ClaimsJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',  # Changed from IsAuthenticated to AllowAny
@@ -124,18 +155,92 @@ REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': [
         'rest_framework.renderers.JSONRenderer',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'apps.core.pagination.StandardPageNumberPagination',
     'PAGE_SIZE': 20,
     'DATETIME_FORMAT': '%Y-%m-%dT%H:%M:%S.%fZ',
+    # Sliding-window limits on credential endpoints (apps.authentication.throttling),
+    # checked before any password is hashed; counters live in the default cache
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': os.environ.get('THROTTLE_LOGIN_IP', '60/min'),
+        'login_email': os.environ.get('THROTTLE_LOGIN_EMAIL', '10/min'),
+        'register_ip': os.environ.get('THROTTLE_REGISTER_IP', '20/hour'),
+    },
 }
 
+# Source of tour rating/review/capacity aggregates in API responses:
+# 'stored' reads the columns maintained on Tour, 'annotated' computes them
+# live with correlated subqueries in the same SELECT
+TOUR_AGGREGATES_SOURCE = os.environ.get('TOUR_AGGREGATES_SOURCE', 'stored')
+
+# Text search configuration for the tour search vector (PostgreSQL)
+TOUR_SEARCH_CONFIG = os.environ.get('TOUR_SEARCH_CONFIG', 'simple')
+
+# Tour search backend: 'database' queries the full-text index per request,
+# 'memory' answers filters and sorts from an in-process index (apps.tours.search_engine)
+# that delta-syncs on catalogue changes and is rebuilt from scratch periodically
+TOUR_SEARCH_ENGINE = os.environ.get('TOUR_SEARCH_ENGINE', 'database')
+TOUR_SEARCH_ENGINE_REBUILD_INTERVAL = 3600
+
+# Histogram bucket widths of the tour search facets (?facets=true)
+TOUR_FACET_PRICE_BUCKET_WIDTH = 500
+TOUR_FACET_DURATION_BUCKET_WIDTH = 3
+
+# Maximum number of items in one bulk price quote request
+TOUR_BULK_QUOTE_LIMIT = 500
+
+# Seconds a pending booking holds its seats before they are released
+BOOKING_HOLD_TTL = int(os.environ.get('BOOKING_HOLD_TTL', 15 * 60))
+
+# Payment gateway class and its constructor options; the fake gateway simulates
+# latency, declines, transient errors and webhook-settled charges in process
+PAYMENT_GATEWAY = os.environ.get('PAYMENT_GATEWAY', 'apps.payments.gateways.FakeGateway')
+PAYMENT_GATEWAY_OPTIONS = {
+    'latency': float(os.environ.get('FAKE_GATEWAY_LATENCY', 0.2)),
+    'jitter': float(os.environ.get('FAKE_GATEWAY_JITTER', 0.1)),
+    'decline_rate': float(os.environ.get('FAKE_GATEWAY_DECLINE_RATE', 0.0)),
+    'error_rate': float(os.environ.get('FAKE_GATEWAY_ERROR_RATE', 0.0)),
+    'processing_rate': float(os.environ.get('FAKE_GATEWAY_PROCESSING_RATE', 0.0)),
+}
+PAYMENT_WEBHOOK_SECRET = os.environ.get('PAYMENT_WEBHOOK_SECRET', '')
+PAYMENT_GATEWAY_MAX_ATTEMPTS = 5
+
+# Settlement worker (manage.py settle_payments): payments claimed per batch, charges in
+# flight at once, seconds a claim is leased, and seconds a paid booking's hold is extended
+PAYMENT_SETTLEMENT_BATCH_SIZE = 200
+PAYMENT_SETTLEMENT_CONCURRENCY = 50
+PAYMENT_SETTLEMENT_LEASE = 120
+PAYMENT_SETTLEMENT_HOLD = 30 * 60
+
+# Invoice numbering (<prefix>-<year>-<number>), payment terms in days and bookings
+# invoiced per transaction by manage.py generate_invoices
+INVOICE_NUMBER_PREFIX = 'INV'
+INVOICE_DUE_DAYS = 7
+INVOICE_BATCH_SIZE = 1000
+
+# Refunds claimed per transaction by manage.py process_refunds
+REFUND_CHUNK_SIZE = 200
+
+# Seconds a user's active flag and role are cached for token authentication; a
+# deactivated user or changed role takes at most this long to revoke issued tokens
+AUTH_USER_STATE_TTL = 30
+
+# Login write-behind buffer: last_login times and login audit events are written in one
+# batch once this many are pending or the oldest has waited this many seconds
+LOGIN_ACTIVITY_MAX_EVENTS = 200
+LOGIN_ACTIVITY_FLUSH_INTERVAL = 5
+
+# Lifetime in seconds of cached catalogue responses (0 disables the cache);
+# entries are invalidated early through per-family generation counters
+RESPONSE_CACHE_TIMEOUT = 300
+
 # JWT Configuration (no refresh tokens as per requirements)
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=1),
     'REFRESH_TOKEN_LIFETIME': None,  # Disable refresh tokens
     'ROTATE_REFRESH_TOKENS': False,
     'BLACKLIST_AFTER_ROTATION': False,
-    'UPDATE_LAST_LOGIN': True,
+    # last_login is written behind by apps.authentication.activity on every login path
+    'UPDATE_LAST_LOGIN': False,
     'ALGORITHM': 'HS256',
     'SIGNING_KEY': SECRET_KEY,
     'VERIFYING_KEY': None,
@@ -168,6 +273,7 @@ CORS_ALLOW_HEADERS = [
     'user-agent',
     'x-csrftoken',
     'x-requested-with',
+    'idempotency-key',
 ]
 
 # Logging Configuration
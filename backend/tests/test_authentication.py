@@ -8,6 +8,7 @@ from django.contrib.auth import get_user_model
 from django.urls import reverse
 from rest_framework import status
 from rest_framework_simplejwt.tokens import AccessToken
+from apps.authentication.activity import reset_login_activity
 import json
 import time
 
@@ -18,6 +19,7 @@ class AuthenticationPropertyTest(TestCase):
     """Property tests for authentication system"""
     
     def setUp(self):
+        reset_login_activity()
         self.client = Client()
         
         # Create admin user
@@ -0,0 +1,87 @@
+"""
+Tests for the availability calendar
+Covers per-day seats of dated and undated tours, grouped queries and grid invalidation
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.tours.models import Destination, Tour, TourDeparture
+
+User = get_user_model()
+
+
+class AvailabilityCalendarTest(TestCase):
+    """Month grids report remaining seats per day"""
+
+    def setUp(self):
+        cache.clear()
+        destination = Destination.objects.create(name='Andaman', country='India')
+        self.scheduled = Tour.objects.create(
+            name='Island Hopping', description='Ferries', destination=destination,
+            duration_days=4, max_capacity=6, base_price=Decimal('2000.00'),
+        )
+        self.undated = Tour.objects.create(
+            name='Reef Snorkel', description='Coral', destination=destination,
+            duration_days=1, max_capacity=3, base_price=Decimal('500.00'),
+        )
+        # The first day of next month is always in the future
+        self.first = (timezone.localdate().replace(day=28) + timedelta(days=4)).replace(day=1)
+        self.month = self.first.strftime('%Y-%m')
+        self.departure = TourDeparture.objects.create(
+            tour=self.scheduled, departure_date=self.first + timedelta(days=2), capacity=5
+        )
+        self.user = User.objects.create_user(
+            username='diver', email='diver@test.com', password='DiverPass123!'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def grid(self, tour):
+        response = self.client.get(f'/api/v1/tours/{tour.pk}/availability/', {'month': self.month})
+        self.assertEqual(response.status_code, 200)
+        return {row['date']: row['available_seats'] for row in response.json()['data']['days']}
+
+    def test_scheduled_and_undated_grids(self):
+        """Dated tours have seats on departure days only; undated tours share one pool"""
+        third = (self.first + timedelta(days=2)).isoformat()
+        days = self.grid(self.scheduled)
+        self.assertEqual(days[third], 5)
+        self.assertEqual(sum(days.values()), 5)
+
+        self.assertEqual(set(self.grid(self.undated).values()), {3})
+
+    def test_bookings_and_cancellations_refresh_cached_grids(self):
+        """Grids are served from cache until a booking changes the seat counters"""
+        third = (self.first + timedelta(days=2)).isoformat()
+        self.assertEqual(self.grid(self.scheduled)[third], 5)
+
+        response = self.client.post('/api/v1/bookings/', {
+            'tour': str(self.scheduled.pk), 'departure': str(self.departure.pk), 'travelers_count': 2
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.grid(self.scheduled)[third], 3)
+
+        self.client.post(f"/api/v1/bookings/{response.json()['data']['id']}/cancel/")
+        self.assertEqual(self.grid(self.scheduled)[third], 5)
+
+    def test_multi_tour_calendar_uses_constant_queries(self):
+        """Several tours cost the same queries as one, and nothing once cached"""
+        params = {'month': self.month, 'tours': f'{self.scheduled.pk},{self.undated.pk}'}
+        # Visibility check, tours, departures in the month
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/v1/tours/availability/', params)
+        self.assertEqual(
+            [grid['tour'] for grid in response.json()['data']],
+            [str(self.scheduled.pk), str(self.undated.pk)]
+        )
+        with self.assertNumQueries(1):
+            self.client.get('/api/v1/tours/availability/', params)
+
+        self.assertEqual(self.client.get('/api/v1/tours/availability/', {'month': '2026-13'}).status_code, 400)
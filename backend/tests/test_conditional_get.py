@@ -0,0 +1,99 @@
+"""
+Tests for conditional GET support in BaseViewSet
+Covers ETag/Last-Modified validators and 304 responses
+"""
+
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils.http import http_date
+
+from apps.tours.models import Destination, Tour
+
+
+class ConditionalGetTest(TestCase):
+    """List and detail endpoints answer revalidation with 304 Not Modified"""
+
+    def setUp(self):
+        cache.clear()
+        self.destination = Destination.objects.create(name='Kashmir', country='India')
+        self.tour = Tour.objects.create(
+            name='Dal Lake Retreat',
+            description='Shikaras and gardens',
+            destination=self.destination,
+            duration_days=4,
+            base_price=Decimal('2500.00'),
+        )
+
+    @override_settings(RESPONSE_CACHE_TIMEOUT=0)
+    def test_list_etag_revalidation(self):
+        """A matching If-None-Match skips the page query and serialization"""
+        response = self.client.get('/api/v1/tours/')
+        etag = response['ETag']
+        self.assertTrue(etag.startswith('"'))
+        self.assertNotIn('Last-Modified', response)
+
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/v1/tours/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+
+        Tour.objects.create(
+            name='Gulmarg Snow',
+            description='Gondola rides',
+            destination=self.destination,
+            duration_days=2,
+            base_price=Decimal('1800.00'),
+        )
+        response = self.client.get('/api/v1/tours/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    @override_settings(RESPONSE_CACHE_TIMEOUT=0)
+    def test_detail_last_modified_revalidation(self):
+        """If-Modified-Since at or after updated_at yields 304"""
+        url = f'/api/v1/tours/{self.tour.pk}/'
+        response = self.client.get(url)
+        last_modified = response['Last-Modified']
+
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+        earlier = http_date(self.tour.updated_at.timestamp() - 60)
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=earlier)
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(RESPONSE_CACHE_TIMEOUT=0)
+    def test_list_changes_without_a_newer_row_are_not_stale(self):
+        """Deleting a row leaves max(updated_at) in place but still changes the list"""
+        Tour.objects.create(
+            name='Pahalgam Trails',
+            description='Meadows and rivers',
+            destination=self.destination,
+            duration_days=3,
+            base_price=Decimal('2000.00'),
+        )
+        etag = self.client.get('/api/v1/tours/')['ETag']
+        self.tour.delete()
+
+        response = self.client.get('/api/v1/tours/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get('/api/v1/tours/', HTTP_IF_MODIFIED_SINCE=http_date())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['data']), 1)
+
+    def test_cached_response_revalidates_without_queries(self):
+        """Validators are cached with the body, so a warm 304 needs no database"""
+        etag = self.client.get('/api/v1/tours/')['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/v1/tours/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_current_offers_carry_validators(self):
+        """The polled current offers endpoint also supports revalidation"""
+        etag = self.client.get('/api/v1/tours/offers/current/')['ETag']
+        response = self.client.get('/api/v1/tours/offers/current/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
@@ -0,0 +1,83 @@
+"""
+Tests for bulk invoice generation
+Covers gap-free block numbering, batch query counts and rendered invoice documents
+"""
+
+import tempfile
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.bookings.models import Booking
+from apps.payments.invoicing import generate_invoices, invoice_series
+from apps.payments.models import Invoice, Payment
+from apps.tours.models import Destination, Tour
+
+User = get_user_model()
+
+
+class InvoiceGenerationTest(TestCase):
+    """Confirmed bookings are invoiced once, in numbered blocks"""
+
+    def setUp(self):
+        destination = Destination.objects.create(name='Hampi', country='India')
+        self.tour = Tour.objects.create(
+            name='Boulder Ruins', description='Temples', destination=destination,
+            duration_days=2, base_price=Decimal('700.00'),
+        )
+        self.user = User.objects.create_user(
+            username='scholar', email='scholar@test.com', password='ScholarPass123!'
+        )
+        self.bookings = [
+            Booking.objects.create(
+                user=self.user, tour=self.tour, travelers_count=1,
+                total_price=Decimal('700.00') * (number + 1), status='CONFIRMED',
+            )
+            for number in range(5)
+        ]
+        Booking.objects.create(
+            user=self.user, tour=self.tour, travelers_count=1, total_price=Decimal('700.00')
+        )
+        Payment.objects.create(booking=self.bookings[0], amount=Decimal('700.00'), status='SUCCESS')
+
+    def test_bookings_are_invoiced_once_with_consecutive_numbers(self):
+        """Batches share one gap-free series and rerunning finds nothing left"""
+        first = next(generate_invoices(batch_size=3))
+        # Savepoint, sequence lock, uninvoiced SELECT, sequence UPDATE, one INSERT, release
+        with self.assertNumQueries(6):
+            rest = next(generate_invoices(batch_size=3))
+
+        series = invoice_series()
+        self.assertEqual(
+            [invoice.invoice_number for invoice in first + rest],
+            [f'{series}-{number:07d}' for number in range(1, 6)]
+        )
+        self.assertEqual(list(generate_invoices()), [])
+
+        statuses = dict(Invoice.objects.values_list('booking_id', 'status'))
+        self.assertEqual(statuses[self.bookings[0].pk], 'PAID')
+        self.assertEqual(statuses[self.bookings[1].pk], 'UNPAID')
+        self.assertEqual(Invoice.objects.get(booking=self.bookings[4]).amount, Decimal('3500.00'))
+
+    def test_command_renders_documents(self):
+        """The command writes one document per invoice and the API serves them"""
+        with tempfile.TemporaryDirectory() as directory:
+            out = StringIO()
+            call_command('generate_invoices', '--render', '--output-dir', directory, stdout=out)
+            self.assertIn('Generated 5 invoice(s)', out.getvalue())
+            documents = sorted(path.name for path in Path(directory).iterdir())
+        self.assertEqual(len(documents), 5)
+
+        invoice = Invoice.objects.get(booking=self.bookings[0])
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.get(f'/api/v1/payments/invoices/{invoice.pk}/')
+        self.assertEqual(response.json()['booking_id'], str(self.bookings[0].pk))
+        response = client.get(f'/api/v1/payments/invoices/{invoice.pk}/document/')
+        self.assertContains(response, invoice.invoice_number)
+        self.assertContains(response, 'Boulder Ruins')
@@ -0,0 +1,95 @@
+"""
+Tests for keyset (cursor) pagination
+Covers forward/backward traversal and the paginated envelope without counts
+"""
+
+import base64
+import json
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.bookings.models import Booking
+from apps.tours.models import Destination, Tour
+
+User = get_user_model()
+
+
+@override_settings(REST_FRAMEWORK={
+    'DEFAULT_AUTHENTICATION_CLASSES': ['rest_framework_simplejwt.authentication.JWTAuthentication'],
+    'DEFAULT_PAGINATION_CLASS': 'apps.core.pagination.StandardPageNumberPagination',
+    'PAGE_SIZE': 3,
+})
+class KeysetPaginationTest(TestCase):
+    """Cursor mode walks (created_at, id) without COUNT(*) or OFFSET"""
+
+    def setUp(self):
+        cache.clear()
+        self.destination = Destination.objects.create(name='Rishikesh', country='India')
+        self.tour = Tour.objects.create(
+            name='Ganga Rafting',
+            description='White water',
+            destination=self.destination,
+            duration_days=2,
+            base_price=Decimal('800.00'),
+        )
+        self.user = User.objects.create_user(
+            username='rafter', email='rafter@test.com', password='RafterPass123!'
+        )
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(self.user)}'}
+        self.bookings = [
+            Booking.objects.create(
+                user=self.user, tour=self.tour, travelers_count=1, total_price=Decimal('800.00')
+            )
+            for _ in range(7)
+        ]
+
+    def test_forward_and_backward_traversal(self):
+        """Pages chain through next/previous links without gaps or repeats"""
+        url = '/api/v1/bookings/?pagination=cursor'
+        seen = []
+        pages = []
+        while url:
+            body = self.client.get(url, **self.auth).json()
+            self.assertNotIn('count', body['pagination'])
+            seen.extend(row['id'] for row in body['data'])
+            pages.append(body)
+            url = body['pagination']['next']
+
+        expected = [
+            str(booking.pk) for booking in
+            Booking.objects.order_by('-created_at', '-id')
+        ]
+        self.assertEqual(seen, expected)
+        self.assertEqual([len(page['data']) for page in pages], [3, 3, 1])
+        self.assertIsNone(pages[0]['pagination']['previous'])
+
+        previous = self.client.get(pages[2]['pagination']['previous'], **self.auth).json()
+        self.assertEqual(previous['data'], pages[1]['data'])
+
+    def test_cursor_pages_skip_count_query(self):
+        """A cursor page is one SELECT after authentication"""
+        # User lookup for the token, then the page joined to its tours
+        with self.assertNumQueries(2):
+            self.client.get('/api/v1/bookings/?pagination=cursor', **self.auth)
+
+    def test_base_viewset_envelope(self):
+        """BaseViewSet lists keep the APIResponse.paginated envelope in cursor mode"""
+        body = self.client.get('/api/v1/tours/?pagination=cursor').json()
+        self.assertTrue(body['success'])
+        self.assertEqual(body['pagination']['page_size'], 3)
+        self.assertNotIn('total_pages', body['pagination'])
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get('/api/v1/bookings/?cursor=not-a-cursor', **self.auth)
+        self.assertEqual(response.status_code, 404)
+
+    def test_tampered_cursor_is_rejected(self):
+        """A well-formed cursor whose id is not a key of the model is a 404, not a 500"""
+        payload = json.dumps({'d': 'n', 'c': '2026-01-01T00:00:00+00:00', 'i': 'zzz'})
+        cursor = base64.urlsafe_b64encode(payload.encode()).decode()
+        response = self.client.get(f'/api/v1/bookings/?pagination=cursor&cursor={cursor}', **self.auth)
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,134 @@
+"""
+Tests for the login activity buffer
+Covers coalesced last_login writes, batched audit events and flush triggers
+"""
+
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.authentication.activity import LoginActivityBuffer, get_login_activity, reset_login_activity
+from apps.authentication.models import LoginEvent
+
+User = get_user_model()
+
+
+class LoginActivityBufferTest(TestCase):
+    """Logins are written behind, in batches"""
+
+    def setUp(self):
+        reset_login_activity()
+        self.users = [
+            User.objects.create_user(
+                username=f'pilgrim{number}', email=f'pilgrim{number}@test.com', password='PilgrimPass123!'
+            )
+            for number in range(2)
+        ]
+
+    def test_batch_flushes_at_max_events(self):
+        """Pending logins cost no queries until the batch is full, then three"""
+        buffer = LoginActivityBuffer(max_events=3, flush_interval=3600)
+        start = timezone.now()
+        with self.assertNumQueries(0):
+            buffer.record(self.users[0].pk, 'CUSTOMER_LOGIN', '10.0.0.1', start)
+            buffer.record(self.users[1].pk, 'CUSTOMER_LOGIN', '10.0.0.2', start)
+        # UPDATE ... CASE of last_login, existing users, multi-row INSERT
+        with self.assertNumQueries(3):
+            buffer.record(self.users[0].pk, 'CUSTOMER_LOGIN', '10.0.0.1', start + timedelta(minutes=1))
+        self.assertEqual(len(buffer), 0)
+
+        last_logins = dict(User.objects.values_list('pk', 'last_login'))
+        self.assertEqual(last_logins[self.users[0].pk], start + timedelta(minutes=1))
+        self.assertEqual(last_logins[self.users[1].pk], start)
+        self.assertEqual(LoginEvent.objects.filter(user=self.users[0]).count(), 2)
+
+    def test_flush_never_moves_last_login_back(self):
+        """A worker flushing an older login keeps the newer one another worker wrote"""
+        start = timezone.now()
+        User.objects.filter(pk=self.users[0].pk).update(last_login=start)
+        buffer = LoginActivityBuffer(max_events=10, flush_interval=3600)
+        buffer.record(self.users[0].pk, 'CUSTOMER_LOGIN', when=start - timedelta(minutes=1))
+        buffer.record(self.users[1].pk, 'CUSTOMER_LOGIN', when=start - timedelta(minutes=1))
+        self.assertEqual(buffer.flush(), 2)
+
+        last_logins = dict(User.objects.values_list('pk', 'last_login'))
+        self.assertEqual(last_logins[self.users[0].pk], start)
+        self.assertEqual(last_logins[self.users[1].pk], start - timedelta(minutes=1))
+
+    def test_failed_flush_keeps_last_login_and_retries_events_once(self):
+        """A failed write leaves last_login pending, and events get one more attempt"""
+        buffer = LoginActivityBuffer(max_events=10, flush_interval=3600)
+        buffer.record(self.users[0].pk, 'CUSTOMER_LOGIN')
+        failing = mock.patch.object(LoginEvent.objects, 'bulk_create', side_effect=DatabaseError)
+        with failing, self.assertLogs('apps.authentication', 'ERROR'):
+            self.assertEqual(buffer.flush(), 0)
+        self.assertEqual(len(buffer), 1)
+
+        buffer.record(self.users[1].pk, 'CUSTOMER_LOGIN')
+        with failing, self.assertLogs('apps.authentication', 'ERROR'):
+            self.assertEqual(buffer.flush(), 0)
+        # The first event failed twice and is dropped; the second gets its retry
+        self.assertEqual(len(buffer), 1)
+        self.assertEqual(buffer.flush(), 1)
+        self.assertEqual(list(LoginEvent.objects.values_list('user_id', flat=True)), [self.users[1].pk])
+        self.assertEqual(User.objects.filter(last_login__isnull=False).count(), 2)
+
+    def test_events_of_deleted_users_are_skipped(self):
+        """A user deleted before the flush does not fail the batch"""
+        buffer = LoginActivityBuffer(max_events=10, flush_interval=3600)
+        buffer.record(self.users[0].pk, 'CUSTOMER_LOGIN')
+        buffer.record(self.users[1].pk, 'CUSTOMER_LOGIN')
+        self.users[1].delete()
+        self.assertEqual(buffer.flush(), 2)
+        self.assertEqual(list(LoginEvent.objects.values_list('user_id', flat=True)), [self.users[0].pk])
+
+    @override_settings(LOGIN_ACTIVITY_FLUSH_INTERVAL=0)
+    def test_login_view_records_activity(self):
+        """A login past the flush interval is written by that request"""
+        response = APIClient().post('/api/v1/auth/login/', {
+            'email': 'pilgrim0@test.com', 'password': 'PilgrimPass123!'
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(get_login_activity()), 0)
+        event = LoginEvent.objects.get()
+        self.assertEqual((event.kind, event.ip_address), ('CUSTOMER_LOGIN', '127.0.0.1'))
+        self.users[0].refresh_from_db()
+        self.assertEqual(self.users[0].last_login, event.occurred_at)
+
+    def test_no_login_path_writes_last_login_directly(self):
+        """simplejwt's last_login write is off, and its token pair endpoint is not routed"""
+        self.assertFalse(settings.SIMPLE_JWT['UPDATE_LAST_LOGIN'])
+        response = APIClient().post('/api/token/', {
+            'email': 'pilgrim1@test.com', 'password': 'PilgrimPass123!'
+        }, format='json')
+        self.assertEqual(response.status_code, 404)
+        self.users[1].refresh_from_db()
+        self.assertIsNone(self.users[1].last_login)
+
+
+class LoginActivityFlusherTest(TransactionTestCase):
+    """A started buffer writes from its own thread, off the request path"""
+
+    def test_due_logins_are_written_in_the_background(self):
+        """Recording a due login costs no queries, and the flusher writes it shortly after"""
+        user = User.objects.create_user(username='drifter', email='drifter@test.com', password='DrifterPass123!')
+        buffer = LoginActivityBuffer(max_events=1, flush_interval=3600)
+        buffer.start()
+        try:
+            with self.assertNumQueries(0):
+                buffer.record(user.pk, 'CUSTOMER_LOGIN')
+            deadline = time.monotonic() + 5
+            while not LoginEvent.objects.exists() and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            buffer.stop()
+        self.assertEqual(LoginEvent.objects.get().user_id, user.pk)
+        user.refresh_from_db()
+        self.assertIsNotNone(user.last_login)
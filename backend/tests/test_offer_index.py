@@ -0,0 +1,78 @@
+"""
+Tests for the active offer index
+Covers day and change based rebuilds and the query-free current offers endpoint
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.tours.models import Destination, Offer, Tour
+from apps.tours.offer_index import get_offer_index, reset_offer_index
+
+
+class ActiveOfferIndexTest(TestCase):
+    """Offers valid today are indexed per tour and refreshed on change"""
+
+    def setUp(self):
+        cache.clear()
+        reset_offer_index()
+        self.today = timezone.localdate()
+        destination = Destination.objects.create(name='Coorg', country='India')
+        self.tours = [
+            Tour.objects.create(
+                name=f'Coffee Estate {number}', description='Plantation', destination=destination,
+                duration_days=2, base_price=Decimal('900.00'),
+            )
+            for number in range(3)
+        ]
+        self.monsoon = self.offer('Monsoon', '15.00', 0, 10, self.tours)
+        self.weekend = self.offer('Weekend', '25.00', 0, 1, self.tours[:1])
+        self.later = self.offer('Diwali', '40.00', 3, 10, self.tours)
+
+    def offer(self, name, discount, starts_in, ends_in, tours):
+        offer = Offer.objects.create(
+            name=name, discount_percentage=Decimal(discount),
+            start_date=self.today + timedelta(days=starts_in),
+            end_date=self.today + timedelta(days=ends_in),
+        )
+        offer.applicable_tours.set(tours)
+        return offer
+
+    def test_best_offer_per_tour_follows_days_and_changes(self):
+        """Lookups pick the best current offer, rebuilding at day change or on writes"""
+        index = get_offer_index()
+        self.assertEqual(index.best_offer(self.tours[0].pk), self.weekend)
+        self.assertEqual(index.best_offer(self.tours[1].pk), self.monsoon)
+
+        self.monsoon.applicable_tours.remove(self.tours[1])
+        self.assertIsNone(get_offer_index().best_offer(self.tours[1].pk))
+
+        # Two days on, the weekend offer lapsed and Diwali is not yet on
+        later = self.today + timedelta(days=2)
+        with mock.patch('apps.tours.offer_index.timezone.localdate', return_value=later):
+            index = get_offer_index()
+            self.assertEqual(index.best_offer(self.tours[0].pk), self.monsoon)
+            self.assertEqual([offer.name for offer in index.current_offers()], ['Monsoon'])
+
+    def test_current_offers_served_from_the_index(self):
+        """Current offers and their tour counts cost no queries once indexed"""
+        get_offer_index()
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/v1/tours/offers/current/')
+        self.assertEqual(
+            sorted((row['name'], row['applicable_tours_count']) for row in response.json()['data']),
+            [('Monsoon', 3), ('Weekend', 1)]
+        )
+
+        # Validators aggregate, then one page of offers with grouped tour counts
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/v1/tours/offers/')
+        self.assertEqual(
+            sorted((row['name'], row['applicable_tours_count']) for row in response.json()['data']),
+            [('Diwali', 3), ('Monsoon', 3), ('Weekend', 1)]
+        )
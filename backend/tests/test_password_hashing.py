@@ -0,0 +1,72 @@
+"""
+Tests for the password hashing policy
+Covers hash upgrades saved with last_login and the login benchmark command
+"""
+
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.authentication.activity import reset_login_activity
+
+User = get_user_model()
+
+FAST_SCRYPT = {'scrypt': {'work_factor': 2 ** 10, 'block_size': 8, 'parallelism': 1}}
+SCRYPT_POLICY = [
+    'apps.authentication.hashers.TunedScryptPasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+]
+
+
+@override_settings(PASSWORD_HASHING_PARAMS=FAST_SCRYPT)
+class PasswordHashingPolicyTest(TestCase):
+    """Logins move hashes onto the configured policy"""
+
+    def setUp(self):
+        reset_login_activity()
+        self.user = User.objects.create_user(
+            username='surfer', email='surfer@test.com', password='SurferPass123!'
+        )
+
+    def login(self):
+        return APIClient().post('/api/v1/auth/login/', {
+            'email': 'surfer@test.com', 'password': 'SurferPass123!'
+        }, format='json')
+
+    def test_login_upgrades_the_hash_in_the_last_login_write(self):
+        """An old-policy hash is replaced alongside last_login in a single UPDATE"""
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$'))
+        with override_settings(PASSWORD_HASHERS=SCRYPT_POLICY):
+            # User lookup, then one UPDATE of last_login and password
+            with self.assertNumQueries(2):
+                response = self.login()
+            self.assertEqual(response.status_code, 200)
+
+            self.user.refresh_from_db()
+            self.assertTrue(self.user.password.startswith('scrypt$1024$'))
+            self.assertIsNotNone(self.user.last_login)
+            self.assertTrue(self.user.check_password('SurferPass123!'))
+            self.assertEqual(self.login().status_code, 200)
+
+    def test_rehash_never_moves_last_login_back(self):
+        """The immediate last_login write keeps a newer one a worker already flushed"""
+        later = timezone.now() + timedelta(minutes=5)
+        User.objects.filter(pk=self.user.pk).update(last_login=later)
+        with override_settings(PASSWORD_HASHERS=SCRYPT_POLICY):
+            self.assertEqual(self.login().status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('scrypt$'))
+        self.assertEqual(self.user.last_login, later)
+
+    def test_benchmark_reports_logins_per_second(self):
+        """The benchmark runs against the chosen policy and leaves no user behind"""
+        out = StringIO()
+        call_command('benchmark_logins', '--logins', '2', '--policy', 'scrypt', stdout=out)
+        self.assertIn('scrypt:', out.getvalue())
+        self.assertIn('logins/s per worker', out.getvalue())
+        self.assertFalse(User.objects.filter(username='login-benchmark').exists())
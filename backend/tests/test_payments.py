@@ -0,0 +1,160 @@
+"""
+Tests for payment processing
+Covers Idempotency-Key replays, gateway settlement outcomes and webhook reconciliation
+"""
+
+import json
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.bookings.models import Booking
+from apps.bookings.reservations import hold_seats
+from apps.payments.gateways import FakeGateway, PaymentGateway, reset_gateway
+from apps.payments.models import IdempotencyKey, Payment, Refund
+from apps.payments.settlement import settle_due_payments
+from apps.tours.models import Destination, Tour
+
+User = get_user_model()
+
+
+class PaymentTestMixin:
+    """A held booking and an authenticated client paying for it"""
+
+    def setUp(self):
+        destination = Destination.objects.create(name='Meghalaya', country='India')
+        self.tour = Tour.objects.create(
+            name='Living Root Bridges', description='Trek', destination=destination,
+            duration_days=4, max_capacity=10, base_price=Decimal('1500.00'),
+        )
+        self.user = User.objects.create_user(
+            username='hiker', email='hiker@test.com', password='HikerPass123!'
+        )
+        self.booking = hold_seats(
+            tour=self.tour, travelers_count=2, user=self.user, total_price=Decimal('3000.00')
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def pay(self, key=None, amount='3000.00'):
+        headers = {'HTTP_IDEMPOTENCY_KEY': key} if key else {}
+        return self.client.post('/api/v1/payments/', {
+            'booking': str(self.booking.pk), 'amount': amount, 'payment_method': 'UPI'
+        }, format='json', **headers)
+
+
+class IdempotentPaymentTest(PaymentTestMixin, TestCase):
+    """Retried payment requests replay instead of paying twice"""
+
+    def test_retries_replay_the_first_payment(self):
+        """The same key returns the recorded payment without recording another"""
+        first = self.pay('retry-1')
+        self.assertEqual(first.status_code, 202)
+        self.assertEqual(first.json()['data']['status'], 'PENDING')
+
+        # A single key lookup answers the retry
+        with self.assertNumQueries(1):
+            second = self.pay('retry-1')
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+        self.assertEqual(second.json()['data']['id'], first.json()['data']['id'])
+        self.assertEqual(Payment.objects.count(), 1)
+
+        self.assertEqual(self.pay('retry-1', amount='1.00').status_code, 422)
+        self.assertEqual(self.pay('another-key').status_code, 409)
+
+    def test_paid_bookings_are_not_paid_again(self):
+        """Without keys, a second payment for a settled booking is refused"""
+        self.assertEqual(self.pay().status_code, 202)
+        self.assertEqual(self.pay().status_code, 409)
+        settle_due_payments(gateway=FakeGateway(latency=0, jitter=0))
+
+        response = self.pay()
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['message'], 'Booking already paid')
+        self.assertEqual(Payment.objects.filter(status='SUCCESS').count(), 1)
+        self.assertEqual(Payment.objects.count(), 1)
+
+    def test_failed_attempts_leave_the_key_reusable(self):
+        """A refused payment records neither a payment nor its key"""
+        Booking.objects.filter(pk=self.booking.pk).update(status='CANCELLED')
+        self.assertEqual(self.pay('retry-2').status_code, 409)
+        self.assertFalse(IdempotencyKey.objects.exists())
+        self.assertFalse(Payment.objects.exists())
+
+
+class PaymentSettlementTest(PaymentTestMixin, TestCase):
+    """The settlement worker charges pending payments and applies the outcome"""
+
+    def settle(self, **gateway_options):
+        return settle_due_payments(gateway=FakeGateway(**gateway_options))
+
+    def test_successful_charge_confirms_the_booking(self):
+        """A settled charge confirms the booking and stores the gateway reference"""
+        payment_id = self.pay().json()['data']['id']
+        self.assertEqual(self.settle()['succeeded'], 1)
+
+        payment = Payment.objects.get(pk=payment_id)
+        self.assertEqual(payment.status, 'SUCCESS')
+        self.assertTrue(payment.transaction_id.startswith('TXN-'))
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.status, 'CONFIRMED')
+        self.tour.refresh_from_db()
+        self.assertEqual(self.tour.reserved_seats, 2)
+        self.assertEqual(self.settle()['claimed'], 0)
+
+    def test_declines_and_transient_errors(self):
+        """Declines fail the payment; transient errors back off and retry later"""
+        payment_id = self.pay().json()['data']['id']
+        self.assertEqual(self.settle(error_rate=1.0)['retried'], 1)
+        # Backed off, so not due again yet
+        self.assertEqual(self.settle()['claimed'], 0)
+
+        Payment.objects.filter(pk=payment_id).update(next_attempt_at=self.booking.created_at)
+        self.assertEqual(self.settle(decline_rate=1.0)['declined'], 1)
+        payment = Payment.objects.get(pk=payment_id)
+        self.assertEqual((payment.status, payment.failure_reason), ('FAILED', 'Card declined'))
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.status, 'PENDING')
+
+    def test_charge_for_a_lost_booking_is_refunded(self):
+        """A booking cancelled while its charge was in flight gets a pending refund"""
+        self.pay()
+        Booking.objects.filter(pk=self.booking.pk).update(status='CANCELLED')
+        self.settle()
+        refund = Refund.objects.get()
+        self.assertEqual((refund.status, refund.amount), ('PENDING', Decimal('3000.00')))
+
+    def test_incomplete_gateways_fail_when_built(self):
+        """A gateway without its webhook methods cannot be instantiated"""
+        class ChargeOnlyGateway(PaymentGateway):
+            async def charge(self, idempotency_key, amount, method):
+                return None
+
+        with self.assertRaises(TypeError):
+            ChargeOnlyGateway()
+
+    @override_settings(PAYMENT_WEBHOOK_SECRET='hook-secret')
+    def test_webhook_settles_processing_payments(self):
+        """Charges left processing are settled by signed webhooks, once"""
+        reset_gateway()
+        self.addCleanup(reset_gateway)
+        payment_id = self.pay().json()['data']['id']
+        self.assertEqual(self.settle(processing_rate=1.0)['processing'], 1)
+        reference = Payment.objects.get(pk=payment_id).transaction_id
+
+        body = json.dumps({'reference': reference, 'status': 'SUCCESS'}).encode()
+        client = APIClient()
+        response = client.post('/api/v1/payments/webhook/', body, content_type='application/json',
+                               HTTP_X_GATEWAY_SIGNATURE='forged')
+        self.assertEqual(response.status_code, 403)
+
+        signature = FakeGateway().sign(body)
+        for applied in (True, False):
+            response = client.post('/api/v1/payments/webhook/', body, content_type='application/json',
+                                   HTTP_X_GATEWAY_SIGNATURE=signature)
+            self.assertEqual(response.json()['data']['applied'], applied)
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.status, 'CONFIRMED')
@@ -0,0 +1,150 @@
+"""
+Tests for tour price resolution
+Covers wrapping and overlapping seasons, offers, batched quotes and booking prices
+"""
+
+import json
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.tours.models import Destination, Offer, Season, Tour, TourPackage, TourPricing
+from apps.tours.offer_index import get_offer_index, reset_offer_index
+from apps.tours.pricing import PriceBook, PricingError, QuoteRequest
+
+User = get_user_model()
+
+
+class PriceBookTest(TestCase):
+    """Prices resolve from seasons, packages and offers"""
+
+    def setUp(self):
+        reset_offer_index()
+        destination = Destination.objects.create(name='Rajasthan', country='India')
+        self.tour = Tour.objects.create(
+            name='Desert Forts', description='Camels', destination=destination,
+            duration_days=5, base_price=Decimal('1000.00'),
+        )
+        self.other = Tour.objects.create(
+            name='Lake Palaces', description='Boats', destination=destination,
+            duration_days=3, base_price=Decimal('800.00'),
+        )
+        self.package = TourPackage.objects.create(
+            tour=self.tour, name='Deluxe', price_modifier=Decimal('250.00'), max_participants=10,
+        )
+        winter = Season.objects.create(name='Winter', start_month=11, end_month=2)
+        holidays = Season.objects.create(name='Holidays', start_month=12, end_month=12)
+        TourPricing.objects.create(tour=self.tour, season=winter, price=Decimal('1400.00'))
+        TourPricing.objects.create(tour=self.tour, season=holidays, price=Decimal('2000.00'))
+
+    def test_seasons_wrap_and_shorter_seasons_win(self):
+        """Winter spans the new year; the December peak overrides it"""
+        prices = PriceBook.load([self.tour.pk, self.other.pk])
+        quotes = prices.quote_many([
+            QuoteRequest(self.tour.pk, None, date(2027, 1, 15), 1),
+            QuoteRequest(self.tour.pk, None, date(2027, 12, 24), 1),
+            QuoteRequest(self.tour.pk, None, date(2027, 6, 1), 2),
+            QuoteRequest(self.other.pk, None, date(2027, 1, 15), 1),
+        ])
+        self.assertEqual(
+            [(quote.season, quote.total_price) for quote in quotes],
+            [('Winter', Decimal('1400.00')), ('Holidays', Decimal('2000.00')),
+             (None, Decimal('2000.00')), (None, Decimal('800.00'))]
+        )
+
+    def test_packages_offers_and_errors(self):
+        """Package modifiers add per traveler, the best current offer applies, bad items fail alone"""
+        today = timezone.localdate()
+        for name, discount, start in (('Flash', '10.00', -1), ('Mega', '20.00', -1), ('Later', '50.00', 5)):
+            offer = Offer.objects.create(
+                name=name, discount_percentage=Decimal(discount),
+                start_date=today + timedelta(days=start), end_date=today + timedelta(days=30),
+            )
+            offer.applicable_tours.add(self.tour)
+
+        # Offers come from the warm offer index
+        get_offer_index()
+        with self.assertNumQueries(3):
+            prices = PriceBook.load([self.tour.pk], [self.package.pk])
+        with self.assertNumQueries(0):
+            quotes = prices.quote_many([
+                QuoteRequest(self.tour.pk, self.package.pk, date(2027, 6, 1), 2),
+                QuoteRequest(self.other.pk, None, date(2027, 6, 1), 1),
+            ])
+        self.assertEqual((quotes[0].offer, quotes[0].total_price), ('Mega', Decimal('2000.00')))
+        self.assertIsInstance(quotes[1], PricingError)
+
+    def test_quote_endpoint_and_booking_price(self):
+        """The quote endpoint and new bookings use the same resolved price"""
+        client = APIClient()
+        response = client.get(f'/api/v1/tours/{self.tour.pk}/quote/', {
+            'date': '2027-12-20', 'package': str(self.package.pk), 'travelers': 2
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Decimal(str(response.json()['data']['total_price'])), Decimal('4500.00'))
+        self.assertEqual(
+            client.get(f'/api/v1/tours/{self.tour.pk}/quote/', {'travelers': 0}).status_code, 400
+        )
+
+        user = User.objects.create_user(username='nomad', email='nomad@test.com', password='NomadPass123!')
+        client.force_authenticate(user)
+        response = client.post('/api/v1/bookings/', {
+            'tour': str(self.other.pk), 'travelers_count': 3
+        }, format='json')
+        self.assertEqual(Decimal(str(response.json()['data']['total_price'])), Decimal('2400.00'))
+
+
+class BulkQuoteTest(TestCase):
+    """Bulk quotes price many items with a fixed number of queries"""
+
+    def setUp(self):
+        reset_offer_index()
+        destination = Destination.objects.create(name='Kutch', country='India')
+        self.tours = [
+            Tour.objects.create(
+                name=f'Salt Desert {number}', description='White sand', destination=destination,
+                duration_days=2, base_price=Decimal(100 * number),
+            )
+            for number in range(1, 6)
+        ]
+        self.hidden = Tour.objects.create(
+            name='Closed Camp', description='Off season', destination=destination,
+            duration_days=2, base_price=Decimal('999.00'), is_active=False,
+        )
+        season = Season.objects.create(name='Rann Utsav', start_month=11, end_month=2)
+        for tour in self.tours:
+            TourPricing.objects.create(tour=tour, season=season, price=tour.base_price * 2)
+
+    def post(self, quotes):
+        response = APIClient().post('/api/v1/tours/quotes/bulk/', {'quotes': quotes}, format='json')
+        self.assertEqual(response.status_code, 200)
+        return json.loads(b''.join(response.streaming_content))['data']
+
+    def test_batch_uses_fixed_queries_and_reports_item_errors(self):
+        """Hundreds of items cost a fixed number of queries; invalid items fail on their own"""
+        quotes = [
+            {'tour': str(tour.pk), 'date': f'2027-{month:02d}-10', 'travelers': 2}
+            for month in range(1, 13) for tour in self.tours
+        ] * 5
+        # Tours and seasonal pricings; packages are skipped when none are asked for
+        get_offer_index()
+        with self.assertNumQueries(2):
+            results = self.post(quotes)
+        self.assertEqual(len(results), 300)
+        self.assertTrue(all(row['success'] for row in results))
+        self.assertEqual(results[0]['quote']['total_price'], 400.0)
+        self.assertEqual(results[20]['quote']['total_price'], 200.0)
+
+        results = self.post([
+            {'tour': str(self.tours[0].pk)},
+            {'tour': 'not-a-uuid'},
+            {'tour': str(self.hidden.pk)},
+            'nonsense',
+        ])
+        self.assertEqual([row['success'] for row in results], [True, False, False, False])
+        self.assertIn('tour', results[1]['errors'])
+        self.assertEqual(results[2]['errors'], {'detail': ['Tour not found']})
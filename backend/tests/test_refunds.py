@@ -0,0 +1,75 @@
+"""
+Tests for refund processing
+Covers ledger checks, payment and booking updates and the batch command
+"""
+
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from apps.bookings.models import Booking
+from apps.bookings.reservations import confirm_booking, hold_seats
+from apps.payments.models import Payment, Refund
+from apps.payments.refunds import process_refunds
+from apps.tours.models import Destination, Tour
+
+User = get_user_model()
+
+
+class RefundProcessingTest(TestCase):
+    """Pending refunds are settled against what each payment can still give back"""
+
+    def setUp(self):
+        destination = Destination.objects.create(name='Pondicherry', country='India')
+        self.tour = Tour.objects.create(
+            name='French Quarter', description='Walks', destination=destination,
+            duration_days=2, max_capacity=10, base_price=Decimal('500.00'),
+        )
+        self.user = User.objects.create_user(
+            username='flaneur', email='flaneur@test.com', password='FlaneurPass123!'
+        )
+
+    def paid_booking(self, travelers, status='SUCCESS'):
+        booking = hold_seats(
+            tour=self.tour, travelers_count=travelers, user=self.user,
+            total_price=Decimal('500.00') * travelers,
+        )
+        confirm_booking(booking.pk)
+        payment = Payment.objects.create(booking=booking, amount=booking.total_price, status=status)
+        return booking, payment
+
+    def test_full_refund_releases_the_booking(self):
+        """A payment refunded in full is REFUNDED and its booking cancelled with seats returned"""
+        booking, payment = self.paid_booking(3)
+        Refund.objects.create(payment=payment, amount=Decimal('1000.00'), reason='Partial')
+        Refund.objects.create(payment=payment, amount=Decimal('500.00'), reason='Rest')
+
+        metrics = process_refunds(chunk_size=1)
+        self.assertEqual((metrics['processed'], metrics['chunks']), (2, 2))
+        payment.refresh_from_db()
+        booking.refresh_from_db()
+        self.tour.refresh_from_db()
+        self.assertEqual(payment.status, 'REFUNDED')
+        self.assertEqual(booking.status, 'CANCELLED')
+        self.assertEqual(self.tour.reserved_seats, 0)
+
+    def test_refunds_beyond_the_payment_are_rejected(self):
+        """Over-refunds and refunds of failed payments are rejected; partial refunds keep the booking"""
+        booking, payment = self.paid_booking(2)
+        _, failed = self.paid_booking(1, status='FAILED')
+        kept = Refund.objects.create(payment=payment, amount=Decimal('600.00'), reason='Room change')
+        too_much = Refund.objects.create(payment=payment, amount=Decimal('600.00'), reason='Again')
+        unpaid = Refund.objects.create(payment=failed, amount=Decimal('1.00'), reason='Never paid')
+
+        out = StringIO()
+        call_command('process_refunds', stdout=out)
+        self.assertIn('1 processed, 2 rejected', out.getvalue())
+        self.assertEqual(
+            dict(Refund.objects.values_list('pk', 'status')),
+            {kept.pk: 'PROCESSED', too_much.pk: 'REJECTED', unpaid.pk: 'REJECTED'}
+        )
+        self.assertEqual(Booking.objects.get(pk=booking.pk).status, 'CONFIRMED')
+        self.assertEqual(Payment.objects.get(pk=payment.pk).status, 'SUCCESS')
@@ -0,0 +1,284 @@
+"""
+Tests for seat reservations
+Covers seat holds through the booking API, hold expiry and a concurrent oversell check
+"""
+
+import random
+import threading
+import time
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.bookings.models import Booking
+from apps.bookings.reservations import (
+    CapacityUnavailable, ReservationError, cancel_booking, extend_hold, hold_seats, confirm_booking,
+    release_expired_holds
+)
+from apps.payments.gateways import FakeGateway
+from apps.payments.settlement import settle_due_payments
+from apps.tours.models import Destination, Tour, TourPackage
+
+User = get_user_model()
+
+
+class SeatReservationTest(TestCase):
+    """Bookings hold seats until paid, cancelled or expired"""
+
+    def setUp(self):
+        destination = Destination.objects.create(name='Ladakh', country='India')
+        self.tour = Tour.objects.create(
+            name='Ladakh Ride', description='High passes', destination=destination,
+            duration_days=7, max_capacity=5, base_price=Decimal('3000.00'),
+        )
+        self.package = TourPackage.objects.create(
+            tour=self.tour, name='Royal', price_modifier=Decimal('500.00'), max_participants=3,
+        )
+        self.user = User.objects.create_user(
+            username='rider', email='rider@test.com', password='RiderPass123!'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def book(self, travelers, package=None):
+        data = {'tour': str(self.tour.pk), 'travelers_count': travelers}
+        if package:
+            data['package'] = str(package.pk)
+        return self.client.post('/api/v1/bookings/', data, format='json')
+
+    def reserved(self):
+        self.tour.refresh_from_db()
+        self.package.refresh_from_db()
+        return self.tour.reserved_seats, self.package.reserved_seats
+
+    def test_holds_limit_tour_and_package_capacity(self):
+        """Holds count against both counters and overflow is refused with 409"""
+        response = self.book(3, self.package)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['data']['status'], 'PENDING')
+        self.assertIsNotNone(response.json()['data']['hold_expires_at'])
+
+        self.assertEqual(self.book(1, self.package).status_code, 409)
+        self.assertEqual(self.book(2).status_code, 201)
+        self.assertEqual(self.book(1).status_code, 409)
+        self.assertEqual(self.reserved(), (5, 3))
+
+    def test_cancel_and_delete_release_seats(self):
+        """Cancelled and deleted bookings give their seats back"""
+        first = self.book(3, self.package).json()['data']['id']
+        second = self.book(2).json()['data']['id']
+
+        response = self.client.post(f'/api/v1/bookings/{first}/cancel/')
+        self.assertEqual(response.json()['data']['status'], 'CANCELLED')
+        self.assertEqual(self.reserved(), (2, 0))
+
+        self.client.delete(f'/api/v1/bookings/{second}/')
+        self.assertEqual(self.reserved(), (0, 0))
+
+    def test_payment_confirms_and_booking_fields_are_fixed(self):
+        """Paying confirms the hold; status and seat counts cannot be edited directly"""
+        booking_id = self.book(2).json()['data']['id']
+        response = self.client.patch(f'/api/v1/bookings/{booking_id}/', {'travelers_count': 5}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.client.patch(f'/api/v1/bookings/{booking_id}/', {'status': 'CONFIRMED'}, format='json')
+        self.assertEqual(Booking.objects.get(pk=booking_id).status, 'PENDING')
+
+        response = self.client.post('/api/v1/payments/', {
+            'booking': booking_id, 'amount': '6000.00', 'payment_method': 'UPI'
+        }, format='json')
+        self.assertEqual(response.status_code, 202)
+        settle_due_payments(gateway=FakeGateway())
+        booking = Booking.objects.get(pk=booking_id)
+        self.assertEqual(booking.status, 'CONFIRMED')
+        self.assertIsNone(booking.hold_expires_at)
+        self.assertEqual(self.reserved(), (2, 0))
+
+    def test_cached_tour_pages_follow_seat_changes(self):
+        """Holds, cancellations and expiry drop the cached tour list and detail"""
+        cache.clear()
+
+        def capacity():
+            listed = self.client.get('/api/v1/tours/').json()['data'][0]['available_capacity']
+            detail = self.client.get(f'/api/v1/tours/{self.tour.pk}/').json()['data']['available_capacity']
+            return listed, detail
+
+        self.assertEqual(capacity(), (5, 5))
+        booking = hold_seats(tour=self.tour, travelers_count=3, user=self.user, total_price=Decimal('1'))
+        self.assertEqual(capacity(), (2, 2))
+        cancel_booking(booking.pk)
+        self.assertEqual(capacity(), (5, 5))
+
+        booking = hold_seats(tour=self.tour, travelers_count=2, user=self.user, total_price=Decimal('1'))
+        self.assertEqual(capacity(), (3, 3))
+        Booking.objects.filter(pk=booking.pk).update(hold_expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(release_expired_holds(), 1)
+        self.assertEqual(capacity(), (5, 5))
+
+    def test_bookings_without_a_hold_take_seats_before_extending(self):
+        """A PENDING booking from before seat holds never confirms on seats it did not take"""
+        legacy = Booking.objects.create(
+            user=self.user, tour=self.tour, travelers_count=3, total_price=Decimal('1')
+        )
+        other = hold_seats(tour=self.tour, travelers_count=3, user=self.user, total_price=Decimal('1'))
+        with self.assertRaises(CapacityUnavailable):
+            extend_hold(legacy.pk, 60)
+        self.assertIsNone(Booking.objects.get(pk=legacy.pk).hold_expires_at)
+        self.assertEqual(self.reserved()[0], 3)
+
+        cancel_booking(other.pk)
+        extend_hold(legacy.pk, 60)
+        self.assertEqual(self.reserved()[0], 3)
+        confirm_booking(legacy.pk)
+        cancel_booking(legacy.pk)
+        self.assertEqual(self.reserved()[0], 0)
+
+    def test_lapsed_holds_expire_and_free_seats(self):
+        """Lapsed holds are swept by new bookings or the command, and cannot be paid once the seats are gone"""
+        stale = hold_seats(tour=self.tour, travelers_count=5, user=self.user, total_price=Decimal('1'))
+        Booking.objects.filter(pk=stale.pk).update(hold_expires_at=timezone.now() - timedelta(seconds=1))
+
+        # The sold-out tour sweeps the lapsed hold and takes its seats
+        fresh = hold_seats(tour=self.tour, travelers_count=4, user=self.user, total_price=Decimal('1'))
+        self.assertEqual(Booking.objects.get(pk=stale.pk).status, 'EXPIRED')
+        self.assertEqual(self.reserved()[0], 4)
+        with self.assertRaises(ReservationError):
+            confirm_booking(stale.pk)
+
+        Booking.objects.filter(pk=fresh.pk).update(hold_expires_at=timezone.now() - timedelta(seconds=1))
+        call_command('release_expired_holds', stdout=StringIO())
+        self.assertEqual(self.reserved()[0], 0)
+
+
+class DepartureInventoryTest(TestCase):
+    """Dated departures carry their own seat inventory"""
+
+    def setUp(self):
+        destination = Destination.objects.create(name='Sikkim', country='India')
+        self.tour = Tour.objects.create(
+            name='Sikkim Monasteries', description='Gompas', destination=destination,
+            duration_days=6, max_capacity=4, base_price=Decimal('2500.00'),
+        )
+        self.admin = User.objects.create_user(
+            username='ops', email='ops@test.com', password='OpsPass123!', role='ADMIN'
+        )
+        self.user = User.objects.create_user(
+            username='pilgrim', email='pilgrim@test.com', password='PilgrimPass123!'
+        )
+        self.client = APIClient()
+        self.today = timezone.localdate()
+
+    def schedule(self, days_ahead, **data):
+        self.client.force_authenticate(self.admin)
+        response = self.client.post(f'/api/v1/tours/{self.tour.pk}/departures/', {
+            'departure_date': (self.today + timedelta(days=days_ahead)).isoformat(), **data
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        return response.json()['data']['id']
+
+    def book(self, travelers, departure=None):
+        self.client.force_authenticate(self.user)
+        data = {'tour': str(self.tour.pk), 'travelers_count': travelers}
+        if departure:
+            data['departure'] = departure
+        return self.client.post('/api/v1/bookings/', data, format='json')
+
+    def test_each_departure_has_its_own_seats(self):
+        """Seats are counted per date, not against a lifetime tour cap"""
+        first = self.schedule(10)
+        second = self.schedule(20, capacity=2)
+
+        self.assertEqual(self.book(1).status_code, 400)
+        self.assertEqual(self.book(4, first).status_code, 201)
+        self.assertEqual(self.book(1, first).status_code, 409)
+        self.assertEqual(self.book(2, second).status_code, 201)
+        self.tour.refresh_from_db()
+        self.assertEqual(self.tour.reserved_seats, 0)
+
+        booking_id = Booking.objects.get(departure_id=second).pk
+        self.client.post(f'/api/v1/bookings/{booking_id}/cancel/')
+
+        response = self.client.get(f'/api/v1/tours/{self.tour.pk}/departures/', {
+            'start': (self.today + timedelta(days=5)).isoformat(),
+            'end': (self.today + timedelta(days=25)).isoformat(),
+        })
+        seats = [(row['capacity'], row['available_seats']) for row in response.json()['data']]
+        self.assertEqual(seats, [(4, 0), (2, 2)])
+
+    def test_departures_with_bookings_are_protected(self):
+        """Sold departures cannot be deleted or shrunk below their reservations"""
+        departure = self.schedule(7)
+        self.book(3, departure)
+        self.client.force_authenticate(self.admin)
+        url = f'/api/v1/tours/{self.tour.pk}/departures/{departure}/'
+        self.assertEqual(self.client.patch(url, {'capacity': 2}, format='json').status_code, 400)
+        self.assertEqual(self.client.delete(url).status_code, 409)
+
+
+class ConcurrentReservationTest(TransactionTestCase):
+    """Many threads booking one hot tour never oversell it"""
+
+    CAPACITY = 25
+    THREADS = 16
+    ATTEMPTS_PER_THREAD = 6
+
+    def setUp(self):
+        destination = Destination.objects.create(name='Spiti', country='India')
+        self.tour = Tour.objects.create(
+            name='Spiti Flash Sale', description='Limited seats', destination=destination,
+            duration_days=5, max_capacity=self.CAPACITY, base_price=Decimal('100.00'),
+        )
+        self.user = User.objects.create_user(
+            username='buyer', email='buyer@test.com', password='BuyerPass123!'
+        )
+
+    def attempt(self, travelers):
+        """One booking attempt, retrying while the test database is write-locked"""
+        for _ in range(50):
+            try:
+                hold_seats(tour=self.tour, travelers_count=travelers, user=self.user,
+                           total_price=Decimal('100.00') * travelers)
+                return travelers
+            except CapacityUnavailable:
+                return 0
+            except OperationalError:
+                time.sleep(random.uniform(0.001, 0.01))
+        raise AssertionError('Booking attempt never got a database write')
+
+    def test_no_oversell_under_concurrent_holds(self):
+        """Seats granted to threads add up to at most the capacity, and match the counter"""
+        granted = []
+        errors = []
+        start = threading.Barrier(self.THREADS)
+
+        def worker():
+            try:
+                start.wait()
+                for _ in range(self.ATTEMPTS_PER_THREAD):
+                    granted.append(self.attempt(random.randint(1, 3)))
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.tour.refresh_from_db()
+        held = sum(Booking.objects.filter(tour=self.tour).values_list('travelers_count', flat=True))
+        self.assertLessEqual(sum(granted), self.CAPACITY)
+        self.assertEqual(sum(granted), held)
+        self.assertEqual(self.tour.reserved_seats, held)
+        # Demand far exceeds supply, so the tour sells out to within one small booking
+        self.assertGreater(held, self.CAPACITY - 3)
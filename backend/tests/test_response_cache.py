@@ -0,0 +1,95 @@
+"""
+Tests for the catalogue response cache
+Covers read-through hits, role separation and signal-driven invalidation
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.reviews.models import Review
+from apps.tours.models import Destination, Tour, Offer
+
+User = get_user_model()
+
+
+class ResponseCacheTest(TestCase):
+    """Catalogue responses are cached per role and invalidated by model writes"""
+
+    def setUp(self):
+        cache.clear()
+        self.destination = Destination.objects.create(name='Shimla', country='India')
+        self.tour = Tour.objects.create(
+            name='Shimla Heritage',
+            description='Colonial hill station',
+            destination=self.destination,
+            duration_days=3,
+            base_price=Decimal('1200.00'),
+        )
+        self.hidden_tour = Tour.objects.create(
+            name='Shimla Winter',
+            description='Snow trek',
+            destination=self.destination,
+            duration_days=2,
+            base_price=Decimal('900.00'),
+            is_active=False,
+        )
+
+    def test_repeated_list_is_served_from_cache(self):
+        """The second identical request does not touch the database"""
+        first = self.client.get('/api/v1/tours/')
+        with self.assertNumQueries(0):
+            second = self.client.get('/api/v1/tours/')
+        self.assertEqual(first.json()['data'], second.json()['data'])
+
+    def test_query_params_and_role_are_part_of_the_key(self):
+        """Different filters and roles never share cached responses"""
+        admin = User.objects.create_user(
+            username='admin', email='admin@test.com', password='AdminPass123!', role='ADMIN'
+        )
+        token = AccessToken.for_user(admin)
+
+        anonymous = self.client.get('/api/v1/tours/')
+        as_admin = self.client.get('/api/v1/tours/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(len(anonymous.json()['data']), 1)
+        self.assertEqual(len(as_admin.json()['data']), 2)
+
+        searched = self.client.get('/api/v1/tours/search/', {'search': 'Winter'})
+        self.assertEqual(len(searched.json()['data']), 0)
+
+    def test_model_writes_invalidate_their_families(self):
+        """Tour, destination and review writes drop cached tour responses"""
+        self.client.get('/api/v1/tours/')
+
+        self.tour.name = 'Shimla Heritage Walk'
+        self.tour.save()
+        self.assertEqual(self.client.get('/api/v1/tours/').json()['data'][0]['name'], 'Shimla Heritage Walk')
+
+        self.destination.name = 'Simla'
+        self.destination.save()
+        self.assertEqual(self.client.get('/api/v1/tours/').json()['data'][0]['destination_name'], 'Simla')
+
+        user = User.objects.create_user(username='reviewer', email='reviewer@test.com', password='ReviewerPass123!')
+        Review.objects.create(user=user, tour=self.tour, rating=5, comment='Charming', is_verified=True)
+        self.assertEqual(self.client.get('/api/v1/tours/').json()['data'][0]['review_count'], 1)
+
+    def test_offer_tour_changes_invalidate_current_offers(self):
+        """Changing an offer's tours refreshes applicable tour counts"""
+        today = timezone.now().date()
+        offer = Offer.objects.create(
+            name='Monsoon Sale',
+            discount_percentage=Decimal('10.00'),
+            start_date=today,
+            end_date=today + timedelta(days=30),
+        )
+        response = self.client.get('/api/v1/tours/offers/current/')
+        self.assertEqual(response.json()['data'][0]['applicable_tours_count'], 0)
+
+        offer.applicable_tours.add(self.tour)
+        response = self.client.get('/api/v1/tours/offers/current/')
+        self.assertEqual(response.json()['data'][0]['applicable_tours_count'], 1)
@@ -0,0 +1,114 @@
+"""
+Tests for the in-process tour search engine
+Covers parity with the database search, index upkeep and per-request query cost
+"""
+
+from decimal import Decimal
+from itertools import product
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from apps.tours.models import Destination, Tour, TourPackage
+from apps.tours.search_engine import get_search_engine, reset_search_engine, warm_search_engine
+
+
+@override_settings(TOUR_SEARCH_ENGINE='memory', RESPONSE_CACHE_TIMEOUT=0)
+class TourSearchEngineTest(TestCase):
+    """The memory engine answers searches like the database does"""
+
+    def setUp(self):
+        cache.clear()
+        reset_search_engine()
+        self.kerala = Destination.objects.create(name='Kerala', country='India')
+        self.provence = Destination.objects.create(name='Provence', country='France')
+        self.tours = [
+            self.create_tour('Backwaters Cruise', self.kerala, 'Houseboats on quiet lagoons',
+                             price='1200.00', days=3, category='RELAXATION'),
+            self.create_tour('Lavender Fields', self.provence, 'Café stops in old villages',
+                             price='2400.00', days=5, category='CULTURAL', difficulty='MODERATE'),
+            self.create_tour('Spice Trail', self.kerala, 'Plantations near the backwaters',
+                             price='800.00', days=2, category='CULTURAL'),
+            self.create_tour('Western Ghats Trek', self.kerala, 'Ridges and tea estates',
+                             price='1500.00', days=6, category='ADVENTURE', difficulty='CHALLENGING'),
+        ]
+
+    def tearDown(self):
+        reset_search_engine()
+
+    def create_tour(self, name, destination, description, price, days, category, difficulty='EASY'):
+        return Tour.objects.create(
+            name=name,
+            description=description,
+            destination=destination,
+            duration_days=days,
+            base_price=Decimal(price),
+            category=category,
+            difficulty_level=difficulty,
+        )
+
+    def search(self, **params):
+        response = self.client.get('/api/v1/tours/search/', params)
+        self.assertEqual(response.status_code, 200)
+        return [row['name'] for row in response.json()['data']]
+
+    def test_matches_database_search(self):
+        """Every filter and sort combination returns the database's answer"""
+        filters = [
+            {},
+            {'search': 'back'},
+            {'search': 'cafe'},
+            {'destination': 'ker'},
+            {'category': 'CULTURAL'},
+            {'difficulty': 'CHALLENGING'},
+            {'min_price': '1000', 'max_price': '2000'},
+            {'min_duration': '3'},
+            {'search': 'kerala', 'max_duration': '5'},
+        ]
+        sorts = [{}, {'sort_order': 'desc'}, {'sort_by': 'price', 'sort_order': 'desc'}, {'sort_by': 'duration'},
+                 {'sort_by': 'name'}, {'sort_by': 'rating', 'sort_order': 'desc'}]
+        for params, sort in product(filters, sorts):
+            params = {**params, **sort}
+            with override_settings(TOUR_SEARCH_ENGINE='database'):
+                expected = self.search(**params)
+            self.assertEqual(self.search(**params), expected, params)
+
+    def test_facets_match_database_facets(self):
+        """Engine facets equal the grouped-query facets for the same filters"""
+        params = {'destination': 'ker', 'facets': 'true'}
+        with override_settings(TOUR_SEARCH_ENGINE='database'):
+            expected = self.client.get('/api/v1/tours/search/', params).json()['facets']
+        response = self.client.get('/api/v1/tours/search/', params)
+        self.assertEqual(response.json()['facets'], expected)
+
+    def test_follows_catalogue_changes(self):
+        """Saves, package names, deactivation and deletes reach the index"""
+        self.assertEqual(self.search(search='sunflower'), [])
+
+        lavender = self.tours[1]
+        lavender.name = 'Sunflower Fields'
+        lavender.save()
+        self.assertEqual(self.search(search='sunflower'), ['Sunflower Fields'])
+
+        TourPackage.objects.create(tour=self.tours[3], name='Monsoon Special', max_participants=8)
+        self.assertEqual(self.search(search='monsoon'), ['Western Ghats Trek'])
+
+        self.tours[0].is_active = False
+        self.tours[0].save()
+        self.tours[2].delete()
+        self.assertEqual(self.search(destination='kerala'), ['Western Ghats Trek'])
+
+    def test_worker_start_builds_the_engine(self):
+        """Warming at startup leaves the first search only its page query"""
+        with override_settings(TOUR_SEARCH_ENGINE='database'), self.assertNumQueries(0):
+            warm_search_engine()
+        warm_search_engine()
+        with self.assertNumQueries(1):
+            self.search(search='kerala')
+
+    def test_page_costs_one_query_once_built(self):
+        """A warm engine only loads the rows of the requested page"""
+        get_search_engine()
+        with self.assertNumQueries(1):
+            names = self.search(search='kerala', sort_by='price')
+        self.assertEqual(names, ['Spice Trail', 'Backwaters Cruise', 'Western Ghats Trek'])
@@ -0,0 +1,78 @@
+"""
+Tests for login and registration throttling
+Covers the sliding-window counter and rejections ahead of password checks
+"""
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.authentication.activity import reset_login_activity
+from apps.authentication.throttling import SlidingWindowCounter
+
+User = get_user_model()
+
+TIGHT_RATES = dict(settings.REST_FRAMEWORK, DEFAULT_THROTTLE_RATES={
+    'login_ip': '5/min', 'login_email': '2/min', 'register_ip': '1/hour',
+})
+
+
+class SlidingWindowCounterTest(TestCase):
+    """The previous window fades out of the count as the window slides"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_limit_slides_with_time(self):
+        counter = SlidingWindowCounter(limit=3, window=60)
+        self.assertEqual([counter.hit('ip', now=600 + second)[0] for second in range(4)],
+                         [True, True, True, False])
+        # Over the limit within the window: retry once it has become the previous window
+        self.assertEqual(counter.hit('ip', now=610), (False, 50))
+
+        # Halfway into the next window the previous five hits weigh 2.5; they weigh
+        # 2 six seconds later, leaving room for this one
+        self.assertEqual(counter.hit('ip', now=690), (False, 6))
+        self.assertFalse(counter.hit('ip', now=691)[0])
+        # A window later only the new window's two hits remain
+        self.assertTrue(counter.hit('ip', now=760)[0])
+        self.assertEqual(counter.hit('other', now=690), (True, 0))
+
+
+@override_settings(REST_FRAMEWORK=TIGHT_RATES)
+class CredentialThrottleTest(TestCase):
+    """Credential endpoints reject bursts before checking any password"""
+
+    def setUp(self):
+        cache.clear()
+        reset_login_activity()
+        User.objects.create_user(username='sailor', email='sailor@test.com', password='SailorPass123!')
+        self.client = APIClient()
+
+    def login(self, email, password='WrongPass123!', ip='10.0.0.1'):
+        return self.client.post('/api/v1/auth/login/', {'email': email, 'password': password},
+                                format='json', REMOTE_ADDR=ip)
+
+    def test_email_is_throttled_across_ips(self):
+        """A third attempt on one email is rejected without touching the database"""
+        self.assertEqual(self.login('sailor@test.com', ip='10.0.0.1').status_code, 401)
+        self.assertEqual(self.login('SAILOR@test.com', ip='10.0.0.2').status_code, 401)
+        with self.assertNumQueries(0):
+            response = self.login('sailor@test.com', password='SailorPass123!', ip='10.0.0.3')
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+
+    def test_ip_is_throttled_across_emails(self):
+        for number in range(5):
+            self.assertEqual(self.login(f'guess{number}@test.com').status_code, 401)
+        self.assertEqual(self.login('sailor@test.com', password='SailorPass123!').status_code, 429)
+        self.assertEqual(self.login('sailor@test.com', password='SailorPass123!', ip='10.0.0.9').status_code, 200)
+
+    def test_registration_is_throttled_per_ip(self):
+        data = {'username': 'deckhand', 'email': 'deckhand@test.com', 'password': 'DeckhandPass123!',
+                'password_confirm': 'DeckhandPass123!', 'first_name': 'Deck', 'last_name': 'Hand'}
+        self.assertEqual(self.client.post('/api/v1/auth/register/', data, format='json').status_code, 201)
+        data.update(username='bosun', email='bosun@test.com')
+        self.assertEqual(self.client.post('/api/v1/auth/register/', data, format='json').status_code, 429)
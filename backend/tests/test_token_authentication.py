@@ -0,0 +1,79 @@
+"""
+Tests for claims-based token authentication
+Covers query-free role checks, lazy profile loading and revocation through the user state cache
+"""
+
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.authentication.activity import reset_login_activity
+from apps.authentication.authentication import get_user_state
+from apps.bookings.models import Booking
+from apps.tours.models import Destination, Tour
+
+User = get_user_model()
+
+
+class ClaimsAuthenticationTest(TestCase):
+    """Access tokens authenticate from their claims"""
+
+    def setUp(self):
+        cache.clear()
+        reset_login_activity()
+        destination = Destination.objects.create(name='Kutch', country='India')
+        tour = Tour.objects.create(
+            name='White Desert', description='Salt flats', destination=destination,
+            duration_days=3, base_price=Decimal('900.00'),
+        )
+        self.user = User.objects.create_user(
+            username='nomad', email='nomad@test.com', password='NomadPass123!',
+            first_name='Salt', last_name='Walker',
+        )
+        self.booking = Booking.objects.create(
+            user=self.user, tour=tour, travelers_count=1, total_price=Decimal('900.00')
+        )
+        self.client = APIClient()
+        response = self.client.post('/api/v1/auth/login/', {
+            'email': 'nomad@test.com', 'password': 'NomadPass123!'
+        }, format='json')
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.json()['data']['access_token']}")
+
+    def test_requests_skip_the_user_query(self):
+        """With the user state cached, a booking detail is only the booking query"""
+        get_user_state(self.user.pk)
+        with self.assertNumQueries(1):
+            response = self.client.get(f'/api/v1/bookings/{self.booking.pk}/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_profile_fields_load_in_one_query(self):
+        """Fields outside the claims are fetched together on first use"""
+        get_user_state(self.user.pk)
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/v1/auth/me/')
+        self.assertEqual(response.json()['data']['first_name'], 'Salt')
+
+    def test_profile_updates_keep_a_changed_email(self):
+        """A token issued before an email change never writes the old email back"""
+        response = self.client.patch('/api/v1/users/profile/', {'email': 'salt@test.com'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        response = self.client.patch('/api/v1/users/profile/', {'first_name': 'Zed'}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        self.user.refresh_from_db()
+        self.assertEqual((self.user.email, self.user.first_name), ('salt@test.com', 'Zed'))
+        self.assertEqual(self.client.get('/api/v1/auth/me/').json()['data']['email'], 'salt@test.com')
+
+    def test_deactivation_and_role_changes_revoke_tokens(self):
+        """Saving the user drops its cached state, so the next request is rejected"""
+        self.user.role = 'ADMIN'
+        self.user.save()
+        self.assertEqual(self.client.get('/api/v1/auth/me/').status_code, 401)
+
+        self.user.role = 'CUSTOMER'
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/api/v1/auth/me/').status_code, 401)
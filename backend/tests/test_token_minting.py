@@ -0,0 +1,56 @@
+"""
+Tests for the token minter
+Covers parity with simplejwt tokens and UserProfileSerializer, and the minting benchmark
+"""
+
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.authentication.tokens import get_token_minter, profile_data
+from apps.users.serializers import UserProfileSerializer
+
+User = get_user_model()
+
+
+class TokenMinterTest(TestCase):
+    """Minted tokens and profiles match the ones built by simplejwt and DRF"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='diver', email='diver@test.com', password='DiverPass123!',
+            first_name='Coral', last_name='Reef', last_login=timezone.now(),
+        )
+
+    def test_minted_token_verifies_like_simplejwt(self):
+        """simplejwt accepts the token and reads the same claims"""
+        token = AccessToken(get_token_minter().mint(self.user))
+        reference = AccessToken.for_user(self.user)
+        self.assertEqual(set(token.payload), set(reference.payload) | {'role', 'email'})
+        self.assertEqual(token['user_id'], reference['user_id'])
+        self.assertEqual((token['role'], token['email']), ('CUSTOMER', 'diver@test.com'))
+        self.assertEqual(token['exp'] - token['iat'], reference['exp'] - reference['iat'])
+
+    def test_minter_follows_jwt_settings(self):
+        """Changing SIMPLE_JWT prepares a new key and header"""
+        with override_settings(SIMPLE_JWT={'ALGORITHM': 'HS512', 'SIGNING_KEY': 'other-key'}):
+            token = get_token_minter().mint(self.user)
+            self.assertEqual(AccessToken(token)['email'], 'diver@test.com')
+        minter = get_token_minter()
+        self.assertEqual(AccessToken(minter.mint(self.user))['role'], 'CUSTOMER')
+
+    def test_profile_matches_the_serializer(self):
+        """The direct profile is field for field UserProfileSerializer's output"""
+        self.assertEqual(profile_data(self.user), UserProfileSerializer(self.user).data)
+        self.user.last_login = None
+        self.assertEqual(profile_data(self.user), UserProfileSerializer(self.user).data)
+
+    def test_benchmark_reports_speedup(self):
+        out = StringIO()
+        call_command('benchmark_tokens', '--tokens', '50', stdout=out)
+        self.assertIn('minted token', out.getvalue())
+        self.assertIn('faster', out.getvalue())
@@ -0,0 +1,279 @@
+"""
+Tests for tour aggregates
+Covers stored aggregate maintenance, the rebuild command and annotated mode
+"""
+
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from apps.bookings.models import Booking
+from apps.bookings.reservations import cancel_booking, confirm_booking, hold_seats
+from apps.reviews.models import Review
+from apps.tours.models import Destination, Tour, TourDeparture, TourPackage
+
+User = get_user_model()
+
+
+class TourAggregatesTest(TestCase):
+    """Stored rating/review/capacity aggregates follow reviews and bookings"""
+
+    def setUp(self):
+        self.destination = Destination.objects.create(name='Goa', country='India')
+        self.tour = Tour.objects.create(
+            name='Goa Beaches',
+            description='Sun and sand',
+            destination=self.destination,
+            duration_days=4,
+            max_capacity=10,
+            base_price=Decimal('1000.00'),
+        )
+        self.users = [
+            User.objects.create_user(
+                username=f'traveler{i}',
+                email=f'traveler{i}@test.com',
+                password='TravelerPass123!',
+            )
+            for i in range(3)
+        ]
+
+    def refresh(self):
+        self.tour.refresh_from_db()
+        return self.tour
+
+    def test_review_verification_edit_and_delete(self):
+        """Only verified reviews count, and edits/deletes move the totals"""
+        review = Review.objects.create(user=self.users[0], tour=self.tour, rating=4, comment='Nice')
+        self.assertEqual(self.refresh().review_count, 0)
+
+        review.is_verified = True
+        review.save()
+        Review.objects.create(user=self.users[1], tour=self.tour, rating=2, comment='Meh', is_verified=True)
+        self.assertEqual(self.refresh().review_count, 2)
+        self.assertEqual(self.tour.average_rating, 3)
+
+        review.rating = 5
+        review.save()
+        self.assertEqual(self.refresh().average_rating, 3.5)
+
+        review.delete()
+        self.assertEqual(self.refresh().review_count, 1)
+        self.assertEqual(self.tour.average_rating, 2)
+
+    def test_booking_confirmation_moves_capacity(self):
+        """Capacity counts live holds and confirmed bookings, the seats reservations check"""
+        Booking.objects.create(
+            user=self.users[1], tour=self.tour, travelers_count=4, total_price=Decimal('4000.00')
+        )
+        self.assertEqual(self.refresh().available_capacity, 10)
+
+        booking = hold_seats(
+            user=self.users[0], tour=self.tour, travelers_count=3, total_price=Decimal('3000.00')
+        )
+        self.assertEqual(self.refresh().available_capacity, 7)
+
+        confirm_booking(booking.pk)
+        self.assertEqual(self.refresh().available_capacity, 7)
+        response = self.client.get(f'/api/v1/tours/{self.tour.pk}/')
+        self.assertEqual(response.json()['data']['available_capacity'], 7)
+
+        cancel_booking(booking.pk)
+        self.assertEqual(self.refresh().available_capacity, 10)
+
+    def test_tour_save_does_not_overwrite_aggregates(self):
+        """Saving a stale tour instance keeps aggregates written meanwhile"""
+        stale = Tour.objects.get(pk=self.tour.pk)
+        Review.objects.create(user=self.users[0], tour=self.tour, rating=5, comment='Great', is_verified=True)
+
+        stale.name = 'Goa Beaches Deluxe'
+        stale.save()
+        self.assertEqual(self.refresh().review_count, 1)
+        self.assertEqual(self.tour.name, 'Goa Beaches Deluxe')
+
+    def test_rebuild_command_recomputes_from_scratch(self):
+        """rebuild_tour_stats repairs aggregates and seat counters written outside the signals"""
+        package = TourPackage.objects.create(tour=self.tour, name='Villa', max_participants=4)
+        Review.objects.create(user=self.users[0], tour=self.tour, rating=4, comment='Good', is_verified=True)
+        Booking.objects.create(
+            user=self.users[1], tour=self.tour, travelers_count=2,
+            total_price=Decimal('2000.00'), status='CONFIRMED'
+        )
+        hold_seats(user=self.users[2], tour=self.tour, package=package, travelers_count=1, total_price=Decimal('1'))
+        Tour.objects.filter(pk=self.tour.pk).update(
+            verified_review_count=0, verified_rating_total=0, rating_average=0, reserved_seats=0
+        )
+        TourPackage.objects.filter(pk=package.pk).update(reserved_seats=4)
+        departure = TourDeparture.objects.create(
+            tour=self.tour, departure_date=date.today() + timedelta(days=30), capacity=6
+        )
+        TourDeparture.objects.filter(pk=departure.pk).update(reserved_seats=5)
+
+        out = StringIO()
+        call_command('rebuild_tour_stats', stdout=out)
+        self.assertIn('1 tour(s) updated', out.getvalue())
+
+        tour = self.refresh()
+        self.assertEqual(tour.review_count, 1)
+        self.assertEqual(tour.average_rating, 4)
+        self.assertEqual(tour.rating_average, 4)
+        self.assertEqual(tour.available_capacity, 7)
+        package.refresh_from_db()
+        self.assertEqual(package.available_capacity, 3)
+        departure.refresh_from_db()
+        self.assertEqual(departure.reserved_seats, 0)
+
+    def test_rating_sort_uses_stored_verified_average(self):
+        """sort_by=rating ignores unverified reviews and breaks ties deterministically"""
+        alpha, beta = [
+            Tour.objects.create(
+                name=name, description='Coast', destination=self.destination,
+                duration_days=2, base_price=Decimal('500.00'),
+            )
+            for name in ('Alpha Coast', 'Beta Coast')
+        ]
+        Review.objects.create(user=self.users[0], tour=self.tour, rating=5, comment='Superb', is_verified=True)
+        Review.objects.create(user=self.users[1], tour=self.tour, rating=1, comment='Spam')
+        Review.objects.create(user=self.users[0], tour=alpha, rating=4, comment='Good', is_verified=True)
+        for user in self.users[:2]:
+            Review.objects.create(user=user, tour=beta, rating=4, comment='Good', is_verified=True)
+        self.assertEqual(self.refresh().rating_average, 5)
+
+        response = self.client.get('/api/v1/tours/search/', {'sort_by': 'rating', 'sort_order': 'desc'})
+        names = [row['name'] for row in response.json()['data']]
+        self.assertEqual(names, ['Goa Beaches', 'Beta Coast', 'Alpha Coast'])
+
+        Review.objects.filter(tour=self.tour, is_verified=True).get().delete()
+        self.assertEqual(self.refresh().rating_average, 0)
+
+    def test_list_endpoint_does_not_query_per_row(self):
+        """The tour list renders aggregates without per-row queries"""
+        for i in range(5):
+            Tour.objects.create(
+                name=f'Extra Tour {i}',
+                description='More tours',
+                destination=self.destination,
+                duration_days=2,
+                base_price=Decimal('500.00'),
+            )
+
+        # One COUNT/MAX aggregate (validators and pagination) and one SELECT for the page
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/v1/tours/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['data']), 6)
+
+
+@override_settings(TOUR_AGGREGATES_SOURCE='annotated')
+class AnnotatedTourAggregatesTest(TestCase):
+    """Annotated mode computes aggregates live in the page query"""
+
+    def setUp(self):
+        self.destination = Destination.objects.create(name='Kerala', country='India')
+        self.user = User.objects.create_user(
+            username='reviewer', email='reviewer@test.com', password='ReviewerPass123!'
+        )
+        self.other_user = User.objects.create_user(
+            username='booker', email='booker@test.com', password='BookerPass123!'
+        )
+
+    def create_tours(self, count):
+        for i in range(count):
+            tour = Tour.objects.create(
+                name=f'Backwaters {i}',
+                description='Houseboats',
+                destination=self.destination,
+                duration_days=3,
+                max_capacity=20,
+                base_price=Decimal('1500.00'),
+            )
+            Review.objects.create(user=self.user, tour=tour, rating=5, comment='Lovely', is_verified=True)
+            Review.objects.create(user=self.other_user, tour=tour, rating=3, comment='Fine', is_verified=False)
+            for _ in range(2):
+                Booking.objects.create(
+                    user=self.other_user, tour=tour, travelers_count=2,
+                    total_price=Decimal('3000.00'), status='CONFIRMED'
+                )
+
+    def test_page_query_count_is_independent_of_page_size(self):
+        """A page of N tours costs the same number of queries for any N"""
+        for count in (1, 4, 9):
+            Tour.objects.all().delete()
+            self.create_tours(count)
+            # Stored columns are zeroed so only the annotations can be right
+            Tour.objects.update(verified_review_count=0, verified_rating_total=0, reserved_seats=0)
+
+            with self.assertNumQueries(2):
+                response = self.client.get('/api/v1/tours/')
+
+            rows = response.json()['data']
+            self.assertEqual(len(rows), count)
+            for row in rows:
+                self.assertEqual(row['average_rating'], 5)
+                self.assertEqual(row['review_count'], 1)
+                self.assertEqual(row['available_capacity'], 16)
+
+    def test_search_uses_annotations(self):
+        """The search endpoint shares the annotated queryset"""
+        self.create_tours(3)
+        Tour.objects.update(verified_review_count=0, verified_rating_total=0)
+
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/v1/tours/search/', {'search': 'Backwaters'})
+        rows = response.json()['data']
+        self.assertEqual(len(rows), 3)
+        self.assertTrue(all(row['review_count'] == 1 for row in rows))
+
+
+class PackageCapacityTest(TestCase):
+    """Package capacity is read from the stored reserved seats in nested and nested-route lists"""
+
+    def setUp(self):
+        self.destination = Destination.objects.create(name='Manali', country='India')
+        self.tour = Tour.objects.create(
+            name='Manali Escape',
+            description='Mountains',
+            destination=self.destination,
+            duration_days=5,
+            max_capacity=30,
+            base_price=Decimal('2000.00'),
+        )
+        self.user = User.objects.create_user(
+            username='hiker', email='hiker@test.com', password='HikerPass123!'
+        )
+
+    def add_packages(self, count):
+        start = self.tour.packages.count()
+        for i in range(start, start + count):
+            package = TourPackage.objects.create(
+                tour=self.tour,
+                name=f'Tier {i}',
+                price_modifier=Decimal(i * 100),
+                max_participants=10,
+            )
+            booking = hold_seats(
+                user=self.user, tour=self.tour, package=package, travelers_count=3,
+                total_price=Decimal('6000.00')
+            )
+            confirm_booking(booking.pk)
+
+    def test_detail_and_package_list_cost_constant_queries(self):
+        """Detail and /packages/ query counts do not grow with package tiers"""
+        for count in (1, 3, 6):
+            self.add_packages(count - self.tour.packages.count())
+
+            # Tour row, then its packages
+            with self.assertNumQueries(2):
+                response = self.client.get(f'/api/v1/tours/{self.tour.pk}/')
+            packages = response.json()['data']['packages']
+            self.assertEqual(len(packages), count)
+            self.assertTrue(all(package['available_capacity'] == 7 for package in packages))
+            self.assertEqual(packages[0]['total_price'], 2000.0)
+
+            # COUNT/MAX aggregate, then packages joined to their tour
+            with self.assertNumQueries(2):
+                response = self.client.get(f'/api/v1/tours/{self.tour.pk}/packages/')
+            self.assertEqual(len(response.json()['data']), count)
@@ -0,0 +1,133 @@
+"""
+Tests for tour full-text search
+Covers prefix and accent-insensitive matching, relevance order and index upkeep
+"""
+
+from decimal import Decimal
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+
+from apps.tours.models import Destination, Tour
+
+
+class TourSearchTest(TestCase):
+    """The search endpoint matches indexed tour documents"""
+
+    def setUp(self):
+        cache.clear()
+        self.kerala = Destination.objects.create(name='Kerala', country='India')
+        self.provence = Destination.objects.create(name='Provence', country='France')
+        self.backwaters = self.create_tour('Backwaters Cruise', self.kerala, 'Houseboats on quiet lagoons')
+        self.lavender = self.create_tour('Lavender Fields', self.provence, 'Café stops in old villages')
+        self.spice = self.create_tour('Spice Trail', self.kerala, 'Plantations near the backwaters')
+
+    def create_tour(self, name, destination, description):
+        return Tour.objects.create(
+            name=name,
+            description=description,
+            destination=destination,
+            duration_days=3,
+            base_price=Decimal('1000.00'),
+        )
+
+    def search(self, term, **params):
+        response = self.client.get('/api/v1/tours/search/', {'search': term, **params})
+        self.assertEqual(response.status_code, 200)
+        return [row['name'] for row in response.json()['data']]
+
+    def test_prefix_and_accent_insensitive_matching(self):
+        """Partial words and unaccented spellings still match"""
+        self.assertEqual(self.search('lagoon'), ['Backwaters Cruise'])
+        self.assertEqual(self.search('cafe'), ['Lavender Fields'])
+        self.assertEqual(self.search('Café prov'), ['Lavender Fields'])
+        self.assertEqual(self.search('nowhere'), [])
+
+    def test_name_matches_rank_above_description_matches(self):
+        """Relevance order puts name hits before description hits"""
+        self.assertEqual(self.search('backwaters'), ['Backwaters Cruise', 'Spice Trail'])
+        self.assertEqual(
+            self.search('backwaters', sort_by='name', sort_order='desc'),
+            ['Spice Trail', 'Backwaters Cruise']
+        )
+
+    def test_default_sort_without_a_term_honours_sort_order(self):
+        """With nothing to rank, the default sort is by name in the requested order"""
+        self.assertEqual(self.search('', sort_order='desc'), ['Spice Trail', 'Lavender Fields', 'Backwaters Cruise'])
+        self.assertEqual(self.search(''), ['Backwaters Cruise', 'Lavender Fields', 'Spice Trail'])
+
+    def test_index_follows_tour_and_destination_changes(self):
+        """Renames, destination renames and deletes are reflected in results"""
+        self.lavender.name = 'Sunflower Fields'
+        self.lavender.save()
+        self.assertEqual(self.search('sunflower'), ['Sunflower Fields'])
+
+        self.kerala.name = 'Alleppey'
+        self.kerala.save()
+        self.assertEqual(self.search('alleppey'), ['Backwaters Cruise', 'Spice Trail'])
+
+        self.spice.delete()
+        self.assertEqual(self.search('alleppey'), ['Backwaters Cruise'])
+
+    def test_rebuild_command(self):
+        """rebuild_search_index restores documents written outside the signals"""
+        Tour.objects.filter(pk=self.spice.pk).update(name='Tea Estates')
+        self.assertEqual(self.search('tea'), [])
+
+        out = StringIO()
+        call_command('rebuild_search_index', stdout=out)
+        self.assertIn('3 tour(s) indexed', out.getvalue())
+        self.assertEqual(self.search('tea'), ['Tea Estates'])
+
+
+class TourSearchFacetsTest(TestCase):
+    """?facets=true adds counts and histograms of the filtered result set"""
+
+    def setUp(self):
+        cache.clear()
+        self.kerala = Destination.objects.create(name='Kerala', country='India')
+        self.goa = Destination.objects.create(name='Goa', country='India')
+        for name, destination, price, days, category in (
+            ('Backwaters Cruise', self.kerala, '1200.00', 3, 'RELAXATION'),
+            ('Spice Trail', self.kerala, '800.00', 2, 'CULTURAL'),
+            ('Ghats Trek', self.kerala, '1499.99', 6, 'ADVENTURE'),
+            ('Beach Hopping', self.goa, '950.00', 4, 'RELAXATION'),
+            ('Old Goa Walk', self.goa, '300.00', 1, 'CULTURAL'),
+        ):
+            Tour.objects.create(
+                name=name, description='India', destination=destination,
+                duration_days=days, base_price=Decimal(price), category=category,
+            )
+
+    def test_facets_cover_filtered_results_in_one_query(self):
+        """Facets describe the whole filtered set, not just the page, in one extra query"""
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/v1/tours/search/', {
+                'min_price': '500', 'facets': 'true', 'page_size': 1
+            })
+        facets = response.json()['facets']
+
+        self.assertEqual(
+            [(row['value'], row['count']) for row in facets['category']],
+            [('RELAXATION', 2), ('ADVENTURE', 1), ('CULTURAL', 1)]
+        )
+        self.assertEqual(
+            {row['name']: row['count'] for row in facets['destination']},
+            {'Kerala': 3, 'Goa': 1}
+        )
+        self.assertEqual(facets['difficulty'], [{'value': 'EASY', 'label': 'Easy', 'count': 4}])
+        self.assertEqual(
+            [(row['min'], row['max'], row['count']) for row in facets['price']],
+            [(500.0, 1000.0, 2), (1000.0, 1500.0, 2)]
+        )
+        self.assertEqual(
+            [(row['min'], row['max'], row['count']) for row in facets['duration']],
+            [(1, 3, 2), (4, 6, 2)]
+        )
+
+    def test_facets_are_opt_in(self):
+        """Plain searches keep their previous response shape"""
+        response = self.client.get('/api/v1/tours/search/', {'search': 'trail'})
+        self.assertNotIn('facets', response.json())